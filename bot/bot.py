@@ -3,6 +3,8 @@ import contextlib
 from sys import exception
 
 import aiohttp
+from discord import Role
+from discord.abc import GuildChannel
 from discord.errors import Forbidden
 from pydis_core import BotBase
 from pydis_core.utils.error_handling import handle_forbidden_from_block
@@ -10,6 +12,7 @@ from sentry_sdk import new_scope, start_transaction
 
 from bot import constants, exts
 from bot.log import get_logger
+from bot.utils.channel import channel_visibility
 
 log = get_logger("bot")
 
@@ -55,6 +58,22 @@ class Bot(BotBase):
         await super().setup_hook()
         await self.load_extensions(exts)
 
+    async def on_guild_channel_update(self, before: GuildChannel, after: GuildChannel) -> None:
+        """Forget who can view the channel, as its overwrites may have changed."""
+        channel_visibility.forget_channel(after)
+
+    async def on_guild_channel_delete(self, channel: GuildChannel) -> None:
+        """Forget who could view the deleted channel."""
+        channel_visibility.forget_channel(channel)
+
+    async def on_guild_role_update(self, before: Role, after: Role) -> None:
+        """Forget who can view channels, as the role's permissions may have changed."""
+        channel_visibility.forget_all()
+
+    async def on_guild_role_delete(self, role: Role) -> None:
+        """Forget who can view channels, as the role's overwrites are gone along with it."""
+        channel_visibility.forget_all()
+
     async def on_error(self, event: str, *args, **kwargs) -> None:
         """Log errors raised in event listeners rather than printing them to stderr."""
         e_val = exception()
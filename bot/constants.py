@@ -419,6 +419,15 @@ class _Cooldowns(EnvConfig, env_prefix="cooldowns_"):
 Cooldowns = _Cooldowns()
 
 
+class _SnekboxQueue(EnvConfig, env_prefix="snekbox_queue_"):
+
+    max_running_jobs: int = 4
+    max_queued_jobs: int = 20
+
+
+SnekboxQueue = _SnekboxQueue()
+
+
 class _Metabase(EnvConfig, env_prefix="metabase_"):
 
     username: str = ""
@@ -1,15 +1,14 @@
 import asyncio
-from typing import Any
 
 from discord import Guild, Member, Role, User
 from discord.ext import commands
 from discord.ext.commands import Cog, Context
-from pydis_core.site_api import ResponseCodeError
 from pydis_core.utils.scheduling import create_task
 
 from bot import constants
 from bot.bot import Bot
 from bot.exts.backend.sync import _syncers
+from bot.exts.backend.sync._writer import UserWriter
 from bot.log import get_logger
 
 log = get_logger(__name__)
@@ -22,6 +21,7 @@ class Sync(Cog):
     def __init__(self, bot: Bot) -> None:
         self.bot = bot
         self.guild: Guild | None = None
+        self.user_writer = UserWriter(bot)
 
 
     async def cog_load(self) -> None:
@@ -53,17 +53,11 @@ class Sync(Cog):
 
         log.info("Starting syncers.")
         for syncer in (_syncers.RoleSyncer, _syncers.UserSyncer):
-            await syncer.sync(self.guild)
-
-    async def patch_user(self, user_id: int, json: dict[str, Any], ignore_404: bool = False) -> None:
-        """Send a PATCH request to partially update a user in the database."""
-        try:
-            await self.bot.api_client.patch(f"bot/users/{user_id}", json=json)
-        except ResponseCodeError as e:
-            if e.response.status != 404:
-                raise
-            if not ignore_404:
-                log.warning("Unable to update user, got 404. Assuming race condition from join event.")
+            await syncer.sync(self.guild, full=False)
+
+    async def cog_unload(self) -> None:
+        """Write the pending changes to users before the cog is unloaded."""
+        await self.user_writer.drain()
 
     @Cog.listener()
     async def on_guild_role_create(self, role: Role) -> None:
@@ -122,7 +116,7 @@ class Sync(Cog):
 
         If the joining member is a user that is already known to the database (i.e., a user that
         previously left), it will update the user's information. If the user is not yet known by
-        the database, the user is added.
+        the database, the user is added. The user is written along with the other pending changes to users.
         """
         if member.guild.id != constants.Guild.id:
             return
@@ -135,23 +129,7 @@ class Sync(Cog):
             "roles": sorted(role.id for role in member.roles)
         }
 
-        got_error = False
-
-        try:
-            # First try an update of the user to set the `in_guild` field and other
-            # fields that may have changed since the last time we've seen them.
-            await self.bot.api_client.put(f"bot/users/{member.id}", json=packed)
-
-        except ResponseCodeError as e:
-            # If we didn't get 404, something else broke - propagate it up.
-            if e.response.status != 404:
-                raise
-
-            got_error = True  # yikes
-
-        if got_error:
-            # If we got `404`, the user is new. Create them.
-            await self.bot.api_client.post("bot/users", json=packed)
+        self.user_writer.join(packed)
 
     @Cog.listener()
     async def on_member_remove(self, member: Member) -> None:
@@ -159,7 +137,7 @@ class Sync(Cog):
         if member.guild.id != constants.Guild.id:
             return
 
-        await self.patch_user(member.id, json={"in_guild": False})
+        self.user_writer.update(member.id, {"in_guild": False})
 
     @Cog.listener()
     async def on_member_update(self, before: Member, after: Member) -> None:
@@ -168,20 +146,14 @@ class Sync(Cog):
             return
 
         if before.roles != after.roles:
-            updated_information = {"roles": sorted(role.id for role in after.roles)}
-            await self.patch_user(after.id, json=updated_information)
+            self.user_writer.update(after.id, {"roles": sorted(role.id for role in after.roles)})
 
     @Cog.listener()
     async def on_user_update(self, before: User, after: User) -> None:
         """Update the user information in the database if a relevant change is detected."""
         attrs = ("name", "discriminator")
         if any(getattr(before, attr) != getattr(after, attr) for attr in attrs):
-            updated_information = {
-                "name": after.name,
-                "discriminator": int(after.discriminator),
-            }
-            # A 404 likely means the user is in another guild.
-            await self.patch_user(after.id, json=updated_information, ignore_404=True)
+            self.user_writer.update(after.id, {"name": after.name, "discriminator": int(after.discriminator)})
 
     @commands.group(name="sync")
     @commands.has_permissions(administrator=True)
@@ -197,5 +169,5 @@ class Sync(Cog):
     @sync_group.command(name="users")
     @commands.has_permissions(administrator=True)
     async def sync_users_command(self, ctx: Context) -> None:
-        """Manually synchronise the guild's users with the users on the site."""
+        """Manually synchronise the guild's users with the users on the site, comparing every user."""
         await _syncers.UserSyncer.sync(ctx.guild, ctx)
@@ -1,10 +1,14 @@
 import abc
+import asyncio
+import math
 import typing as t
-from collections import namedtuple
+from collections import deque, namedtuple
+from collections.abc import Iterable
+from hashlib import blake2b
 from itertools import batched
 
-import discord.errors
-from discord import Guild
+from async_rediscache.types.base import RedisObject
+from discord import Guild, Member
 from discord.ext.commands import Context
 from pydis_core.site_api import ResponseCodeError
 
@@ -14,6 +18,14 @@ from bot.log import get_logger
 log = get_logger(__name__)
 
 CHUNK_SIZE = 1000
+# How many pages of users are requested from the site ahead of the one being diffed.
+USER_PAGES_PREFETCHED = 3
+# The most users that can be looked up at once in a request for guild members.
+MEMBER_QUERY_SIZE = 100
+# How many users unknown to the checkpoint are looked up on the site at once.
+USER_LOOKUPS_AT_ONCE = 10
+# The digest of a member known to exist in the database, whose fields may not be up to date with it.
+UNSYNCED_DIGEST = ""
 
 # These objects are declared as namedtuples because tuples are hashable,
 # something that we make use of when diffing site roles against guild roles.
@@ -35,8 +47,12 @@ class Syncer(abc.ABC):
 
     @staticmethod
     @abc.abstractmethod
-    async def _get_diff(guild: Guild) -> _Diff:
-        """Return the difference between the cache of `guild` and the database."""
+    async def _get_diff(guild: Guild, full: bool) -> _Diff:
+        """
+        Return the difference between the cache of `guild` and the database.
+
+        Unless `full` is set, the syncer may only look at what changed since it last synchronised.
+        """
         raise NotImplementedError  # pragma: no cover
 
     @staticmethod
@@ -45,12 +61,17 @@ class Syncer(abc.ABC):
         """Perform the API calls for synchronisation."""
         raise NotImplementedError  # pragma: no cover
 
+    @staticmethod  # noqa: B027
+    async def _synced(guild: Guild) -> None:
+        """Record that the database was synchronised with the cache of `guild`. Does nothing by default."""
+
     @classmethod
-    async def sync(cls, guild: Guild, ctx: Context | None = None) -> None:
+    async def sync(cls, guild: Guild, ctx: Context | None = None, *, full: bool = True) -> None:
         """
         Synchronise the database with the cache of `guild`.
 
         If `ctx` is given, send a message with the results.
+        If `full` isn't set, syncers which keep track of what they synchronised may only look at what changed since.
         """
         log.info(f"Starting {cls.name} syncer.")
 
@@ -58,7 +79,7 @@ class Syncer(abc.ABC):
             message = await ctx.send(f"📊 Synchronising {cls.name}s.")
         else:
             message = None
-        diff = await cls._get_diff(guild)
+        diff = await cls._get_diff(guild, full)
 
         try:
             await cls._sync(diff)
@@ -75,6 +96,7 @@ class Syncer(abc.ABC):
 
             log.info(f"{cls.name} syncer finished: {results}.")
             content = f":ok_hand: Synchronisation of {cls.name}s complete: {results}"
+            await cls._synced(guild)
 
         if message:
             await message.edit(content=content)
@@ -86,8 +108,8 @@ class RoleSyncer(Syncer):
     name = "role"
 
     @staticmethod
-    async def _get_diff(guild: Guild) -> _Diff:
-        """Return the difference of roles between the cache of `guild` and the database."""
+    async def _get_diff(guild: Guild, full: bool = True) -> _Diff:
+        """Return the difference of roles between the cache of `guild` and the database, always in full."""
         log.trace("Getting the diff for roles.")
         roles = await bot.instance.api_client.get("bot/roles")
 
@@ -134,90 +156,240 @@ class RoleSyncer(Syncer):
             await bot.instance.api_client.delete(f"bot/roles/{role.id}")
 
 
+def _member_digest(member: Member) -> str:
+    """Return a digest of the fields of the member which are stored in the database."""
+    fields = (member.name, member.display_name, int(member.discriminator), sorted(role.id for role in member.roles))
+    return blake2b(repr(fields).encode(), digest_size=8).hexdigest()
+
+
+def _pack_member(member: Member) -> dict[str, t.Any]:
+    """Return the fields of the member as they're stored in the database."""
+    return {
+        "id": member.id,
+        "name": member.name,
+        "display_name": member.display_name,
+        "discriminator": int(member.discriminator),
+        "roles": [role.id for role in member.roles],
+        "in_guild": True,
+    }
+
+
+async def _query_members(guild: Guild, user_ids: Iterable[int]) -> dict[int, Member]:
+    """Look up the members with the given IDs through the gateway, in batches rather than one request per member."""
+    members = {}
+    for batch in batched(user_ids, MEMBER_QUERY_SIZE):
+        for member in await guild.query_members(user_ids=list(batch), limit=len(batch)):
+            members[member.id] = member
+    return members
+
+
+async def _get_site_users(user_ids: Iterable[int]) -> dict[int, dict[str, t.Any] | None]:
+    """Get the database users with the given IDs, a few at a time, with None for the ones which don't exist."""
+    users = {}
+    # The workers share the iterator, so each user is only looked up once.
+    pending_ids = iter(user_ids)
+
+    async def worker() -> None:
+        for user_id in pending_ids:
+            try:
+                users[user_id] = await bot.instance.api_client.get(f"bot/users/{user_id}")
+            except ResponseCodeError as e:
+                if e.response.status != 404:
+                    raise
+                users[user_id] = None
+
+    await asyncio.gather(*(worker() for _ in range(USER_LOOKUPS_AT_ONCE)))
+    return users
+
+
+class UserCheckpoint(RedisObject):
+    """
+    Store a digest of each guild member as of the last successful user sync.
+
+    The members whose digest still matches were already synchronised, so they can be skipped by the next sync.
+    """
+
+    async def get_all(self) -> dict[int, str]:
+        """Return the digests of the members, by ID."""
+        digests = await self.redis_session.client.hgetall(self.namespace)
+        return {int(user_id): digest for user_id, digest in digests.items()}
+
+    async def replace(self, members: Iterable[Member]) -> None:
+        """Replace the stored digests with the digests of `members`, all at once."""
+        digests = {member.id: _member_digest(member) for member in members}
+        async with self.redis_session.client.pipeline() as pipe:
+            if digests:
+                staging_key = f"{self.namespace}.staging"
+                pipe.delete(staging_key)
+                for chunk in batched(digests.items(), CHUNK_SIZE):
+                    pipe.hset(staging_key, mapping=dict(chunk))
+                pipe.rename(staging_key, self.namespace)
+            else:
+                pipe.delete(self.namespace)
+            await pipe.execute()
+
+    async def mark_unsynced(self, user_ids: Iterable[int]) -> None:
+        """
+        Record that the users exist in the database, but not that their fields are up to date with their members.
+
+        The next sync then updates them along with the members that changed, instead of looking them up as unknown.
+        Does nothing without a checkpoint, as every member is looked at by the next sync then.
+        """
+        digests = dict.fromkeys(user_ids, UNSYNCED_DIGEST)
+        if digests and await self.redis_session.client.exists(self.namespace):
+            await self.redis_session.client.hset(self.namespace, mapping=digests)
+
+
 class UserSyncer(Syncer):
-    """Synchronise the database with users in the cache."""
+    """
+    Synchronise the database with users in the cache.
+
+    A full sync walks through every user in the database. Otherwise, the members are compared against their digest
+    from the last sync, and only the members that changed or are unknown to it are looked at.
+    """
 
     name = "user"
+    checkpoint = UserCheckpoint()
 
     @staticmethod
-    async def _get_diff(guild: Guild) -> _Diff:
+    async def _get_diff(guild: Guild, full: bool = True) -> _Diff:
         """Return the difference of users between the cache of `guild` and the database."""
+        if not full:
+            if digests := await UserSyncer.checkpoint.get_all():
+                return await UserSyncer._get_incremental_diff(guild, digests)
+            log.info("No checkpoint of the last user sync, comparing every user.")
+        return await UserSyncer._get_full_diff(guild)
+
+    @staticmethod
+    def _diff_user(db_user: dict[str, t.Any], guild_user: Member | None) -> dict[str, t.Any]:
+        """Return the fields of the database user which differ from the guild, along with its ID if there are any."""
+        if guild_user:
+            updated_fields = {
+                field: value
+                for field, value in _pack_member(guild_user).items()
+                if field != "roles" and db_user[field] != value
+            }
+            guild_roles = [role.id for role in guild_user.roles]
+            if set(db_user["roles"]) != set(guild_roles):
+                updated_fields["roles"] = guild_roles
+
+        elif db_user["in_guild"]:
+            # The user is known in the DB but not the guild, and the
+            # DB currently specifies that the user is a member of the guild.
+            # This means that the user has left since the last sync.
+            # Update the `in_guild` attribute of the user on the site
+            # to signify that the user left.
+            updated_fields = {"in_guild": False}
+
+        else:
+            updated_fields = {}
+
+        if updated_fields:
+            updated_fields["id"] = db_user["id"]
+        return updated_fields
+
+    @staticmethod
+    async def _get_full_diff(guild: Guild) -> _Diff:
+        """Return the difference of every user in the database."""
         log.trace("Getting the diff for users.")
 
         users_to_create = []
         users_to_update = []
         seen_guild_users = set()
+        # Users which were in the guild during the last sync, but aren't in the cache.
+        missing_users = {}
 
         async for db_user in UserSyncer._get_users():
-            # Store user fields which are to be updated.
-            updated_fields = {}
-
-            def maybe_update(db_field: str, guild_value: str | int) -> None:
-                # Equalize DB user and guild user attributes.
-                if db_user[db_field] != guild_value:  # noqa: B023
-                    updated_fields[db_field] = guild_value  # noqa: B023
-
             guild_user = guild.get_member(db_user["id"])
             if not guild_user and db_user["in_guild"]:
-                # The member was in the guild during the last sync.
-                # We try to fetch them to verify cache integrity.
-                try:
-                    guild_user = await guild.fetch_member(db_user["id"])
-                except discord.errors.NotFound:
-                    guild_user = None
+                missing_users[db_user["id"]] = db_user
+                continue
 
             if guild_user:
                 seen_guild_users.add(guild_user.id)
+            if updated_fields := UserSyncer._diff_user(db_user, guild_user):
+                users_to_update.append(updated_fields)
 
-                maybe_update("name", guild_user.name)
-                maybe_update("display_name", guild_user.display_name)
-                maybe_update("discriminator", int(guild_user.discriminator))
-                maybe_update("in_guild", True)
-
-                guild_roles = [role.id for role in guild_user.roles]
-                if set(db_user["roles"]) != set(guild_roles):
-                    updated_fields["roles"] = guild_roles
-
-            elif db_user["in_guild"]:
-                # The user is known in the DB but not the guild, and the
-                # DB currently specifies that the user is a member of the guild.
-                # This means that the user has left since the last sync.
-                # Update the `in_guild` attribute of the user on the site
-                # to signify that the user left.
-                updated_fields["in_guild"] = False
-
-            if updated_fields:
-                updated_fields["id"] = db_user["id"]
+        # Verify the integrity of the cache by looking up the missing users, which may still be members.
+        found_members = await _query_members(guild, missing_users)
+        for user_id, db_user in missing_users.items():
+            if guild_user := found_members.get(user_id):
+                seen_guild_users.add(user_id)
+            if updated_fields := UserSyncer._diff_user(db_user, guild_user):
                 users_to_update.append(updated_fields)
 
         for member in guild.members:
             if member.id not in seen_guild_users:
                 # The user is known on the guild but not on the API. This means
                 # that the user has joined since the last sync. Create it.
-                new_user = {
-                    "id": member.id,
-                    "name": member.name,
-                    "display_name": member.display_name,
-                    "discriminator": int(member.discriminator),
-                    "roles": [role.id for role in member.roles],
-                    "in_guild": True
-                }
-                users_to_create.append(new_user)
+                users_to_create.append(_pack_member(member))
+
+        return _Diff(users_to_create, users_to_update, None)
+
+    @staticmethod
+    async def _get_incremental_diff(guild: Guild, digests: dict[int, str]) -> _Diff:
+        """Return the difference of the users which changed since the sync the member `digests` are from."""
+        log.trace(f"Getting the diff for users changed since the last sync of {len(digests)} members.")
+
+        users_to_create = []
+        users_to_update = []
+        unknown_members = []
+
+        for member in guild.members:
+            digest = digests.pop(member.id, None)
+            if digest is None:
+                unknown_members.append(member)
+            elif digest != _member_digest(member):
+                users_to_update.append(_pack_member(member))
+
+        # What's left are the members of the last sync which aren't in the cache, and likely left since.
+        found_members = await _query_members(guild, digests)
+        for user_id, digest in digests.items():
+            if member := found_members.get(user_id):
+                if digest != _member_digest(member):
+                    users_to_update.append(_pack_member(member))
+            else:
+                users_to_update.append({"id": user_id, "in_guild": False})
+
+        # The members who joined while they couldn't be written, such as while the bot was down,
+        # may have been added to the database already, or be rejoining.
+        db_users = await _get_site_users(member.id for member in unknown_members)
+        for member in unknown_members:
+            if (db_user := db_users[member.id]) is None:
+                users_to_create.append(_pack_member(member))
+            elif updated_fields := UserSyncer._diff_user(db_user, member):
+                users_to_update.append(updated_fields)
 
         return _Diff(users_to_create, users_to_update, None)
 
     @staticmethod
     async def _get_users() -> t.AsyncIterable:
-        """GET users from database."""
-        query_params = {
-            "page": 1
-        }
-        while query_params["page"]:
-            res = await bot.instance.api_client.get("bot/users", params=query_params)
-            for user in res["results"]:
-                yield user
+        """GET users from database, requesting the following pages while the current one is gone through."""
+        response = await bot.instance.api_client.get("bot/users", params={"page": 1})
+        # The pages to request ahead are estimated from the count, but the site's next page is still followed.
+        last_page_no = math.ceil(response["count"] / max(len(response["results"]), 1))
+        requests = deque()
+        try:
+            while True:
+                for user in response["results"]:
+                    yield user
+
+                if not (next_page_no := response["next_page_no"]):
+                    return
+                while not requests or (
+                    len(requests) < USER_PAGES_PREFETCHED and next_page_no + len(requests) <= last_page_no
+                ):
+                    params = {"page": next_page_no + len(requests)}
+                    requests.append(asyncio.ensure_future(bot.instance.api_client.get("bot/users", params=params)))
+                response = await requests.popleft()
+        finally:
+            for request in requests:
+                request.cancel()
 
-            query_params["page"] = res["next_page_no"]
+    @staticmethod
+    async def _synced(guild: Guild) -> None:
+        """Checkpoint the members which were synchronised."""
+        await UserSyncer.checkpoint.replace(guild.members)
 
     @staticmethod
     async def _sync(diff: _Diff) -> None:
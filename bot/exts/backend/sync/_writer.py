@@ -0,0 +1,195 @@
+import asyncio
+import contextlib
+import time
+from collections.abc import Sequence
+from itertools import batched
+from typing import Any
+
+from pydis_core.site_api import ResponseCodeError
+from pydis_core.utils import scheduling
+
+from bot.bot import Bot
+from bot.exts.backend.sync._syncers import CHUNK_SIZE, UserSyncer
+from bot.log import get_logger
+
+log = get_logger(__name__)
+
+# How long changes to users are held for, so that the changes made in quick succession are written together.
+FLUSH_DELAY = 2
+# How many users can have pending changes before they're written right away.
+MAX_PENDING_USERS = CHUNK_SIZE
+
+
+class UserWriter:
+    """
+    Write the changes to users from member and user events to the site in bulk, shortly after they happen.
+
+    The pending changes to a user are folded together, so a user whose roles change several times in a row is written
+    once with their final roles, and a member who joined is created with any changes that came after.
+    If the site rejects a bulk request, such as when some of the members who joined are already known to it,
+    the request is split in halves which are written on their own, down to single users which are written one at a
+    time. The members who were created are marked in the sync checkpoint, so the next sync doesn't look them up again.
+    """
+
+    def __init__(self, bot: Bot):
+        self.bot = bot
+
+        # All the fields of the members who joined, and only the changed fields of the other users, by ID.
+        self._joined: dict[int, dict[str, Any]] = {}
+        self._updated: dict[int, dict[str, Any]] = {}
+        self._oldest_change_at: float | None = None
+
+        self._flush_now = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        # Once draining, the users which can't be written are left for the next sync instead of being queued again.
+        self._draining = False
+
+    def __len__(self) -> int:
+        """Return the number of users with pending changes."""
+        return len(self._joined) + len(self._updated)
+
+    def join(self, user: dict[str, Any]) -> None:
+        """Queue the member who joined to be created, or updated if the site already knows them."""
+        self._updated.pop(user["id"], None)
+        self._joined[user["id"]] = user
+        self._queued()
+
+    def update(self, user_id: int, fields: dict[str, Any]) -> None:
+        """Queue a change to the fields of the user, on top of their pending changes."""
+        if (joined := self._joined.get(user_id)) is not None:
+            joined.update(fields)
+        else:
+            self._updated.setdefault(user_id, {"id": user_id}).update(fields)
+        self._queued()
+
+    async def drain(self) -> None:
+        """Write the pending changes right away, and wait until they're written."""
+        self._draining = True
+        if self._task is not None and not self._task.done():
+            self._flush_now.set()
+            await self._task
+
+    def _queued(self) -> None:
+        """Schedule the pending changes to be written, right away if there's enough of them to fill a request."""
+        if self._oldest_change_at is None:
+            self._oldest_change_at = time.perf_counter()
+        self.bot.stats.gauge("sync.users.pending", len(self))
+        if len(self) >= MAX_PENDING_USERS:
+            self._flush_now.set()
+        if self._task is None or self._task.done():
+            self._task = scheduling.create_task(self._flush_pending(), name="sync_user_writer")
+
+    def _requeue(self, users: Sequence[dict[str, Any]], *, joined: bool) -> None:
+        """Queue the users which couldn't be written again, under the changes made to them since."""
+        for user in users:
+            user_id = user["id"]
+            if joined:
+                newer = self._joined.pop(user_id, None) or self._updated.pop(user_id, {})
+                self._joined[user_id] = {**user, **newer}
+            elif user_id not in self._joined:
+                # A member who joined since is created with all their fields, so the older changes can be dropped.
+                self._updated[user_id] = {**user, **self._updated.get(user_id, {})}
+        self._queued()
+
+    async def _flush_pending(self) -> None:
+        while self._joined or self._updated:
+            if not self._flush_now.is_set():
+                with contextlib.suppress(TimeoutError):
+                    await asyncio.wait_for(self._flush_now.wait(), FLUSH_DELAY)
+            self._flush_now.clear()
+
+            joined, self._joined = self._joined, {}
+            updated, self._updated = self._updated, {}
+            oldest_change_at, self._oldest_change_at = self._oldest_change_at, None
+            self.bot.stats.gauge("sync.users.pending", 0)
+
+            created = await self._write(list(joined.values()), joined=True)
+            await self._write(list(updated.values()), joined=False)
+            try:
+                await UserSyncer.checkpoint.mark_unsynced(created)
+            except Exception:
+                log.exception(f"Failed to mark {len(created)} created users in the sync checkpoint.")
+
+            oldest_change_wait = time.perf_counter() - oldest_change_at
+            self.bot.stats.timing("sync.users.flush_latency", oldest_change_wait * 1000)
+
+    async def _write(self, users: list[dict[str, Any]], *, joined: bool) -> list[int]:
+        """Create or patch the users in bulk, in chunks, and return the IDs of the users which were written."""
+        written = []
+        for chunk in batched(users, CHUNK_SIZE):
+            written += await self._write_chunk(chunk, joined=joined)
+        return written
+
+    async def _write_chunk(self, users: Sequence[dict[str, Any]], *, joined: bool) -> list[int]:
+        """
+        Write the users in a single request, and return the IDs of the users which were written.
+
+        If the request is rejected, the users are split in halves which are written on their own,
+        so that a few users the site rejects don't make the others of the chunk be written one at a time.
+        """
+        try:
+            if joined:
+                await self.bot.api_client.post("bot/users", json=users)
+            else:
+                await self.bot.api_client.patch("bot/users/bulk_patch", json=users)
+        except ResponseCodeError as e:
+            if e.response.status not in (400, 404):
+                log.exception(f"Failed to write {len(users)} users to the site, leaving them for the next sync.")
+                self.bot.stats.incr("sync.users.failed", len(users))
+                return []
+        except Exception:
+            self._write_failed(users, joined=joined)
+            return []
+        else:
+            self.bot.stats.incr("sync.users.written", len(users))
+            return [user["id"] for user in users]
+
+        if len(users) == 1:
+            self.bot.stats.incr("sync.users.fallback")
+            return [users[0]["id"]] if await self._write_user(users[0], joined=joined) else []
+        log.trace(f"Bulk write of {len(users)} users was rejected, writing each half on its own.")
+        half = len(users) // 2
+        return [
+            *await self._write_chunk(users[:half], joined=joined),
+            *await self._write_chunk(users[half:], joined=joined),
+        ]
+
+    async def _write_user(self, user: dict[str, Any], *, joined: bool) -> bool:
+        """Write a single user, creating them if they joined and the site doesn't know them, and return if it was."""
+        try:
+            if not joined:
+                fields = {field: value for field, value in user.items() if field != "id"}
+                await self.bot.api_client.patch(f"bot/users/{user['id']}", json=fields)
+                return True
+
+            try:
+                # First try an update of the user to set the `in_guild` field and other
+                # fields that may have changed since the last time we've seen them.
+                await self.bot.api_client.put(f"bot/users/{user['id']}", json=user)
+            except ResponseCodeError as e:
+                if e.response.status != 404:
+                    raise
+                # If we got `404`, the user is new. Create them.
+                await self.bot.api_client.post("bot/users", json=user)
+            return True
+
+        except ResponseCodeError as e:
+            if e.response.status == 404:
+                # The user is likely only in another guild.
+                log.trace(f"Unable to update user {user['id']}, got 404.")
+            else:
+                log.exception(f"Failed to write user {user['id']} to the site, leaving them for the next sync.")
+                self.bot.stats.incr("sync.users.failed")
+        except Exception:
+            self._write_failed([user], joined=joined)
+        return False
+
+    def _write_failed(self, users: Sequence[dict[str, Any]], *, joined: bool) -> None:
+        """Queue the users whose write failed without a response from the site again, unless the writer is draining."""
+        if self._draining:
+            log.exception(f"Failed to write {len(users)} users to the site, leaving them for the next sync.")
+            self.bot.stats.incr("sync.users.failed", len(users))
+        else:
+            log.exception(f"Failed to write {len(users)} users to the site, queueing them again.")
+            self.bot.stats.incr("sync.users.requeued", len(users))
+            self._requeue(users, joined=joined)
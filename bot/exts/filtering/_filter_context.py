@@ -1,13 +1,18 @@
 from __future__ import annotations
 
+import re
 import typing
-from collections.abc import Callable, Coroutine, Iterable
-from dataclasses import dataclass, field, replace
+import unicodedata
+from collections.abc import Callable, Coroutine, Iterable, Iterator
+from dataclasses import Field, MISSING, dataclass, field, fields, replace
 from enum import Enum, auto
+from typing import Any
 
 import discord
 from discord import DMChannel, Embed, Member, Message, StageChannel, TextChannel, Thread, User, VoiceChannel
+from pydis_core.utils.regex import DISCORD_INVITE
 
+from bot.exts.filtering._utils import clean_input
 from bot.utils.message_cache import MessageCache
 
 if typing.TYPE_CHECKING:
@@ -26,6 +31,33 @@ class Event(Enum):
     SNEKBOX = auto()
 
 
+SPOILER_RE = re.compile(r"(\|\|.+?\|\|)", re.DOTALL)
+# Matches words that start with the http(s) protocol prefix
+# Will not include, if present, the trailing closing parenthesis
+URL_RE = re.compile(r"https?://(\S+)(?=\)|\b)", flags=re.IGNORECASE)
+
+# The fields filter lists write their results to, which are merged back from a context made with `isolated`.
+_OUTPUT_FIELDS = (
+    "dm_content",
+    "dm_embed",
+    "send_alert",
+    "alert_content",
+    "alert_embeds",
+    "action_descriptions",
+    "matches",
+    "notification_domain",
+    "filter_info",
+    "messages_deletion",
+    "blocked_exts",
+    "potential_phish",
+    "additional_actions",
+    "related_messages",
+    "related_channels",
+    "uploaded_attachments",
+    "upload_deletion_logs",
+)
+
+
 @dataclass
 class FilterContext:
     """A dataclass containing the information that should be filtered, and output information of the filtering."""
@@ -59,6 +91,8 @@ class FilterContext:
     related_channels: set[TextChannel | Thread | DMChannel] = field(default_factory=set)
     uploaded_attachments: dict[int, list[str]] = field(default_factory=dict)  # Message ID to attachment URLs.
     upload_deletion_logs: bool = True  # Whether it's allowed to upload deletion logs.
+    # Memoised views of the content shared by the filter lists. Not carried over to replaced contexts.
+    _views: dict[str, tuple[Any, Any]] = field(default_factory=dict, init=False, repr=False, compare=False)
 
     def __post_init__(self):
         # If it's in the context of a DM channel, self.channel won't be None, but self.channel.guild will.
@@ -84,3 +118,123 @@ class FilterContext:
     def replace(self, **changes) -> FilterContext:
         """Return a new context object assigning new values to the specified fields."""
         return replace(self, **changes)
+
+    def isolated(self) -> FilterContext:
+        """
+        Return a copy of the context with none of the output, for a filter list to run on alongside the others.
+
+        The output the list writes to the copy is added to this context with `merge`.
+        The memoised views of the content are shared with the copy, so they're still only computed once.
+        """
+        isolated = self.replace(**{output_field.name: self._default(output_field) for output_field in self._outputs()})
+        isolated._views = self._views
+        return isolated
+
+    def merge(self, other: FilterContext) -> None:
+        """
+        Add the output written to the `other` context, made with `isolated`, to this one.
+
+        Collections are extended, and other output which was set in `other` overrides this context's.
+        """
+        for output_field in self._outputs():
+            value = getattr(other, output_field.name)
+            if value == self._default(output_field):
+                continue
+            current = getattr(self, output_field.name)
+            if isinstance(current, list):
+                current.extend(value)
+            elif isinstance(current, set | dict):
+                current.update(value)
+            else:
+                setattr(self, output_field.name, value)
+
+    @classmethod
+    def _outputs(cls) -> Iterator[Field]:
+        """Return the fields filter lists write their results to."""
+        return (output_field for output_field in fields(cls) if output_field.name in _OUTPUT_FIELDS)
+
+    @staticmethod
+    def _default(output_field: Field) -> Any:
+        """Return a new default value of the field."""
+        if output_field.default_factory is not MISSING:
+            return output_field.default_factory()
+        return output_field.default
+
+    def _view(self, name: str, compute: Callable[[], Any]) -> Any:
+        """Return the memoised view of the content with the given name, computing it if the content changed."""
+        if (cached := self._views.get(name)) and cached[0] is self.content:
+            return cached[1]
+        value = compute()
+        self._views[name] = (self.content, value)
+        return value
+
+    @property
+    def scope(self) -> tuple:
+        """
+        A hashable summary of where and by whom the event was triggered.
+
+        This holds everything validation settings look at, so that their results can be reused for the same scope.
+        """
+        if self.channel is None:
+            channel_key = None
+        elif not self.in_guild:
+            channel_key = ()
+        else:
+            channel = self.channel.parent if hasattr(self.channel, "parent") else self.channel
+            category = channel.category
+            channel_key = (channel.id, channel.name, category and (category.id, category.name))
+
+        author_key = None
+        if isinstance(self.author, Member):
+            author_key = tuple((role.id, role.name) for role in self.author.roles)
+        return channel_key, author_key
+
+    @property
+    def _cleaned_parts(self) -> list[str]:
+        """The content split around spoilers, with zalgo and invisible characters removed from each part."""
+        # Cleaning removes single characters, so cleaning each part is the same as cleaning any concatenation of them.
+        return self._view("cleaned_parts", lambda: [clean_input(part) for part in SPOILER_RE.split(self.content)])
+
+    @property
+    def cleaned_content(self) -> str:
+        """The content with zalgo and invisible characters removed."""
+        return self._view("cleaned_content", lambda: "".join(self._cleaned_parts))
+
+    @property
+    def expanded_content(self) -> str:
+        """The cleaned content containing all interpretations of any spoilers in it."""
+        def expand() -> str:
+            parts = self._cleaned_parts
+            if len(parts) == 1:  # No spoilers.
+                return parts[0]
+            return "".join(parts[0::2] + parts[1::2] + parts)
+
+        return self._view("expanded_content", expand)
+
+    @property
+    def urls(self) -> set[str]:
+        """The URLs in the cleaned content, without their schema and trailing slashes, in lower case."""
+        return self._view(
+            "urls", lambda: {match.group(1).lower().rstrip("/") for match in URL_RE.finditer(self.cleaned_content)}
+        )
+
+    @property
+    def invite_matches(self) -> list[re.Match]:
+        """The matches of Discord invites in the cleaned content."""
+        # Avoid escape characters
+        return self._view(
+            "invite_matches", lambda: list(DISCORD_INVITE.finditer(self.cleaned_content.replace("\\", "")))
+        )
+
+    @property
+    def normalised_content(self) -> str:
+        """The NFKC normalised form of the content."""
+        return self._view("normalised_content", lambda: unicodedata.normalize("NFKC", self.content))
+
+    @property
+    def cleaned_normalised_content(self) -> str:
+        """The NFKC normalised form of the content, without any combining characters."""
+        return self._view(
+            "cleaned_normalised_content",
+            lambda: "".join([c for c in self.normalised_content if not unicodedata.combining(c)])
+        )
@@ -3,19 +3,17 @@ import typing
 from collections import Counter
 from collections.abc import Callable, Coroutine
 from dataclasses import dataclass, field
-from datetime import timedelta
 from functools import reduce
-from itertools import takewhile
 from operator import add, or_
 
-import arrow
-from discord import Member
+from discord import Member, Message
 from pydis_core.utils import scheduling
 from pydis_core.utils.logging import get_logger
 
 from bot.exts.filtering._filter_context import FilterContext
 from bot.exts.filtering._filter_lists.filter_list import ListType, SubscribingAtomicList, UniquesListBase
 from bot.exts.filtering._filters.antispam import antispam_filter_types
+from bot.exts.filtering._filters.antispam._window import AntispamWindow
 from bot.exts.filtering._filters.filter import Filter, UniqueFilter
 from bot.exts.filtering._settings import ActionSettings
 from bot.exts.filtering._settings_types.actions.infraction_and_notification import Infraction, InfractionAndNotification
@@ -33,7 +31,8 @@ class AntispamList(UniquesListBase):
     """
     A list of anti-spam rules.
 
-    Messages from the last X seconds are passed to each rule, which decides whether it triggers across those messages.
+    The author's messages from the last X seconds are passed to each rule, which decides whether it triggers across
+    those messages.
 
     The infraction reason is set dynamically.
     """
@@ -43,6 +42,11 @@ class AntispamList(UniquesListBase):
     def __init__(self, filtering_cog: "Filtering"):
         super().__init__(filtering_cog)
         self.message_deletion_queue: dict[Member, DeletionContext] = dict()
+        self.window = AntispamWindow()
+
+    def message_edited(self, message: Message) -> None:
+        """Update the message in the window, so the rules see its edited content."""
+        self.window.update(message)
 
     def get_filter_type(self, content: str) -> type[UniqueFilter] | None:
         """Get a subclass of filter matching the filter list and the filter's content."""
@@ -65,11 +69,9 @@ class AntispamList(UniquesListBase):
         potential_filters = [sublist.filters[id_] for id_ in sublist.subscriptions[ctx.event]]
         max_interval = max(filter_.extra_fields.interval for filter_ in potential_filters)
 
-        earliest_relevant_at = arrow.utcnow() - timedelta(seconds=max_interval)
-        relevant_messages = list(
-            takewhile(lambda msg: msg.created_at > earliest_relevant_at, ctx.message_cache)
-        )
-        new_ctx = ctx.replace(content=relevant_messages)
+        self.window.add(ctx.message)
+        self.window.evict(max_interval)
+        new_ctx = ctx.replace(content=self.window.for_author(ctx.author))
         triggers = await sublist.filter_list_result(new_ctx)
         if not triggers:
             return None, [], {}
@@ -1,22 +1,17 @@
 from __future__ import annotations
 
-import re
 import typing
+from collections import defaultdict
 
 from bot.exts.filtering._filter_context import Event, FilterContext
 from bot.exts.filtering._filter_lists.filter_list import FilterList, ListType
-from bot.exts.filtering._filters.domain import DomainFilter
+from bot.exts.filtering._filters.domain import DomainFilter, extract_domain
 from bot.exts.filtering._filters.filter import Filter
 from bot.exts.filtering._settings import ActionSettings
-from bot.exts.filtering._utils import clean_input
 
 if typing.TYPE_CHECKING:
     from bot.exts.filtering.filtering import Filtering
 
-# Matches words that start with the http(s) protocol prefix
-# Will not include, if present, the trailing closing parenthesis
-URL_RE = re.compile(r"https?://(\S+)(?=\)|\b)", flags=re.IGNORECASE)
-
 
 class DomainsList(FilterList[DomainFilter]):
     """
@@ -34,6 +29,11 @@ class DomainsList(FilterList[DomainFilter]):
     def __init__(self, filtering_cog: Filtering):
         super().__init__()
         filtering_cog.subscribe(self, Event.MESSAGE, Event.MESSAGE_EDIT, Event.SNEKBOX)
+        # Filters can only trigger for URLs sharing their registered domain, so they're indexed by it.
+        self._index: defaultdict[str, dict[int, DomainFilter]] = defaultdict(dict)
+        # The positions of the filters in the list, for returning candidates in the same order.
+        self._positions: dict[int, int] = {}
+        self._next_position = 0
 
     def get_filter_type(self, content: str) -> type[Filter]:
         """Get a subclass of filter matching the filter list and the filter's content."""
@@ -48,15 +48,14 @@ class DomainsList(FilterList[DomainFilter]):
         self, ctx: FilterContext
     ) -> tuple[ActionSettings | None, list[str], dict[ListType, list[Filter]]]:
         """Dispatch the given event to the list's filters, and return actions to take and messages to relay to mods."""
-        text = ctx.content
-        if not text:
+        if not ctx.content:
             return None, [], {}
 
-        text = clean_input(text)
-        urls = {match.group(1).lower().rstrip("/") for match in URL_RE.finditer(text)}
+        urls = ctx.urls
         new_ctx = ctx.replace(content=urls)
 
-        triggers = await self[ListType.DENY].filter_list_result(new_ctx)
+        sublist = self[ListType.DENY]
+        triggers = await sublist._create_filter_list_result(new_ctx, sublist.defaults, self._candidates(urls))
         ctx.notification_domain = new_ctx.notification_domain
         unknown_urls = urls - {filter_.content.lower() for filter_ in triggers}
         if unknown_urls:
@@ -68,3 +67,42 @@ class DomainsList(FilterList[DomainFilter]):
             actions = self[ListType.DENY].merge_actions(triggers)
             messages = self[ListType.DENY].format_messages(triggers)
         return actions, messages, {ListType.DENY: triggers}
+
+    def _on_list_added(self, list_type: ListType) -> None:
+        """Index the filters of the deny list by their registered domain."""
+        if list_type != ListType.DENY:
+            return
+        self._index.clear()
+        self._positions.clear()
+        self._next_position = 0
+        for filter_ in self[ListType.DENY].filters.values():
+            self._on_filter_added(list_type, filter_)
+
+    def _on_filter_added(self, list_type: ListType, filter_: DomainFilter) -> None:
+        """Add the filter to the index."""
+        if list_type != ListType.DENY:
+            return
+        self._index[filter_.registered_domain][filter_.id] = filter_
+        if filter_.id not in self._positions:  # An edited filter keeps its position.
+            self._positions[filter_.id] = self._next_position
+            self._next_position += 1
+
+    def _on_filter_removed(self, list_type: ListType, filter_: DomainFilter) -> None:
+        """Remove the filter from the index."""
+        if list_type != ListType.DENY:
+            return
+        bucket = self._index[filter_.registered_domain]
+        if bucket.get(filter_.id) is filter_:
+            del bucket[filter_.id]
+        if not bucket:
+            del self._index[filter_.registered_domain]
+        if filter_.id not in self[ListType.DENY].filters:
+            del self._positions[filter_.id]
+
+    def _candidates(self, urls: set[str]) -> list[DomainFilter]:
+        """Return the filters which share a registered domain with any of the URLs, in the order of the list."""
+        candidates = {}
+        for registered_domain in {extract_domain(url).registered_domain for url in urls}:
+            if registered_domain in self._index:
+                candidates.update(self._index[registered_domain])
+        return sorted(candidates.values(), key=lambda filter_: self._positions[filter_.id])
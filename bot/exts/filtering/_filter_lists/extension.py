@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import typing
+from collections import defaultdict
 from os.path import splitext
 
 import bot
@@ -50,7 +51,33 @@ class ExtensionsList(FilterList[ExtensionFilter]):
     def __init__(self, filtering_cog: Filtering):
         super().__init__()
         filtering_cog.subscribe(self, Event.MESSAGE, Event.SNEKBOX)
-        self._whitelisted_description = None
+        # The allowed filters, indexed by their extension.
+        self._by_extension: defaultdict[str, dict[int, ExtensionFilter]] = defaultdict(dict)
+        # The description of the allowed extensions, along with the version of the list it was created for.
+        self._whitelisted_description: tuple[int, str] | None = None
+
+    def _on_list_added(self, list_type: ListType) -> None:
+        """Index the allowed filters by their extension."""
+        if list_type != ListType.ALLOW:
+            return
+        self._by_extension.clear()
+        for filter_ in self[ListType.ALLOW].filters.values():
+            self._on_filter_added(list_type, filter_)
+
+    def _on_filter_added(self, list_type: ListType, filter_: ExtensionFilter) -> None:
+        """Add the filter to the index."""
+        if list_type == ListType.ALLOW:
+            self._by_extension[filter_.content][filter_.id] = filter_
+
+    def _on_filter_removed(self, list_type: ListType, filter_: ExtensionFilter) -> None:
+        """Remove the filter from the index."""
+        if list_type != ListType.ALLOW:
+            return
+        bucket = self._by_extension[filter_.content]
+        if bucket.get(filter_.id) is filter_:
+            del bucket[filter_.id]
+        if not bucket:
+            del self._by_extension[filter_.content]
 
     def get_filter_type(self, content: str) -> type[Filter]:
         """Get a subclass of filter matching the filter list and the filter's content."""
@@ -78,9 +105,8 @@ class ExtensionsList(FilterList[ExtensionFilter]):
             (splitext(attachment.filename.lower())[1], attachment.filename) for attachment in ctx.attachments
         }
         new_ctx = ctx.replace(content={ext for ext, _ in all_ext})  # And prepare the context for the filters to read.
-        triggered = [
-            filter_ for filter_ in self[ListType.ALLOW].filters.values() if await filter_.triggered_on(new_ctx)
-        ]
+        candidates = [filter_ for ext in new_ctx.content for filter_ in self._by_extension.get(ext, {}).values()]
+        triggered = [filter_ for filter_ in candidates if await filter_.triggered_on(new_ctx)]
         allowed_ext = {filter_.content for filter_ in triggered}  # Get the extensions in the message that are allowed.
 
         # See if there are any extensions left which aren't allowed.
@@ -102,12 +128,12 @@ class ExtensionsList(FilterList[ExtensionFilter]):
                 ctx.dm_embed = TXT_EMBED_DESCRIPTION.format(blocked_extension=txt_extensions.pop())
             else:
                 meta_channel = bot.instance.get_channel(Channels.meta)
-                if not self._whitelisted_description:
-                    self._whitelisted_description = ", ".join(
+                if not self._whitelisted_description or self._whitelisted_description[0] != self.version:
+                    self._whitelisted_description = self.version, ", ".join(
                         filter_.content for filter_ in self[ListType.ALLOW].filters.values()
                     )
                 ctx.dm_embed = DISALLOWED_EMBED_DESCRIPTION.format(
-                    joined_whitelist=self._whitelisted_description,
+                    joined_whitelist=self._whitelisted_description[1],
                     joined_blacklist=", ".join(not_allowed),
                     meta_channel_mention=meta_channel.mention,
                 )
@@ -1,4 +1,5 @@
 import dataclasses
+import re
 import typing
 from abc import ABC, abstractmethod
 from collections import defaultdict
@@ -9,6 +10,7 @@ from functools import reduce
 from typing import Any
 
 import arrow
+from discord import Message
 from discord.ext.commands import BadArgument, Context, Converter
 
 from bot.exts.filtering._filter_context import Event, FilterContext
@@ -93,16 +95,21 @@ class AtomicList:
         passed_by_default, failed_by_default = defaults.validations.evaluate(ctx)
         default_answer = not bool(failed_by_default)
 
+        # Filters usually share their overrides, so each distinct set of overrides is only evaluated once.
+        relevance_by_signature = {}
         relevant_filters = []
         for filter_ in filters:
             if not filter_.validations:
-                if default_answer and await filter_.triggered_on(ctx):
-                    relevant_filters.append(filter_)
+                relevant = default_answer
             else:
-                passed, failed = filter_.validations.evaluate(ctx)
-                if not failed and failed_by_default < passed:
-                    if await filter_.triggered_on(ctx):
-                        relevant_filters.append(filter_)
+                signature = filter_.validations.signature
+                if signature not in relevance_by_signature:
+                    passed, failed = filter_.validations.evaluate(ctx)
+                    relevance_by_signature[signature] = not failed and failed_by_default < passed
+                relevant = relevance_by_signature[signature]
+
+            if relevant and await filter_.triggered_on(ctx):
+                relevant_filters.append(filter_)
 
         if ctx.event == Event.MESSAGE_EDIT and ctx.message and self.list_type == ListType.DENY:
             previously_triggered = ctx.message_cache.get_message_metadata(ctx.message.id)
@@ -166,6 +173,10 @@ class FilterList(dict[ListType, AtomicList], typing.Generic[T], FieldRequiring):
     # Each subclass must define a name matching the filter_list name we're expecting to receive from the database.
     # Names must be unique across all filter lists.
     name = FieldRequiring.MUST_SET_UNIQUE
+    # How long in seconds the list may take to process an event before it's skipped. None means no limit.
+    timeout: float | None = None
+    # Incremented whenever the filters of the list change, so that anything derived from them can tell when it's stale.
+    version: int = 0
 
     _already_warned = set()
 
@@ -190,15 +201,51 @@ class FilterList(dict[ListType, AtomicList], typing.Generic[T], FieldRequiring):
             defaults,
             filters
         )
+        self._on_list_added(list_type)
+        self.version += 1
         return self[list_type]
 
     def add_filter(self, list_type: ListType, filter_data: dict) -> T | None:
-        """Add a filter to the list of the specified type."""
+        """Add a filter to the list of the specified type, replacing any filter with the same ID."""
         new_filter = self._create_filter(filter_data, self[list_type].defaults)
         if new_filter:
-            self[list_type].filters[filter_data["id"]] = new_filter
+            filters = self[list_type].filters
+            old_filter = filters.get(filter_data["id"])
+            filters[filter_data["id"]] = new_filter
+            if old_filter:
+                self._on_filter_removed(list_type, old_filter)
+            self._on_filter_added(list_type, new_filter)
+            self.version += 1
         return new_filter
 
+    def remove_filter(self, list_type: ListType, filter_id: int) -> T:
+        """Remove the filter with the given ID from the list of the specified type."""
+        removed_filter = self[list_type].filters.pop(filter_id)
+        self._on_filter_removed(list_type, removed_filter)
+        self.version += 1
+        return removed_filter
+
+    def message_edited(self, message: Message) -> None:
+        """Update anything the list keeps about a message after it was edited, such as recent messages."""
+
+    def _on_list_added(self, list_type: ListType) -> None:
+        """
+        Rebuild anything derived from the filters of the list of the specified type, after it was added or replaced.
+
+        Lists which keep structures derived from their filters (such as indexes) should build them here, and keep them
+        up to date in `_on_filter_added` and `_on_filter_removed`, so that a single change doesn't require a rebuild.
+        """
+
+    def _on_filter_added(self, list_type: ListType, filter_: T) -> None:
+        """Update anything derived from the filters of the list of the specified type, after a filter was added."""
+
+    def _on_filter_removed(self, list_type: ListType, filter_: T) -> None:
+        """
+        Update anything derived from the filters of the list of the specified type, after a filter was removed.
+
+        When a filter is edited, this is called for the old version after the new one has replaced it in the list.
+        """
+
     @abstractmethod
     def get_filter_type(self, content: str) -> type[T]:
         """Get a subclass of filter matching the filter list and the filter's content."""
@@ -227,6 +274,8 @@ class FilterList(dict[ListType, AtomicList], typing.Generic[T], FieldRequiring):
             return None
         except TypeError as e:
             log.warning(e)
+        except re.error as e:
+            log.warning(f"The pattern of filter {filter_data.get('id')} is invalid, skipping it: {e}")
 
     def __hash__(self):
         return hash(id(self))
@@ -251,9 +300,15 @@ class SubscribingAtomicList(AtomicList):
         dispatched to the subscribed filters.
         """
         for event in events:
-            if filter_ not in self.subscriptions[event]:
+            if filter_.id not in self.subscriptions[event]:
                 self.subscriptions[event].append(filter_.id)
 
+    def unsubscribe(self, filter_: UniqueFilter) -> None:
+        """Unsubscribe a unique filter from all events."""
+        for subscribers in self.subscriptions.values():
+            if filter_.id in subscribers:
+                subscribers.remove(filter_.id)
+
     async def filter_list_result(self, ctx: FilterContext) -> list[Filter]:
         """Sift through the list of filters, and return only the ones which apply to the given context."""
         event_filters = [self.filters[id_] for id_ in self.subscriptions[ctx.event]]
@@ -302,8 +357,22 @@ class UniquesListBase(FilterList[UniqueFilter], ABC):
         new_list.filters.update(filters)
         if hasattr(self.filtering_cog, "subscribe"):  # Subscribe the filter list to any new events found.
             self.filtering_cog.subscribe(self, *events)
+        self._on_list_added(list_type)
+        self.version += 1
         return new_list
 
+    def _on_filter_added(self, list_type: ListType, filter_: UniqueFilter) -> None:
+        """Subscribe the new filter to its events."""
+        self[list_type].subscribe(filter_, *filter_.events)
+        self.loaded_types[filter_.name] = type(filter_)
+        if hasattr(self.filtering_cog, "subscribe"):
+            self.filtering_cog.subscribe(self, *filter_.events)
+
+    def _on_filter_removed(self, list_type: ListType, filter_: UniqueFilter) -> None:
+        """Unsubscribe the removed filter from its events, unless it was replaced by a new version."""
+        if filter_.id not in self[list_type].filters:
+            self[list_type].unsubscribe(filter_)
+
     @property
     def filter_types(self) -> set[type[UniqueFilter]]:
         """Return the types of filters used by this list."""
@@ -1,11 +1,13 @@
 from __future__ import annotations
 
+import asyncio
 import re
+import time
 import typing
+from collections import OrderedDict
 
 from discord import Embed, Invite
 from discord.errors import NotFound
-from pydis_core.utils.regex import DISCORD_INVITE
 
 import bot
 from bot.exts.filtering._filter_context import Event, FilterContext
@@ -13,7 +15,6 @@ from bot.exts.filtering._filter_lists.filter_list import FilterList, ListType
 from bot.exts.filtering._filters.filter import Filter
 from bot.exts.filtering._filters.invite import InviteFilter
 from bot.exts.filtering._settings import ActionSettings
-from bot.exts.filtering._utils import clean_input
 
 if typing.TYPE_CHECKING:
     from bot.exts.filtering.filtering import Filtering
@@ -25,6 +26,64 @@ REFINED_INVITE_CODE = re.compile(
     r"$"                            # Up until the end of the string.
 )
 
+INVITE_CACHE_SIZE = 2_000
+INVITE_TTL = 10 * 60  # How long in seconds to remember a resolved invite.
+INVITE_NOT_FOUND_TTL = 60  # How long in seconds to remember that an invite doesn't exist.
+
+
+class InviteCache:
+    """
+    A bounded cache of invite codes to the invites they resolve to, or None if they don't resolve.
+
+    Resolved and unresolved invites are remembered for different amounts of time, and the least recently used codes are
+    evicted when the cache is full. Concurrent lookups of the same code share a single request to the API.
+    """
+
+    def __init__(
+        self, maxsize: int = INVITE_CACHE_SIZE, ttl: float = INVITE_TTL, not_found_ttl: float = INVITE_NOT_FOUND_TTL
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.not_found_ttl = not_found_ttl
+        self._cache: OrderedDict[str, tuple[float, Invite | None]] = OrderedDict()
+        self._pending: dict[str, asyncio.Task] = {}
+
+    async def fetch(self, code: str) -> Invite | None:
+        """Return the invite the code resolves to, or None if it doesn't exist."""
+        if entry := self._cache.get(code):
+            expires_at, invite = entry
+            if expires_at > time.monotonic():
+                self._cache.move_to_end(code)
+                bot.instance.stats.incr("filters.invite_cache.hit")
+                return invite
+            del self._cache[code]
+
+        if code in self._pending:
+            bot.instance.stats.incr("filters.invite_cache.coalesced")
+        else:
+            bot.instance.stats.incr("filters.invite_cache.miss")
+            self._pending[code] = asyncio.create_task(self._resolve(code))
+        # Shield the shared request, so that one cancelled lookup doesn't cancel the others.
+        return await asyncio.shield(self._pending[code])
+
+    async def _resolve(self, code: str) -> Invite | None:
+        """Fetch the invite from the API and cache the result."""
+        start = time.perf_counter()
+        try:
+            invite = await bot.instance.fetch_invite(code)
+        except NotFound:
+            invite = None
+        finally:
+            self._pending.pop(code, None)
+            bot.instance.stats.timing("filters.invite_cache.fetch_latency", (time.perf_counter() - start) * 1000)
+
+        ttl = self.ttl if invite else self.not_found_ttl
+        self._cache[code] = (time.monotonic() + ttl, invite)
+        self._cache.move_to_end(code)
+        while len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
+        return invite
+
 
 class InviteList(FilterList[InviteFilter]):
     """
@@ -42,10 +101,13 @@ class InviteList(FilterList[InviteFilter]):
     """
 
     name = "invite"
+    # Resolving invites might be held up by rate limits. Resolution continues in the background if the time runs out.
+    timeout = 10
 
     def __init__(self, filtering_cog: Filtering):
         super().__init__()
         filtering_cog.subscribe(self, Event.MESSAGE, Event.MESSAGE_EDIT, Event.SNEKBOX)
+        self.invite_cache = InviteCache()
 
     def get_filter_type(self, content: str) -> type[Filter]:
         """Get a subclass of filter matching the filter list and the filter's content."""
@@ -60,12 +122,7 @@ class InviteList(FilterList[InviteFilter]):
         self, ctx: FilterContext
     ) -> tuple[ActionSettings | None, list[str], dict[ListType, list[Filter]]]:
         """Dispatch the given event to the list's filters, and return actions to take and messages to relay to mods."""
-        text = clean_input(ctx.content)
-
-        # Avoid escape characters
-        text = text.replace("\\", "")
-
-        matches = list(DISCORD_INVITE.finditer(text))
+        matches = ctx.invite_matches
         invite_codes = {m.group("invite") for m in matches}
         if not invite_codes:
             return None, [], {}
@@ -87,17 +144,16 @@ class InviteList(FilterList[InviteFilter]):
         # Sort the invites into two categories:
         invites_for_inspection = dict()  # Found guild invites requiring further inspection.
         unknown_invites = dict()  # Either don't resolve or group DMs.
-        for invite_code in refined_invites.values():
-            try:
-                invite = await bot.instance.fetch_invite(invite_code)
-            except NotFound:
+        distinct_codes = tuple(set(refined_invites.values()))
+        resolved = await asyncio.gather(*(self.invite_cache.fetch(code) for code in distinct_codes))
+        for invite_code, invite in zip(distinct_codes, resolved, strict=True):
+            if invite is None:
                 if check_if_allowed:
                     unknown_invites[invite_code] = None
-            else:
-                if invite.guild:
-                    invites_for_inspection[invite_code] = invite
-                elif check_if_allowed:  # Group DM
-                    unknown_invites[invite_code] = invite
+            elif invite.guild:
+                invites_for_inspection[invite_code] = invite
+            elif check_if_allowed:  # Group DM
+                unknown_invites[invite_code] = invite
 
         # Find any blocked invites
         new_ctx = ctx.replace(content={invite.guild.id for invite in invites_for_inspection.values()})
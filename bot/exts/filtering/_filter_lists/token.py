@@ -8,12 +8,103 @@ from bot.exts.filtering._filter_lists.filter_list import FilterList, ListType
 from bot.exts.filtering._filters.filter import Filter
 from bot.exts.filtering._filters.token import TokenFilter
 from bot.exts.filtering._settings import ActionSettings
-from bot.exts.filtering._utils import clean_input
+from bot.log import get_logger
 
 if typing.TYPE_CHECKING:
     from bot.exts.filtering.filtering import Filtering
 
-SPOILER_RE = re.compile(r"(\|\|.+?\|\|)", re.DOTALL)
+log = get_logger(__name__)
+
+# Group references which would point at the wrong group once the pattern is embedded in a larger one.
+# False positives (such as an escaped backslash followed by a digit) only mean the pattern is checked on its own.
+GROUP_REFERENCE_RE = re.compile(r"\\[1-9]|\\g<|\(\?P=|\(\?\(")
+
+
+class TokenPrefilter:
+    """
+    A single compiled pattern standing in for all the token filters of a list.
+
+    The patterns of the filters are combined into one alternation, so that a single scan of the content is enough to
+    tell whether any of them can match. If the combined pattern doesn't match, none of the filters embedded in it can
+    match either, which is by far the common case. Otherwise, all filters are checked individually as usual, so the
+    semantics of each filter are unchanged.
+
+    Patterns which can't be safely embedded in a larger one (such as ones with global flags or group references) are
+    always checked individually. So are filters added since the pattern was compiled, and the pattern is only
+    recompiled once enough filters changed, so that adding filters one by one doesn't recompile it each time.
+    """
+
+    # The number of changes before the pattern is recompiled, as a fraction of the filters, or at least the minimum.
+    RECOMPILE_RATIO = 0.1
+    MIN_CHANGES_TO_RECOMPILE = 20
+
+    def __init__(self, filters: dict[int, TokenFilter]):
+        self.filters = filters
+        self.standalone: dict[int, TokenFilter] = {}
+        self.pattern = None
+        self._changes = 0
+        self.compile()
+
+    def compile(self) -> None:
+        """Compile the combined pattern from the current filters."""
+        self.standalone = {}
+        self._changes = 0
+
+        combinable = []
+        for filter_ in self.filters.values():
+            if self._is_combinable(filter_):
+                combinable.append(filter_.content)
+            else:
+                self.standalone[filter_.id] = filter_
+
+        self.pattern = None
+        if combinable:
+            try:
+                self.pattern = re.compile("|".join(f"(?:{content})" for content in combinable), flags=re.IGNORECASE)
+            except re.error as e:
+                log.warning(f"Failed to combine the token filters into a single pattern, checking each instead: {e}")
+                self.standalone = dict(self.filters)
+
+    def add(self, filter_: TokenFilter) -> None:
+        """Have a filter which was added to the list checked individually until the pattern is recompiled."""
+        self.standalone[filter_.id] = filter_
+        self._changed()
+
+    def remove(self, filter_: TokenFilter) -> None:
+        """
+        Stop checking a filter which was removed from the list individually.
+
+        Until the pattern is recompiled, it might still match on the filter's pattern, which only means the other
+        filters are checked needlessly.
+        """
+        if self.standalone.get(filter_.id) is filter_:
+            del self.standalone[filter_.id]
+        self._changed()
+
+    def _changed(self) -> None:
+        """Recompile the pattern if enough filters changed since it was last compiled."""
+        self._changes += 1
+        if self._changes >= max(self.MIN_CHANGES_TO_RECOMPILE, len(self.filters) * self.RECOMPILE_RATIO):
+            self.compile()
+
+    @staticmethod
+    def _is_combinable(filter_: TokenFilter) -> bool:
+        """Whether the filter's pattern behaves the same when embedded in a larger alternation."""
+        if filter_.pattern.groupindex:  # Named groups can't be repeated across the alternatives.
+            return False
+        if filter_.pattern.groups and GROUP_REFERENCE_RE.search(filter_.content):
+            return False
+        try:
+            re.compile(f"(?:{filter_.content})")  # Global inline flags must be at the start of the pattern.
+        except re.error:
+            return False
+        return True
+
+    def candidates(self, text: str) -> list[TokenFilter]:
+        """Return the filters which might match the text."""
+        if self.pattern and self.pattern.search(text):
+            return list(self.filters.values())
+        return list(self.standalone.values())
 
 
 class TokensList(FilterList[TokenFilter]):
@@ -35,6 +126,7 @@ class TokensList(FilterList[TokenFilter]):
         filtering_cog.subscribe(
             self, Event.MESSAGE, Event.MESSAGE_EDIT, Event.NICKNAME, Event.THREAD_NAME, Event.SNEKBOX
         )
+        self._prefilter = TokenPrefilter({})
 
     def get_filter_type(self, content: str) -> type[Filter]:
         """Get a subclass of filter matching the filter list and the filter's content."""
@@ -49,15 +141,14 @@ class TokensList(FilterList[TokenFilter]):
         self, ctx: FilterContext
     ) -> tuple[ActionSettings | None, list[str], dict[ListType, list[Filter]]]:
         """Dispatch the given event to the list's filters, and return actions to take and messages to relay to mods."""
-        text = ctx.content
-        if not text:
+        if not ctx.content:
             return None, [], {}
-        if SPOILER_RE.search(text):
-            text = self._expand_spoilers(text)
-        text = clean_input(text)
+        text = ctx.expanded_content
         ctx = ctx.replace(content=text)
 
-        triggers = await self[ListType.DENY].filter_list_result(ctx)
+        sublist = self[ListType.DENY]
+        # The prefilter leaves out filters which certainly don't match, the rest are evaluated as usual.
+        triggers = await sublist._create_filter_list_result(ctx, sublist.defaults, self._prefilter.candidates(text))
         actions = None
         messages = []
         if triggers:
@@ -65,10 +156,17 @@ class TokensList(FilterList[TokenFilter]):
             messages = self[ListType.DENY].format_messages(triggers)
         return actions, messages, {ListType.DENY: triggers}
 
-    @staticmethod
-    def _expand_spoilers(text: str) -> str:
-        """Return a string containing all interpretations of a spoilered message."""
-        split_text = SPOILER_RE.split(text)
-        return "".join(
-            split_text[0::2] + split_text[1::2] + split_text
-        )
+    def _on_list_added(self, list_type: ListType) -> None:
+        """Compile the prefilter for the filters of the deny list."""
+        if list_type == ListType.DENY:
+            self._prefilter = TokenPrefilter(self[ListType.DENY].filters)
+
+    def _on_filter_added(self, list_type: ListType, filter_: TokenFilter) -> None:
+        """Add the filter to the prefilter."""
+        if list_type == ListType.DENY:
+            self._prefilter.add(filter_)
+
+    def _on_filter_removed(self, list_type: ListType, filter_: TokenFilter) -> None:
+        """Remove the filter from the prefilter."""
+        if list_type == ListType.DENY:
+            self._prefilter.remove(filter_)
@@ -0,0 +1,189 @@
+import re
+from collections import deque
+from datetime import datetime, timedelta
+from functools import cached_property
+
+import arrow
+from discord import DeletedReferencedMessage, Member, Message, MessageType, NotFound, User
+from emoji import demojize
+from pydis_core.utils.logging import get_logger
+
+import bot
+
+log = get_logger(__name__)
+
+DISCORD_EMOJI_RE = re.compile(r"<:\w+:\d+>|:\w+:")
+CODE_BLOCK_RE = re.compile(r"```.*?```", flags=re.DOTALL)
+LINK_RE = re.compile(r"(https?://\S+)")
+NEWLINES = re.compile(r"(\n+)")
+
+
+class MessageFeatures:
+    """
+    A message along with the quantities the antispam rules look for in it.
+
+    Each quantity is computed on first use and then remembered, so that a message is only processed once no matter how
+    many rules look at it, and how many later messages it's relevant for.
+    """
+
+    def __init__(self, message: Message):
+        self.message = message
+        self._mentions: int | None = None
+
+    @property
+    def created_at(self) -> datetime:
+        """When the message was sent."""
+        return self.message.created_at
+
+    @property
+    def content(self) -> str:
+        """The content of the message."""
+        return self.message.content
+
+    @cached_property
+    def chars(self) -> int:
+        """The number of characters in the message."""
+        return len(self.message.content)
+
+    @cached_property
+    def attachments(self) -> int:
+        """The number of attachments in the message."""
+        return len(self.message.attachments)
+
+    @cached_property
+    def role_mentions(self) -> int:
+        """The number of roles mentioned in the message."""
+        return len(self.message.role_mentions)
+
+    @cached_property
+    def emojis(self) -> int:
+        """The number of emojis in the message outside of code blocks."""
+        # Convert Unicode emojis to :emoji: format to get their count.
+        return len(DISCORD_EMOJI_RE.findall(demojize(CODE_BLOCK_RE.sub("", self.message.content))))
+
+    @cached_property
+    def links(self) -> int:
+        """The number of links in the message."""
+        return len(LINK_RE.findall(self.message.content))
+
+    @cached_property
+    def newline_groups(self) -> list[int]:
+        """The sizes of the groups of consecutive newlines in the message."""
+        return [len(group) for group in NEWLINES.findall(self.message.content)]
+
+    def update(self, message: Message) -> None:
+        """Replace the message with its edited version, forgetting the quantities computed for the previous one."""
+        self.message = message
+        self._mentions = None
+        for name, attribute in vars(type(self)).items():
+            if isinstance(attribute, cached_property):
+                self.__dict__.pop(name, None)
+
+    async def mentions(self) -> int:
+        """
+        The number of users mentioned in the message, excluding bots, the author, and the user replied to.
+
+        In very rare cases, may not be able to determine a mention was to a reply, in which case it is not ignored.
+        """
+        if self._mentions is not None:
+            return self._mentions
+
+        # We use `msg.mentions` here as that is supplied by the api itself, to determine who was mentioned.
+        # Additionally, `msg.mentions` includes the user replied to, even if the mention doesn't occur in the body.
+        # In order to exclude users who are mentioned as a reply, we check if the msg has a reference
+        #
+        # While we could use regex to parse the message content, and get a list of
+        # the mentions, that solution is very prone to breaking.
+        # We would need to deal with codeblocks, escaping markdown, and any discrepancies between
+        # our implementation and discord's Markdown parser which would cause false positives or false negatives.
+        msg = self.message
+        # We check if the message is a reply, and if it is try to get the author
+        # since we ignore mentions of a user that we're replying to
+        reply_author = None
+
+        if msg.type == MessageType.reply:
+            ref = msg.reference
+
+            if not (resolved := ref.resolved):
+                # It is possible, in a very unusual situation, for a message to have a reference
+                # that is both not in the cache, and deleted while running this function.
+                # In such a situation, this will throw an error which we catch.
+                try:
+                    resolved = await bot.instance.get_partial_messageable(ref.channel_id).fetch_message(
+                        ref.message_id
+                    )
+                except NotFound:
+                    log.info("Could not fetch the reference message as it has been deleted.")
+
+            if resolved and not isinstance(resolved, DeletedReferencedMessage):
+                reply_author = resolved.author
+
+        # Don't count bot or self mentions, or the user being replied to (if applicable)
+        self._mentions = sum(
+            1 for user in msg.mentions if not user.bot and user not in {msg.author, reply_author}
+        )
+        return self._mentions
+
+
+class AuthorWindow:
+    """The recent messages of a single author, newest first."""
+
+    def __init__(self, messages: list[MessageFeatures]):
+        self._messages = messages
+
+    def since(self, interval: int) -> list[MessageFeatures]:
+        """Return the messages sent in the last `interval` seconds."""
+        earliest_relevant_at = arrow.utcnow() - timedelta(seconds=interval)
+        relevant = []
+        for features in self._messages:
+            if features.created_at <= earliest_relevant_at:
+                break
+            relevant.append(features)
+        return relevant
+
+
+class AntispamWindow:
+    """
+    A sliding window of recent messages, indexed by author.
+
+    Messages are evicted once they're older than the longest interval any rule looks at, so each rule only ever goes
+    over the messages of the author in question, rather than over all recently cached messages.
+    """
+
+    def __init__(self):
+        self._by_author: dict[int, deque[MessageFeatures]] = {}
+        # All messages in the order they were added, used for evicting old messages across all authors.
+        self._timeline: deque[tuple[int, MessageFeatures]] = deque()
+
+    def add(self, message: Message) -> None:
+        """Add a newly sent message to the window."""
+        features = MessageFeatures(message)
+        self._by_author.setdefault(message.author.id, deque()).appendleft(features)
+        self._timeline.append((message.author.id, features))
+
+    def update(self, message: Message) -> None:
+        """Replace a message in the window with its edited version, if it's there."""
+        for features in self._by_author.get(message.author.id, ()):
+            if features.message.id == message.id:
+                features.update(message)
+                return
+
+    def evict(self, max_interval: int) -> None:
+        """Remove any messages sent more than `max_interval` seconds ago."""
+        earliest_relevant_at = arrow.utcnow() - timedelta(seconds=max_interval)
+        while self._timeline and self._timeline[0][1].created_at <= earliest_relevant_at:
+            author_id, features = self._timeline.popleft()
+            author_messages = self._by_author[author_id]
+            if author_messages[-1] is features:  # Almost always the case, as messages arrive in order.
+                author_messages.pop()
+            else:
+                author_messages.remove(features)
+            if not author_messages:
+                del self._by_author[author_id]
+
+    def for_author(self, author: User | Member) -> AuthorWindow:
+        """Return the messages of the author which are currently in the window."""
+        return AuthorWindow(list(self._by_author.get(author.id, ())))
+
+    def __len__(self) -> int:
+        return len(self._timeline)
@@ -1,8 +1,5 @@
-from datetime import timedelta
-from itertools import takewhile
 from typing import ClassVar
 
-import arrow
 from pydantic import BaseModel
 
 from bot.exts.filtering._filter_context import Event, FilterContext
@@ -30,12 +27,10 @@ class BurstFilter(UniqueFilter):
 
     async def triggered_on(self, ctx: FilterContext) -> bool:
         """Search for the filter's content within a given context."""
-        earliest_relevant_at = arrow.utcnow() - timedelta(seconds=self.extra_fields.interval)
-        relevant_messages = list(takewhile(lambda msg: msg.created_at > earliest_relevant_at, ctx.content))
+        relevant_messages = ctx.content.since(self.extra_fields.interval)
 
-        detected_messages = {msg for msg in relevant_messages if msg.author == ctx.author}
-        if len(detected_messages) > self.extra_fields.threshold:
-            ctx.related_messages |= detected_messages
-            ctx.filter_info[self] = f"sent {len(detected_messages)} messages"
+        if len(relevant_messages) > self.extra_fields.threshold:
+            ctx.related_messages |= {features.message for features in relevant_messages}
+            ctx.filter_info[self] = f"sent {len(relevant_messages)} messages"
             return True
         return False
@@ -1,8 +1,5 @@
-from datetime import timedelta
-from itertools import takewhile
 from typing import ClassVar
 
-import arrow
 from pydantic import BaseModel
 
 from bot.exts.filtering._filter_context import Event, FilterContext
@@ -30,12 +27,11 @@ class DuplicatesFilter(UniqueFilter):
 
     async def triggered_on(self, ctx: FilterContext) -> bool:
         """Search for the filter's content within a given context."""
-        earliest_relevant_at = arrow.utcnow() - timedelta(seconds=self.extra_fields.interval)
-        relevant_messages = list(takewhile(lambda msg: msg.created_at > earliest_relevant_at, ctx.content))
+        relevant_messages = ctx.content.since(self.extra_fields.interval)
 
         detected_messages = {
-            msg for msg in relevant_messages
-            if msg.author == ctx.author and msg.content == ctx.message.content and msg.content
+            features.message for features in relevant_messages
+            if features.content and features.content == ctx.message.content
         }
         if len(detected_messages) > self.extra_fields.threshold:
             ctx.related_messages |= detected_messages
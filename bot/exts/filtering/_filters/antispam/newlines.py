@@ -1,16 +1,10 @@
-import re
-from datetime import timedelta
-from itertools import takewhile
 from typing import ClassVar
 
-import arrow
 from pydantic import BaseModel
 
 from bot.exts.filtering._filter_context import Event, FilterContext
 from bot.exts.filtering._filters.filter import UniqueFilter
 
-NEWLINES = re.compile(r"(\n+)")
-
 
 class ExtraNewlinesSettings(BaseModel):
     """Extra settings for when to trigger the antispam rule."""
@@ -37,25 +31,23 @@ class NewlinesFilter(UniqueFilter):
 
     async def triggered_on(self, ctx: FilterContext) -> bool:
         """Search for the filter's content within a given context."""
-        earliest_relevant_at = arrow.utcnow() - timedelta(seconds=self.extra_fields.interval)
-        relevant_messages = list(takewhile(lambda msg: msg.created_at > earliest_relevant_at, ctx.content))
-        detected_messages = {msg for msg in relevant_messages if msg.author == ctx.author}
+        relevant_messages = ctx.content.since(self.extra_fields.interval)
 
         # Identify groups of newline characters and get group & total counts
         newline_counts = []
-        for msg in detected_messages:
-            newline_counts += [len(group) for group in NEWLINES.findall(msg.content)]
+        for features in relevant_messages:
+            newline_counts += features.newline_groups
         total_recent_newlines = sum(newline_counts)
         # Get maximum newline group size
         max_newline_group = max(newline_counts, default=0)
 
         # Check first for total newlines, if this passes then check for large groupings
         if total_recent_newlines > self.extra_fields.threshold:
-            ctx.related_messages |= detected_messages
+            ctx.related_messages |= {features.message for features in relevant_messages}
             ctx.filter_info[self] = f"sent {total_recent_newlines} newlines"
             return True
         if max_newline_group > self.extra_fields.consecutive_threshold:
-            ctx.related_messages |= detected_messages
+            ctx.related_messages |= {features.message for features in relevant_messages}
             ctx.filter_info[self] = f"sent {max_newline_group} consecutive newlines"
             return True
         return False
@@ -1,8 +1,5 @@
-from datetime import timedelta
-from itertools import takewhile
 from typing import ClassVar
 
-import arrow
 from pydantic import BaseModel
 
 from bot.exts.filtering._filter_context import Event, FilterContext
@@ -30,13 +27,11 @@ class RoleMentionsFilter(UniqueFilter):
 
     async def triggered_on(self, ctx: FilterContext) -> bool:
         """Search for the filter's content within a given context."""
-        earliest_relevant_at = arrow.utcnow() - timedelta(seconds=self.extra_fields.interval)
-        relevant_messages = list(takewhile(lambda msg: msg.created_at > earliest_relevant_at, ctx.content))
-        detected_messages = {msg for msg in relevant_messages if msg.author == ctx.author}
-        total_recent_mentions = sum(len(msg.role_mentions) for msg in detected_messages)
+        relevant_messages = ctx.content.since(self.extra_fields.interval)
+        total_recent_mentions = sum(features.role_mentions for features in relevant_messages)
 
         if total_recent_mentions > self.extra_fields.threshold:
-            ctx.related_messages |= detected_messages
+            ctx.related_messages |= {features.message for features in relevant_messages}
             ctx.filter_info[self] = f"sent {total_recent_mentions} role mentions"
             return True
         return False
@@ -1,4 +1,5 @@
 import re
+from functools import lru_cache
 from typing import ClassVar
 from urllib.parse import urlparse
 
@@ -8,10 +9,17 @@ from pydantic import BaseModel
 
 from bot.exts.filtering._filter_context import FilterContext
 from bot.exts.filtering._filters.filter import Filter
+from bot.exts.filtering._settings import Defaults
 
 URL_RE = re.compile(r"(?:https?://)?(\S+?)[\\/]*", flags=re.IGNORECASE)
 
 
+@lru_cache(maxsize=4096)
+def extract_domain(url: str) -> tldextract.tldextract.ExtractResult:
+    """Split the URL into its subdomain, domain and suffix. Cached since the same URL is checked by several filters."""
+    return tldextract.extract(url)
+
+
 class ExtraDomainSettings(BaseModel):
     """Extra settings for how domains should be matched in a message."""
 
@@ -34,13 +42,15 @@ class DomainFilter(Filter):
     name = "domain"
     extra_fields_type = ExtraDomainSettings
 
+    def __init__(self, filter_data: dict, defaults: Defaults | None = None):
+        super().__init__(filter_data, defaults)
+        self.registered_domain = extract_domain(self.content).registered_domain.lower()
+
     async def triggered_on(self, ctx: FilterContext) -> bool:
         """Searches for a domain within a given context."""
-        domain = tldextract.extract(self.content).registered_domain.lower()
-
         for found_url in ctx.content:
-            extract = tldextract.extract(found_url)
-            if self.content.lower() in found_url and extract.registered_domain == domain:
+            extract = extract_domain(found_url)
+            if self.content.lower() in found_url and extract.registered_domain == self.registered_domain:
                 if self.extra_fields.only_subdomains:
                     if not extract.subdomain and not urlparse(f"https://{found_url}").path:
                         return False
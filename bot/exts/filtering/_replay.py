@@ -0,0 +1,260 @@
+"""
+Replay recorded messages through the filter lists, without connecting to Discord or to the site.
+
+Usage:
+    python -m bot.exts.filtering._replay FILTER_LISTS MESSAGES [--lists NAME [NAME ...]] [--repeat N]
+
+FILTER_LISTS is a JSON dump of the `bot/filter/filter_lists` endpoint.
+MESSAGES is a JSONL file with a message on each line. All keys except `content` are optional:
+    content: The content of the message.
+    author_id: The ID of the author.
+    author_roles: The roles of the author, each either a role ID or a role name.
+    channel_id, channel_name, category_id, category_name: Where the message was sent. No `channel_id` means a DM.
+    attachments: The file names of the attachments of the message.
+
+Invites aren't resolved, so they're all treated as unknown. Every message is considered as sent at the moment it's
+replayed, so the antispam rules see the corpus as one burst; use `--lists` to leave them out if that isn't wanted.
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from collections import Counter, defaultdict
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from pathlib import Path
+from types import SimpleNamespace
+
+from discord import Member, MessageType, NotFound
+
+import bot
+from bot.exts.filtering._filter_context import Event, FilterContext
+from bot.exts.filtering.filtering import Filtering
+
+LIST_LATENCY_PREFIX = "filters.list_latency."
+
+
+class Stub(SimpleNamespace):
+    """An object with the given attributes, which like a Discord object is hashable and compared by identity."""
+
+    __eq__ = object.__eq__
+    __hash__ = object.__hash__
+
+
+class ReplayMember(Member):
+    """
+    The author of a recorded message.
+
+    The validations check for members, and a real one can't be built without a guild, so only what the filters look at
+    is set on top of the user it's equivalent to.
+    """
+
+    def __init__(self, id_: int, roles: list[Stub]):
+        self._user = Stub(id=id_, name=str(id_), global_name=None, bot=False)
+        self._replay_roles = roles
+        self.nick = None
+        self.guild = None
+
+    @property
+    def roles(self) -> list[Stub]:
+        """Return the roles from the recorded message."""
+        return self._replay_roles
+
+    @property
+    def display_name(self) -> str:
+        """Return the name of the member, which is their ID."""
+        return self.name
+
+    @property
+    def mention(self) -> str:
+        """Return a string that allows you to mention the member."""
+        return f"<@{self.id}>"
+
+
+class ReplayStats:
+    """Collects the stats reported while replaying, instead of sending them to statsd."""
+
+    def __init__(self):
+        self.counters: Counter[str] = Counter()
+        self.timings: defaultdict[str, list[float]] = defaultdict(list)
+
+    def incr(self, stat: str, count: int = 1, rate: float = 1) -> None:
+        """Increment a counter."""
+        self.counters[stat] += count
+
+    def timing(self, stat: str, delta: float, rate: float = 1) -> None:
+        """Record a timing, in milliseconds."""
+        self.timings[stat].append(delta)
+
+    def gauge(self, stat: str, value: float, rate: float = 1, delta: bool = False) -> None:
+        """Gauges aren't relevant for a replay."""
+
+
+class ReplayBot:
+    """Stands in for the bot, with anything which would reach out to Discord answering as if nothing was found."""
+
+    def __init__(self):
+        self.stats = ReplayStats()
+
+    async def fetch_invite(self, code: str) -> None:
+        """Treat every invite as unknown."""
+        raise NotFound(Stub(status=404, reason="Not Found"), "Unknown Invite")
+
+    def get_channel(self, channel_id: int) -> Stub:
+        """Return a channel which can only be mentioned."""
+        return Stub(id=channel_id, mention=f"<#{channel_id}>")
+
+    def get_cog(self, name: str) -> None:
+        """No other cogs are loaded."""
+
+    def get_guild(self, guild_id: int) -> None:
+        """The bot isn't in any guilds."""
+
+
+@dataclass
+class ReplayReport:
+    """The results of a replay."""
+
+    messages: int = 0
+    elapsed: float = 0
+    list_latencies: dict[str, list[float]] = field(default_factory=dict)
+    triggers: Counter[tuple[str, int, str]] = field(default_factory=Counter)
+
+    @property
+    def throughput(self) -> float:
+        """The number of messages replayed per second."""
+        return self.messages / self.elapsed if self.elapsed else 0
+
+    def format(self) -> str:
+        """Return a human-readable summary of the report."""
+        lines = [f"Replayed {self.messages} messages in {self.elapsed:.2f}s ({self.throughput:.1f} messages/s).", ""]
+
+        lines.append("Latency per filter list (ms):")
+        for list_name, samples in sorted(self.list_latencies.items()):
+            p50, p99 = _percentiles(samples)
+            lines.append(f"    {list_name:<20} p50 {p50:8.3f}    p99 {p99:8.3f}    ({len(samples)} samples)")
+
+        lines.extend(("", "Triggers per filter:"))
+        if not self.triggers:
+            lines.append("    None")
+        for (list_label, filter_id, content), count in self.triggers.most_common():
+            lines.append(f"    {count:>6}  {list_label} #{filter_id}: {content}")
+        return "\n".join(lines)
+
+
+def _percentiles(samples: list[float]) -> tuple[float, float]:
+    """Return the 50th and 99th percentiles of the samples."""
+    if len(samples) == 1:
+        return samples[0], samples[0]
+    cut_points = statistics.quantiles(samples, n=100, method="inclusive")
+    return cut_points[49], cut_points[98]
+
+
+def _build_message(record: dict, message_id: int) -> Stub:
+    """Build a message with just enough of the attributes of a Discord message for the filters to look at."""
+    roles = []
+    for role in record.get("author_roles", []):
+        if isinstance(role, int):
+            roles.append(Stub(id=role, name=""))
+        else:
+            roles.append(Stub(id=None, name=role))
+
+    author = ReplayMember(record.get("author_id", 0), roles)
+
+    if (channel_id := record.get("channel_id")) is None:
+        channel = Stub(id=0, guild=None)
+    else:
+        category = None
+        if (category_id := record.get("category_id")) is not None:
+            category = Stub(id=category_id, name=record.get("category_name", ""))
+        channel = Stub(
+            id=channel_id,
+            name=record.get("channel_name", ""),
+            category=category,
+            guild=Stub(id=0),
+            mention=f"<#{channel_id}>",
+        )
+
+    attachments = [
+        Stub(filename=filename, url=f"https://cdn.discordapp.com/attachments/{message_id}/{filename}")
+        for filename in record.get("attachments", [])
+    ]
+    return Stub(
+        id=message_id,
+        type=MessageType.default,
+        content=record.get("content", ""),
+        author=author,
+        channel=channel,
+        attachments=attachments,
+        embeds=[],
+        mentions=[],
+        role_mentions=[],
+        reference=None,
+        webhook_id=None,
+        created_at=datetime.now(UTC),
+        jump_url=f"https://discord.com/channels/0/{channel.id}/{message_id}",
+    )
+
+
+def load_cog(filter_lists: Iterable[dict], list_names: Iterable[str] | None = None) -> Filtering:
+    """Return a filtering cog with the given filter lists loaded, and only the named ones subscribed if provided."""
+    bot.instance = ReplayBot()
+    cog = Filtering(bot.instance)
+    for raw_filter_list in filter_lists:
+        cog._load_raw_filter_list(raw_filter_list)
+
+    if list_names is not None:
+        list_names = set(list_names)
+        for name, filter_list in cog.filter_lists.items():
+            if name not in list_names:
+                cog.unsubscribe(filter_list, *Event)
+    return cog
+
+
+async def replay(cog: Filtering, records: Iterable[dict]) -> ReplayReport:
+    """Replay the recorded messages through the cog's filter lists, and report how it went."""
+    report = ReplayReport()
+    start = time.perf_counter()
+    for message_id, record in enumerate(records, start=1):
+        message = _build_message(record, message_id)
+        cog.message_cache.append(message)
+        ctx = FilterContext.from_message(Event.MESSAGE, message, None, cog.message_cache)
+        _, _, triggers = await cog._resolve_action(ctx)
+        for atomic_list, filters in triggers.items():
+            for filter_ in filters:
+                report.triggers[(atomic_list.label, filter_.id, filter_.content)] += 1
+        report.messages += 1
+    report.elapsed = time.perf_counter() - start
+
+    report.list_latencies = {
+        stat.removeprefix(LIST_LATENCY_PREFIX): samples
+        for stat, samples in cog.bot.stats.timings.items()
+        if stat.startswith(LIST_LATENCY_PREFIX)
+    }
+    return report
+
+
+def main() -> None:
+    """Run the replay from the command line."""
+    parser = argparse.ArgumentParser(description="Replay recorded messages through the filter lists.")
+    parser.add_argument("filter_lists", type=Path, help="A JSON dump of the filter lists.")
+    parser.add_argument("messages", type=Path, help="A JSONL file of recorded messages.")
+    parser.add_argument("--lists", nargs="+", metavar="NAME", help="Only replay through the named filter lists.")
+    parser.add_argument("--repeat", type=int, default=1, help="How many times to replay the messages.")
+    args = parser.parse_args()
+
+    filter_lists = json.loads(args.filter_lists.read_text(encoding="utf-8"))
+    with args.messages.open(encoding="utf-8") as f:
+        records = [json.loads(line) for line in f if line.strip()]
+
+    cog = load_cog(filter_lists, args.lists)
+    report = asyncio.run(replay(cog, records * args.repeat))
+    sys.stdout.write(report.format() + "\n")
+
+
+if __name__ == "__main__":
+    main()
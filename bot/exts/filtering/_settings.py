@@ -3,8 +3,9 @@ from __future__ import annotations
 import operator
 import traceback
 from abc import abstractmethod
+from collections import OrderedDict
 from copy import copy
-from functools import reduce
+from functools import cached_property, reduce
 from typing import Any, NamedTuple, Self, TypeVar
 
 from bot.exts.filtering._filter_context import FilterContext
@@ -21,6 +22,21 @@ _already_warned: set[str] = set()
 
 T = TypeVar("T", bound=SettingsEntry)
 
+EVALUATION_CACHE_SIZE = 10_000
+# Maps a validation signature and a context scope to the names of the validations which passed and failed.
+_evaluation_cache: OrderedDict[tuple, tuple[frozenset[str], frozenset[str]]] = OrderedDict()
+
+
+def _freeze(value: Any) -> Any:
+    """Convert a setting value into a hashable form which compares equal for equal values."""
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, set | frozenset):
+        return frozenset(_freeze(item) for item in value)
+    if isinstance(value, list | tuple):
+        return tuple(_freeze(item) for item in value)
+    return value
+
 
 def create_settings(
     settings_data: dict, *, defaults: Defaults | None = None, keep_empty: bool = False
@@ -147,8 +163,24 @@ class ValidationSettings(Settings[ValidationEntry]):
     def __init__(self, settings_data: dict, *, defaults: Settings | None = None, keep_empty: bool = False):
         super().__init__(settings_data, defaults=defaults, keep_empty=keep_empty)
 
-    def evaluate(self, ctx: FilterContext) -> tuple[set[str], set[str]]:
+    @cached_property
+    def signature(self) -> tuple:
+        """
+        A hashable representation of the validations, equal for any two collections which would evaluate the same.
+
+        Filters with the same signature can share a single evaluation.
+        """
+        return tuple(sorted(
+            (name, _freeze(validation.model_dump())) for name, validation in self.items() if validation
+        ))
+
+    def evaluate(self, ctx: FilterContext) -> tuple[frozenset[str], frozenset[str]]:
         """Evaluates for each setting whether the context is relevant to the filter."""
+        key = (self.signature, ctx.scope)
+        if (result := _evaluation_cache.get(key)) is not None:
+            _evaluation_cache.move_to_end(key)
+            return result
+
         passed = set()
         failed = set()
 
@@ -159,7 +191,10 @@ class ValidationSettings(Settings[ValidationEntry]):
                 else:
                     failed.add(name)
 
-        return passed, failed
+        result = _evaluation_cache[key] = frozenset(passed), frozenset(failed)
+        if len(_evaluation_cache) > EVALUATION_CACHE_SIZE:
+            _evaluation_cache.popitem(last=False)
+        return result
 
 
 class ActionSettings(Settings[ActionEntry]):
@@ -1,7 +1,11 @@
-from collections import defaultdict
+import asyncio
+import time
+from collections import OrderedDict, defaultdict
+from collections.abc import Iterable
+from itertools import batched
 from typing import ClassVar, Self
 
-from discord import Message, Thread
+from discord import Message, TextChannel, Thread, VoiceChannel
 from discord.errors import HTTPException
 from pydis_core.utils import scheduling
 from pydis_core.utils.logging import get_logger
@@ -21,14 +25,164 @@ SUPERSTAR_REASON = (
 )
 
 
+# How long to wait for more messages to delete, once other contexts requested deletions while earlier ones were made.
+DELETION_WINDOW = 0.05
+# The most messages which can be deleted in a single request.
+BULK_DELETE_LIMIT = 100
+DELETE_REQUESTS_PER_SECOND = 10
+# How many deletion outcomes to remember, for messages which are requested again by other contexts.
+DELETION_OUTCOMES_SIZE = 10_000
+
+
 async def upload_messages_attachments(ctx: FilterContext, messages: list[Message]) -> None:
     """Re-upload the messages' attachments for future logging."""
     if not messages:
         return
     destination = messages[0].guild.get_channel(Channels.attachment_log)
-    for message in messages:
-        if message.attachments and message.id not in ctx.uploaded_attachments:
-            ctx.uploaded_attachments[message.id] = await send_attachments(message, destination, link_large=False)
+    to_upload = [
+        message for message in messages if message.attachments and message.id not in ctx.uploaded_attachments
+    ]
+    results = await asyncio.gather(
+        *(send_attachments(message, destination, link_large=False) for message in to_upload),
+        return_exceptions=True,
+    )
+    for message, result in zip(to_upload, results, strict=True):
+        if isinstance(result, Exception):
+            log.error(f"Failed to upload the attachments of message {message.id}.", exc_info=result)
+        else:
+            ctx.uploaded_attachments[message.id] = result
+
+
+class TokenBucket:
+    """Spaces out requests to a steady rate, while allowing short bursts."""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+
+    async def acquire(self) -> None:
+        """Wait until a request can be made."""
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        # Take the token right away, and wait until it would have been refilled if there wasn't one.
+        self._tokens -= 1
+        if self._tokens < 0:
+            await asyncio.sleep(-self._tokens / self.rate)
+
+
+class DeletionScheduler:
+    """
+    Deletes messages on behalf of all filter contexts, coalescing the requests made while others are being deleted.
+
+    Messages are deleted right away when no other deletions are being made. During a raid many contexts overlap,
+    each asking to delete largely the same messages; instead of each context deleting its messages channel by channel,
+    the messages requested while earlier ones are being deleted are collected for a short window, deduplicated,
+    and deleted with as few bulk deletions as possible. The deletions in different channels are made concurrently,
+    limited by a token bucket so as not to run into Discord's rate limits.
+    """
+
+    def __init__(self, window: float = DELETION_WINDOW, bucket: TokenBucket | None = None):
+        self.window = window
+        self.bucket = bucket or TokenBucket(DELETE_REQUESTS_PER_SECOND, DELETE_REQUESTS_PER_SECOND)
+        # Messages which are waiting for the deletions being made to finish.
+        self._pending: dict[int, Message] = {}
+        # The outcome of every pending or in-flight deletion, by message ID.
+        self._outcomes: dict[int, asyncio.Future[bool]] = {}
+        # The outcomes of finished deletions, so that a message which was already deleted isn't deleted again.
+        self._finished: OrderedDict[int, bool] = OrderedDict()
+        self._flush_task: asyncio.Task | None = None
+
+    async def delete(self, messages: Iterable[Message]) -> tuple[list[Message], list[Message]]:
+        """Delete the messages along with any others requested soon after, and return the deleted and failed ones."""
+        outcomes = {}
+        for message in messages:
+            if self._finished.get(message.id):
+                outcomes[message] = True
+            elif message.id in self._outcomes:
+                outcomes[message] = self._outcomes[message.id]
+            else:
+                outcomes[message] = self._outcomes[message.id] = asyncio.get_running_loop().create_future()
+                self._pending[message.id] = message
+
+        if self._pending and not self._flush_task:
+            self._start_flush()
+
+        deleted = []
+        failed = []
+        for message, outcome in outcomes.items():
+            # The outcome is shared with other contexts, and shouldn't be cancelled with this one.
+            if outcome is True or await asyncio.shield(outcome):
+                deleted.append(message)
+            else:
+                failed.append(message)
+        return deleted, failed
+
+    def _start_flush(self) -> None:
+        """Start deleting the pending messages."""
+        self._flush_task = scheduling.create_task(self._flush_pending())
+        self._flush_task.add_done_callback(self._flush_done)
+
+    def _flush_done(self, task: asyncio.Task) -> None:
+        """Clean up after the deletions, starting them again for messages requested after they finished."""
+        self._flush_task = None
+        if task.cancelled() or task.exception():
+            # The deletions which weren't made won't be, so they're resolved as failed for no context to hang on them.
+            for message_id in list(self._outcomes):
+                self._resolve(message_id, success=False)
+            self._pending.clear()
+        elif self._pending:
+            self._start_flush()
+
+    async def _flush_pending(self) -> None:
+        """Delete the pending messages, then the messages requested meanwhile, until none are left."""
+        while self._pending:
+            pending, self._pending = self._pending, {}
+            await self._delete_pending(pending)
+            if self._pending:
+                # Other contexts asked for deletions while these were made, as happens during a raid.
+                # Give the rest of them a moment to come in, so that they're deleted together.
+                await asyncio.sleep(self.window)
+
+    async def _delete_pending(self, pending: dict[int, Message]) -> None:
+        """Delete the messages, with as few requests as possible."""
+        channel_messages = defaultdict(list)
+        for message in pending.values():
+            channel_messages[message.channel].append(message)
+        log.trace(f"Deleting {len(pending)} messages in {len(channel_messages)} channels.")
+        await asyncio.gather(*(
+            self._delete_batch(channel, batch)
+            for channel, messages in channel_messages.items()
+            for batch in batched(messages, BULK_DELETE_LIMIT)
+        ))
+
+    async def _delete_batch(self, channel: TextChannel | Thread | VoiceChannel, messages: tuple[Message, ...]) -> None:
+        """Delete a batch of messages from the channel, and resolve their outcomes."""
+        success = False
+        try:
+            await self.bucket.acquire()
+            await channel.delete_messages(messages)
+            success = True
+        except HTTPException:
+            pass
+        finally:
+            for message in messages:
+                self._resolve(message.id, success=success)
+
+    def _resolve(self, message_id: int, *, success: bool) -> None:
+        """Resolve the outcome of the message's deletion, if it wasn't already, and remember it."""
+        if (outcome := self._outcomes.pop(message_id, None)) is None:
+            return
+        outcome.set_result(success)
+        self._finished[message_id] = success
+        self._finished.move_to_end(message_id)
+        while len(self._finished) > DELETION_OUTCOMES_SIZE:
+            self._finished.popitem(last=False)
+
+
+deletion_scheduler = DeletionScheduler()
 
 
 class RemoveContext(ActionEntry):
@@ -62,20 +216,8 @@ class RemoveContext(ActionEntry):
 
         # If deletion somehow fails at least this will allow scheduling for deletion.
         ctx.messages_deletion = True
-        channel_messages = defaultdict(set)  # Duplicates will cause batch deletion to fail.
-        for message in {ctx.message} | ctx.related_messages:
-            channel_messages[message.channel].add(message)
-
-        success = fail = 0
-        deleted = list()
-        for channel, messages in channel_messages.items():
-            try:
-                await channel.delete_messages(messages)
-            except HTTPException:
-                fail += len(messages)
-            else:
-                success += len(messages)
-                deleted.extend(messages)
+        deleted, failed = await deletion_scheduler.delete({ctx.message} | ctx.related_messages)
+        success, fail = len(deleted), len(failed)
         scheduling.create_task(upload_messages_attachments(ctx, deleted))
 
         if not fail:
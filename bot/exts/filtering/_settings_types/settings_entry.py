@@ -67,7 +67,12 @@ class ValidationEntry(SettingsEntry):
 
     @abstractmethod
     def triggers_on(self, ctx: FilterContext) -> bool:
-        """Return whether the filter should be triggered with this setting in the given context."""
+        """
+        Return whether the filter should be triggered with this setting in the given context.
+
+        The result may only depend on the setting's values and on what's summarised in `ctx.scope`, since it's reused
+        for other contexts with the same scope.
+        """
         ...
 
 
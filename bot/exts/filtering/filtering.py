@@ -1,8 +1,9 @@
+import asyncio
 import datetime
 import io
 import json
 import re
-import unicodedata
+import time
 from collections import defaultdict
 from collections.abc import Iterable, Mapping
 from functools import partial, reduce
@@ -251,9 +252,11 @@ class Filtering(Cog):
         )):
             return
 
-        # Update the cache first, it might be used by the antispam filter.
+        # Update the cache and the lists first, they might be used by the antispam filter.
         # No need to update the triggers, they're going to be updated inside the sublists if necessary.
         self.message_cache.update(after)
+        for filter_list in self.filter_lists.values():
+            filter_list.message_edited(after)
         ctx = FilterContext.from_message(Event.MESSAGE_EDIT, after, before, self.message_cache)
         result_actions, list_messages, triggers = await self._resolve_action(ctx)
         if result_actions:
@@ -578,7 +581,7 @@ class Filtering(Cog):
             """The actual removal routine."""
             await bot.instance.api_client.delete(f"bot/filter/filters/{filter_id}")
             log.info(f"Successfully deleted filter with ID {filter_id}.")
-            filter_list[list_type].filters.pop(filter_id)
+            filter_list.remove_filter(list_type, filter_id)
             await ctx.reply(f"✅ Deleted filter: {filter_}")
 
         result = self._get_filter_by_id(filter_id)
@@ -948,8 +951,35 @@ class Filtering(Cog):
         actions = []
         messages = {}
         triggers = {}
-        for filter_list in self._subscriptions[ctx.event]:
-            list_actions, list_message, list_triggers = await filter_list.actions_for(ctx)
+        filter_lists = list(self._subscriptions[ctx.event])
+        # Lists with a timeout wait on something external, such as the API. So that they don't hold up the rest,
+        # they run alongside them, each on its own copy of the context, which is merged back once the rest are done.
+        # The other lists act on what the lists before them wrote, so they run one after the other on the context.
+        isolated = {}
+        for filter_list in filter_lists:
+            if filter_list.timeout is not None:
+                list_ctx = ctx.isolated()
+                isolated[filter_list] = list_ctx, asyncio.create_task(self._list_actions_for(filter_list, list_ctx))
+
+        results = {}
+        try:
+            for filter_list in filter_lists:
+                if filter_list not in isolated:
+                    results[filter_list] = await self._list_actions_for(filter_list, ctx)
+            for filter_list, (list_ctx, task) in isolated.items():
+                results[filter_list] = await task
+                # A list which timed out may have left its copy half written, so nothing of it is kept.
+                if results[filter_list] is not None:
+                    ctx.merge(list_ctx)
+        finally:
+            for _, task in isolated.values():
+                task.cancel()
+
+        # Merge the results in the order of subscription, regardless of which list finished first.
+        for filter_list in filter_lists:
+            if (result := results[filter_list]) is None:
+                continue
+            list_actions, list_message, list_triggers = result
             triggers.update({filter_list[list_type]: filters for list_type, filters in list_triggers.items()})
             if list_actions:
                 actions.append(list_actions)
@@ -962,6 +992,27 @@ class Filtering(Cog):
 
         return result_actions, messages, triggers
 
+    async def _list_actions_for(
+        self, filter_list: FilterList, ctx: FilterContext
+    ) -> tuple[ActionSettings | None, list[str], dict[ListType, list[Filter]]] | None:
+        """
+        Dispatch the context to a single filter list, and report how long it took.
+
+        If the list has a timeout and doesn't finish in time, return None.
+        """
+        start = time.perf_counter()
+        try:
+            return await asyncio.wait_for(filter_list.actions_for(ctx), filter_list.timeout)
+        except TimeoutError:
+            log.warning(
+                f"The {filter_list.name} filter list took longer than {filter_list.timeout} seconds "
+                f"for a {ctx.event.name} event by {ctx.author}, and was skipped."
+            )
+            self.bot.stats.incr(f"filters.list_timeouts.{filter_list.name}")
+            return None
+        finally:
+            self.bot.stats.timing(f"filters.list_latency.{filter_list.name}", (time.perf_counter() - start) * 1000)
+
     async def _send_alert(self, ctx: FilterContext, triggered_filters: dict[FilterList, Iterable[str]]) -> None:
         """Build an alert message from the filter context, and send it via the alert webhook."""
         if not self.webhook:
@@ -1003,13 +1054,9 @@ class Filtering(Cog):
 
     async def _check_bad_name(self, ctx: FilterContext) -> FilterContext:
         """Check filter triggers for some given name (thread name, a member's display name)."""
-        name = ctx.content
-        normalised_name = unicodedata.normalize("NFKC", name)
-        cleaned_normalised_name = "".join([c for c in normalised_name if not unicodedata.combining(c)])
-
         # Run filters against normalised, cleaned normalised and the original name,
         # in case there are filters for one but not another.
-        names_to_check = (name, normalised_name, cleaned_normalised_name)
+        names_to_check = (ctx.content, ctx.normalised_content, ctx.cleaned_normalised_content)
 
         new_ctx = ctx.replace(content=" ".join(names_to_check))
         result_actions, list_messages, triggers = await self._resolve_action(new_ctx)
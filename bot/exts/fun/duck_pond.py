@@ -8,6 +8,7 @@ from bot import constants
 from bot.bot import Bot
 from bot.converters import MemberOrUser
 from bot.log import get_logger
+from bot.utils.channel import channel_visibility
 from bot.utils.checks import has_any_role
 from bot.utils.messages import count_unique_users_reaction, send_attachments
 from bot.utils.webhooks import send_webhook
@@ -155,7 +156,7 @@ class DuckPond(Cog):
 
         # Was the message sent in a channel Helpers can see?
         helper_role = guild.get_role(constants.Roles.helpers)
-        if not channel.permissions_for(helper_role).view_channel:
+        if not channel_visibility.can_view(channel, helper_role):
             return
 
         try:
@@ -1,14 +1,12 @@
 from __future__ import annotations
 
 import asyncio
-import collections
-from collections import defaultdict, deque
-from contextlib import suppress
-from operator import attrgetter
-from typing import NamedTuple
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import TYPE_CHECKING
 
 import discord
-from bs4 import BeautifulSoup
 from pydis_core.utils import scheduling
 
 import bot
@@ -16,11 +14,22 @@ from bot.constants import Channels
 from bot.log import get_logger
 
 from . import _cog, doc_cache
-from ._parsing import get_symbol_markdown
+from ._parsing import ParseTarget, get_page_markdown
 from ._redis_cache import StaleItemCounter
 
+if TYPE_CHECKING:
+    from ._symbol_table import SymbolTable
+
 log = get_logger(__name__)
 
+# The number of processes pages are parsed in.
+PARSE_WORKERS = 2
+
+# The workers are forked from a server process started for them, which has imported nothing but the parsing module.
+# Forking the bot itself isn't safe, as its other threads may be holding locks which would stay locked in the child.
+_worker_context = multiprocessing.get_context("forkserver")
+_worker_context.set_forkserver_preload([get_page_markdown.__module__])
+
 
 class StaleInventoryNotifier:
     """Handle sending notifications about stale inventories through `DocItem`s to dev log."""
@@ -54,140 +63,81 @@ class StaleInventoryNotifier:
                 await self._dev_log.send(embed=embed)
 
 
-class QueueItem(NamedTuple):
-    """Contains a `DocItem` and the `BeautifulSoup` object needed to parse it."""
-
-    doc_item: _cog.DocItem
-    soup: BeautifulSoup
-
-    def __eq__(self, other: QueueItem | _cog.DocItem):
-        if isinstance(other, _cog.DocItem):
-            return self.doc_item == other
-        return NamedTuple.__eq__(self, other)
-
-
-class ParseResultFuture(asyncio.Future):
-    """
-    Future with metadata for the parser class.
-
-    `user_requested` is set by the parser when a Future is requested by an user and moved to the front,
-    allowing the futures to only be waited for when clearing if they were user requested.
-    """
-
-    def __init__(self):
-        super().__init__()
-        self.user_requested = False
-
-
 class BatchParser:
     """
     Get the Markdown of all symbols on a page and send them to redis when a symbol is requested.
 
-    DocItems are added through the `add_item` method which adds them to the `_page_doc_items` dict.
     `get_markdown` is used to fetch the Markdown; when this is used for the first time on a page,
-    all of the symbols are queued to be parsed to avoid multiple web requests to the same page.
+    the page is parsed for all of its symbols at once in a worker process, to avoid multiple web requests
+    to the same page and to keep the parsing off the event loop.
     """
 
     def __init__(self):
-        self._queue: deque[QueueItem] = collections.deque()
-        self._page_doc_items: dict[str, list[_cog.DocItem]] = defaultdict(list)
-        self._item_futures: dict[_cog.DocItem, ParseResultFuture] = defaultdict(ParseResultFuture)
-        self._parse_task = None
+        # The pages being parsed, each resolving to the Markdown of its symbols.
+        self._page_tasks: dict[str, asyncio.Task[dict[_cog.DocItem, str | None]]] = {}
+        self._executor = self._create_executor()
 
         self.stale_inventory_notifier = StaleInventoryNotifier()
 
-    async def get_markdown(self, doc_item: _cog.DocItem) -> str | None:
+    @staticmethod
+    def _create_executor() -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(max_workers=PARSE_WORKERS, mp_context=_worker_context)
+
+    async def get_markdown(self, doc_item: _cog.DocItem, symbols: SymbolTable) -> str | None:
         """
         Get the result Markdown of `doc_item`.
 
-        If no symbols were fetched from `doc_item`s page before,
-        the HTML has to be fetched and then all items from the page are put into the parse queue.
-
-        Not safe to run while `self.clear` is running.
+        If the page of `doc_item` isn't already being parsed, its HTML is fetched and parsed for all of its symbols
+        in `symbols`.
         """
-        if doc_item not in self._item_futures and doc_item not in self._queue:
-            self._item_futures[doc_item].user_requested = True
-
-            async with bot.instance.http_session.get(doc_item.url, raise_for_status=True) as response:
-                soup = await bot.instance.loop.run_in_executor(
-                    None,
-                    BeautifulSoup,
-                    await response.text(encoding="utf8"),
-                    "lxml",
-                )
+        if (page_task := self._page_tasks.get(doc_item.url)) is None:
+            # Errors are handled by whoever awaits the page, so the task isn't wrapped to log them.
+            page_task = self._page_tasks[doc_item.url] = asyncio.create_task(
+                self._parse_page(doc_item, symbols), name=f"Parse {doc_item.url}"
+            )
+            page_task.add_done_callback(lambda _: self._page_tasks.pop(doc_item.url, None))
 
-            self._queue.extendleft(QueueItem(item, soup) for item in self._page_doc_items[doc_item.url])
-            log.debug(f"Added items from {doc_item.url} to the parse queue.")
+        # Shielded so that the parsing isn't cancelled for everyone else waiting on the page.
+        return (await asyncio.shield(page_task)).get(doc_item)
 
-            if self._parse_task is None:
-                self._parse_task = scheduling.create_task(self._parse_queue(), name="Queue parse")
-        else:
-            self._item_futures[doc_item].user_requested = True
-        with suppress(ValueError):
-            # If the item is not in the queue then the item is already parsed or is being parsed
-            self._move_to_front(doc_item)
-        return await self._item_futures[doc_item]
-
-    async def _parse_queue(self) -> None:
+    async def _parse_page(self, doc_item: _cog.DocItem, symbols: SymbolTable) -> dict[_cog.DocItem, str | None]:
         """
-        Parse all items from the queue, setting their result Markdown on the futures and sending them to redis.
+        Parse all known symbols on the page of `doc_item`, sending their Markdown to redis, and return it.
 
-        The coroutine will run as long as the queue is not empty, resetting `self._parse_task` to None when finished.
+        Symbols which couldn't be found on the page are reported as stale.
         """
-        log.trace("Starting queue parsing.")
+        async with bot.instance.http_session.get(doc_item.url, raise_for_status=True) as response:
+            html = await response.text(encoding="utf8")
+
+        doc_items = list(symbols.page_items(doc_item) | {doc_item})
+        targets = [ParseTarget(item.symbol_id, item.group, item.url) for item in doc_items]
         try:
-            while self._queue:
-                item, soup = self._queue.pop()
-                markdown = None
-
-                if (future := self._item_futures[item]).done():
-                    # Some items are present in the inventories multiple times under different symbol names,
-                    # if we already parsed an equal item, we can just skip it.
-                    continue
-
-                try:
-                    markdown = await bot.instance.loop.run_in_executor(None, get_symbol_markdown, soup, item)
-                    if markdown is not None:
-                        await doc_cache.set(item, markdown)
-                    else:
-                        # Don't wait for this coro as the parsing doesn't depend on anything it does.
-                        scheduling.create_task(
-                            self.stale_inventory_notifier.send_warning(item), name="Stale inventory warning"
-                        )
-                except Exception:
-                    log.exception(f"Unexpected error when handling {item}")
-                future.set_result(markdown)
-                del self._item_futures[item]
-                await asyncio.sleep(0.1)
-        finally:
-            self._parse_task = None
-            log.trace("Finished parsing queue.")
-
-    def _move_to_front(self, item: QueueItem | _cog.DocItem) -> None:
-        """Move `item` to the front of the parse queue."""
-        # The parse queue stores soups along with the doc symbols in QueueItem objects,
-        # in case we're moving a DocItem we have to get the associated QueueItem first and then move it.
-        item_index = self._queue.index(item)
-        queue_item = self._queue[item_index]
-        del self._queue[item_index]
-
-        self._queue.append(queue_item)
-        log.trace(f"Moved {item} to the front of the queue.")
-
-    def add_item(self, doc_item: _cog.DocItem) -> None:
-        """Map a DocItem to its page so that the symbol will be parsed once the page is requested."""
-        self._page_doc_items[doc_item.url].append(doc_item)
+            page_markdown = await bot.instance.loop.run_in_executor(self._executor, get_page_markdown, html, targets)
+        except BrokenProcessPool:
+            log.warning("The doc parsing process pool broke, creating a new one.")
+            self._executor = self._create_executor()
+            raise
+        results = {
+            item: page_markdown[target]
+            for item, target in zip(doc_items, targets, strict=True)
+            if target in page_markdown
+        }
+        log.debug(f"Parsed {len(results)} symbols from {doc_item.url}.")
+
+        if markdown := {item: markdown for item, markdown in results.items() if markdown is not None}:
+            await doc_cache.set_many(markdown)
+        for item, markdown in results.items():
+            if markdown is None:
+                # Don't wait for this coro as the parsing doesn't depend on anything it does.
+                scheduling.create_task(
+                    self.stale_inventory_notifier.send_warning(item), name="Stale inventory warning"
+                )
+        return results
 
     async def clear(self) -> None:
-        """
-        Clear all internal symbol data.
+        """Wait for all pages being parsed to finish."""
+        await asyncio.gather(*self._page_tasks.values(), return_exceptions=True)
 
-        Wait for all user-requested symbols to be parsed before clearing the parser.
-        """
-        for future in filter(attrgetter("user_requested"), self._item_futures.values()):
-            await future
-        if self._parse_task is not None:
-            self._parse_task.cancel()
-        self._queue.clear()
-        self._page_doc_items.clear()
-        self._item_futures.clear()
+    def shutdown(self) -> None:
+        """Shut down the worker processes, without waiting for any work still queued."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -1,10 +1,9 @@
 from __future__ import annotations
 
 import asyncio
-import sys
 import textwrap
-from collections import defaultdict
 from contextlib import suppress
+from itertools import chain
 from types import SimpleNamespace
 from typing import Literal, NamedTuple
 
@@ -12,6 +11,7 @@ import aiohttp
 import discord
 from discord.ext import commands
 from pydis_core.site_api import ResponseCodeError
+from pydis_core.utils import scheduling
 from pydis_core.utils.scheduling import Scheduler
 
 from bot.bot import Bot
@@ -19,28 +19,22 @@ from bot.constants import MODERATION_ROLES, RedirectOutput
 from bot.converters import Inventory, PackageName, ValidURL
 from bot.log import get_logger
 from bot.pagination import LinePaginator
-from bot.utils.lock import SharedEvent, lock
+from bot.utils.lock import lock
 from bot.utils.messages import send_denial, wait_for_deletion
 
-from . import NAMESPACE, PRIORITY_PACKAGES, _batch_parser, doc_cache
-from ._inventory_parser import InvalidHeaderError, InventoryDict, fetch_inventory
+from . import NAMESPACE, _batch_parser, _symbol_table, doc_cache
+from ._inventory_parser import InvalidHeaderError, InventoryDict, InventoryValidators, fetch_inventory_if_modified
+from ._redis_cache import InventorySnapshot, SnapshotEntry
 
 log = get_logger(__name__)
 
-# symbols with a group contained here will get the group prefixed on duplicates
-FORCE_PREFIX_GROUPS = (
-    "term",
-    "label",
-    "token",
-    "doc",
-    "pdbcommand",
-    "2to3fixer",
-)
 NOT_FOUND_DELETE_DELAY = RedirectOutput.delete_delay
 # Delay to wait before trying to reach a rescheduled inventory again, in minutes
 FETCH_RESCHEDULE_DELAY = SimpleNamespace(first=2, repeated=5)
 
 COMMAND_LOCK_SINGLETON = "inventory refresh"
+# The most symbol names to suggest when a symbol isn't found.
+MAX_SUGGESTIONS = 5
 
 
 class DocItem(NamedTuple):
@@ -61,63 +55,72 @@ class DocItem(NamedTuple):
 class DocCog(commands.Cog):
     """A set of commands for querying & displaying documentation."""
 
+    # The last fetched inventory of each package, to build the symbols from on startup.
+    inventory_snapshot = InventorySnapshot()
+
     def __init__(self, bot: Bot):
-        # Contains URLs to documentation home pages.
-        # Used to calculate inventory diffs on refreshes and to display all currently stored inventories.
-        self.base_urls = {}
         self.bot = bot
-        self.doc_symbols: dict[str, DocItem] = {}  # Maps symbol names to objects containing their metadata.
+        # Replaced as a whole on refreshes, so it must be looked up again after any context switch.
+        self.symbols = _symbol_table.SymbolTable()
         self.item_fetcher = _batch_parser.BatchParser()
-        # Maps a conflicting symbol name to a list of the new, disambiguated names created from conflicts with the name.
-        self.renamed_symbols = defaultdict(list)
 
         self.inventory_scheduler = Scheduler(self.__class__.__name__)
-
-        self.refresh_event = asyncio.Event()
-        self.refresh_event.set()
-        self.symbol_get_event = SharedEvent()
+        self._revalidation_task = None
 
     async def cog_load(self) -> None:
-        """Refresh documentation inventory on cog initialization."""
+        """
+        Load the documentation inventories on cog initialization.
+
+        If there's a snapshot of the inventories, they're loaded from it so that symbols can be served right away,
+        and are revalidated in the background.
+        """
         await self.bot.wait_until_guild_available()
+        if await self.load_snapshot():
+            self._revalidation_task = scheduling.create_task(
+                self.revalidate_inventories(), name="Doc inventory revalidation"
+            )
+        else:
+            await self.refresh_inventories()
+
+    async def load_snapshot(self) -> bool:
+        """Build the inventories from their snapshot, and return whether there was any."""
+        snapshot = await self.inventory_snapshot.get_all()
+        if not snapshot:
+            return False
+
+        symbols = _symbol_table.SymbolTable()
+        for package in await self.bot.api_client.get("bot/documentation-links"):
+            entry = snapshot.get(package["package"])
+            if entry is None or entry.inventory_url != package["inventory_url"]:
+                continue
+            base_url = package["base_url"] or self.base_url_from_inventory_url(package["inventory_url"])
+            symbols.add_package(package["package"], base_url, entry.inventory)
+        await asyncio.to_thread(symbols.update_index, self.symbols.index)
+        self.symbols = symbols
+        log.info(f"Loaded {len(symbols.base_urls)} inventories from their snapshot.")
+        return True
+
+    @lock(NAMESPACE, COMMAND_LOCK_SINGLETON, wait=True)
+    async def revalidate_inventories(self) -> None:
+        """Refresh the inventories loaded from their snapshot, in case they changed since."""
         await self.refresh_inventories()
 
-    def update_single(self, package_name: str, base_url: str, inventory: InventoryDict) -> None:
+    async def update_single(self, package_name: str, base_url: str, inventory: InventoryDict) -> None:
         """
-        Build the inventory for a single package.
+        Add the inventory of a single package to the symbols in use.
 
-        Where:
-            * `package_name` is the package name to use in logs and when qualifying symbols
-            * `base_url` is the root documentation URL for the specified package, used to build
-                absolute paths that link to specific symbols
-            * `package` is the content of a intersphinx inventory.
+        Like on refreshes, the package is added to a copy of the symbols, which is swapped in once it's indexed.
         """
-        self.base_urls[package_name] = base_url
-
-        for group, items in inventory.items():
-            for symbol_name, relative_doc_url in items:
-
-                # e.g. get 'class' from 'py:class'
-                group_name = group.split(":")[1]
-                symbol_name = self.ensure_unique_symbol_name(
-                    package_name,
-                    group_name,
-                    symbol_name,
-                )
-
-                relative_url_path, _, symbol_id = relative_doc_url.partition("#")
-                # Intern fields that have shared content so we're not storing unique strings for every object
-                doc_item = DocItem(
-                    package_name,
-                    sys.intern(group_name),
-                    base_url,
-                    sys.intern(relative_url_path),
-                    symbol_id,
-                )
-                self.doc_symbols[symbol_name] = doc_item
-                self.item_fetcher.add_item(doc_item)
-
-        log.trace(f"Fetched inventory for {package_name}.")
+        symbols = self.symbols
+
+        def add_package() -> _symbol_table.SymbolTable:
+            updated = symbols.copy()
+            updated.add_package(package_name, base_url, inventory)
+            # The names of other packages' symbols may have changed too, if they conflicted with the added ones.
+            updated.update_index(symbols.index)
+            return updated
+
+        self.symbols = await asyncio.to_thread(add_package)
 
     async def update_or_reschedule_inventory(
         self,
@@ -132,115 +135,144 @@ class DocCog(commands.Cog):
         in `FETCH_RESCHEDULE_DELAY.repeated` minutes.
         """
         try:
-            package = await fetch_inventory(inventory_url)
+            package = await self.fetch_package_inventory(api_package_name, inventory_url)
         except InvalidHeaderError as e:
             # Do not reschedule if the header is invalid, as the request went through but the contents are invalid.
             log.warning(f"Invalid inventory header at {inventory_url}. Reason: {e}")
             return
 
         if not package:
-            if api_package_name in self.inventory_scheduler:
-                self.inventory_scheduler.cancel(api_package_name)
-                delay = FETCH_RESCHEDULE_DELAY.repeated
-            else:
-                delay = FETCH_RESCHEDULE_DELAY.first
-            log.info(f"Failed to fetch inventory; attempting again in {delay} minutes.")
-            self.inventory_scheduler.schedule_later(
-                delay*60,
-                api_package_name,
-                self.update_or_reschedule_inventory(api_package_name, base_url, inventory_url),
-            )
+            self.reschedule_inventory(api_package_name, base_url, inventory_url)
         else:
             if not base_url:
                 base_url = self.base_url_from_inventory_url(inventory_url)
-            self.update_single(api_package_name, base_url, package)
+            await self.update_single(api_package_name, base_url, package)
 
-    def ensure_unique_symbol_name(self, package_name: str, group_name: str, symbol_name: str) -> str:
-        """
-        Ensure `symbol_name` doesn't overwrite an another symbol in `doc_symbols`.
+    def reschedule_inventory(self, api_package_name: str, base_url: str, inventory_url: str) -> None:
+        """Schedule another attempt at updating the inventory of a package which couldn't be fetched."""
+        if api_package_name in self.inventory_scheduler:
+            self.inventory_scheduler.cancel(api_package_name)
+            delay = FETCH_RESCHEDULE_DELAY.repeated
+        else:
+            delay = FETCH_RESCHEDULE_DELAY.first
+        log.info(f"Failed to fetch inventory; attempting again in {delay} minutes.")
+        self.inventory_scheduler.schedule_later(
+            delay*60,
+            api_package_name,
+            self.update_or_reschedule_inventory(api_package_name, base_url, inventory_url),
+        )
 
-        For conflicts, rename either the current symbol or the existing symbol with which it conflicts.
-        Store the new name in `renamed_symbols` and return the name to use for the symbol.
+    async def fetch_package_inventory(
+        self, package_name: str, inventory_url: str, snapshot_entry: SnapshotEntry | None = None
+    ) -> InventoryDict | None:
+        """
+        Fetch the inventory of a package and store it in the snapshot, returning None if it couldn't be fetched.
 
-        If the existing symbol was renamed or there was no conflict, the returned name is equivalent to `symbol_name`.
+        If the package's entry in the snapshot is given, the inventory is only downloaded again if it changed since,
+        otherwise the entry's inventory is returned.
         """
-        if (item := self.doc_symbols.get(symbol_name)) is None:
-            return symbol_name  # There's no conflict so it's fine to simply use the given symbol name.
-
-        def rename(prefix: str, *, rename_extant: bool = False) -> str:
-            new_name = f"{prefix}.{symbol_name}"
-            if new_name in self.doc_symbols:
-                # If there's still a conflict, qualify the name further.
-                if rename_extant:
-                    new_name = f"{item.package}.{item.group}.{symbol_name}"
-                else:
-                    new_name = f"{package_name}.{group_name}.{symbol_name}"
-
-            self.renamed_symbols[symbol_name].append(new_name)
-
-            if rename_extant:
-                # Instead of renaming the current symbol, rename the symbol with which it conflicts.
-                self.doc_symbols[new_name] = self.doc_symbols[symbol_name]
-                return symbol_name
-            return new_name
-
-        # When there's a conflict, and the package names of the items differ, use the package name as a prefix.
-        if package_name != item.package:
-            if package_name in PRIORITY_PACKAGES:
-                return rename(item.package, rename_extant=True)
-            return rename(package_name)
-
-        # If the symbol's group is a non-priority group from FORCE_PREFIX_GROUPS,
-        # add it as a prefix to disambiguate the symbols.
-        if group_name in FORCE_PREFIX_GROUPS:
-            if item.group in FORCE_PREFIX_GROUPS:
-                needs_moving = FORCE_PREFIX_GROUPS.index(group_name) < FORCE_PREFIX_GROUPS.index(item.group)
-            else:
-                needs_moving = False
-            return rename(item.group if needs_moving else group_name, rename_extant=needs_moving)
+        validators = snapshot_entry.validators if snapshot_entry is not None else None
+        fetched = await fetch_inventory_if_modified(inventory_url, validators)
+        if fetched is None:
+            return None
+        if fetched.inventory is None:
+            log.trace(f"The inventory of {package_name} wasn't modified.")
+            return snapshot_entry.inventory
+
+        log.debug(
+            f"Fetched the inventory of {package_name}, downloading it took {fetched.timings.download:.2f}s "
+            f"and parsing it {fetched.timings.parse:.2f}s."
+        )
+        self.bot.stats.timing(f"doc_inventories.{package_name}.download", fetched.timings.download * 1000)
+        self.bot.stats.timing(f"doc_inventories.{package_name}.parse", fetched.timings.parse * 1000)
 
-        # If the above conditions didn't pass, either the existing symbol has its group in FORCE_PREFIX_GROUPS,
-        # or deciding which item to rename would be arbitrary, so we rename the existing symbol.
-        return rename(item.group, rename_extant=True)
+        await self.inventory_snapshot.set(
+            package_name,
+            SnapshotEntry(inventory_url=inventory_url, validators=fetched.validators, inventory=fetched.inventory),
+        )
+        return fetched.inventory
 
     async def refresh_inventories(self) -> None:
-        """Refresh internal documentation inventories."""
-        self.refresh_event.clear()
-        await self.symbol_get_event.wait()
+        """
+        Refresh internal documentation inventories.
+
+        Inventories are only downloaded again if they changed since they were stored in the snapshot.
+        The new symbols are built next to the ones in use and then swapped in, so symbols are served throughout.
+        Only the pages whose symbols changed have their Markdown dropped from redis.
+        """
+        packages = await self.bot.api_client.get("bot/documentation-links")
+        snapshot = await self.inventory_snapshot.get_all()
+        await self.inventory_snapshot.delete(*(set(snapshot) - {package["package"] for package in packages}))
+
+        snapshot_entries = []
+        for package in packages:
+            entry = snapshot.get(package["package"])
+            # The entry is useless if the package's inventory has moved since.
+            snapshot_entries.append(entry if entry and entry.inventory_url == package["inventory_url"] else None)
+        inventories = await asyncio.gather(*(
+            self._fetch_for_refresh(package, entry) for package, entry in zip(packages, snapshot_entries, strict=True)
+        ))
+
+        base_urls = {
+            package["package"]: package["base_url"] or self.base_url_from_inventory_url(package["inventory_url"])
+            for package in packages
+        }
+        unchanged = all(
+            entry is not None and inventory is entry.inventory
+            for inventory, entry in zip(inventories, snapshot_entries, strict=True)
+        )
+        if unchanged and base_urls == self.symbols.base_urls:
+            log.debug("No documentation inventories changed.")
+            return
+
         log.debug("Refreshing documentation inventory...")
-        self.inventory_scheduler.cancel_all()
+        symbols = _symbol_table.SymbolTable()
+        failed_packages = []
+        for package, inventory in zip(packages, inventories, strict=True):
+            if inventory is None:
+                failed_packages.append(package)
+            else:
+                symbols.add_package(package["package"], base_urls[package["package"]], inventory)
+        # Indexing is the slowest part of building the symbols, so it's done in a thread to keep the bot responsive.
+        await asyncio.to_thread(symbols.update_index, self.symbols.index)
 
-        self.base_urls.clear()
-        self.doc_symbols.clear()
-        self.renamed_symbols.clear()
-        await self.item_fetcher.clear()
+        # Packages which couldn't be fetched are left out of the new symbols until they can be,
+        # but there's no reason to believe their pages changed.
+        # Packages missing from the current symbols, such as all of them on a cold start without a snapshot,
+        # aren't compared either, as their cached pages can't be told apart from changed ones.
+        compared_packages = self.symbols.base_urls.keys() - {package["package"] for package in failed_packages}
+        changed_pages = self.symbols.changed_pages(symbols, compared_packages)
+
+        self.inventory_scheduler.cancel_all()
+        self.symbols = symbols
+        for package in failed_packages:
+            self.reschedule_inventory(package["package"], package["base_url"], package["inventory_url"])
 
-        coros = [
-            self.update_or_reschedule_inventory(
-                package["package"], package["base_url"], package["inventory_url"]
-            ) for package in await self.bot.api_client.get("bot/documentation-links")
-        ]
-        await asyncio.gather(*coros)
-        log.debug("Finished inventory refresh.")
-        self.refresh_event.set()
+        await doc_cache.delete_pages(doc_item for items in changed_pages.values() for doc_item in chain(*items))
+        log.debug(f"Finished inventory refresh, {len(changed_pages)} pages changed.")
 
-    def get_symbol_item(self, symbol_name: str) -> tuple[str, DocItem | None]:
+    async def _fetch_for_refresh(self, package: dict, snapshot_entry: SnapshotEntry | None) -> InventoryDict | None:
         """
-        Get the `DocItem` and the symbol name used to fetch it from the `doc_symbols` dict.
+        Fetch the inventory of the package for a refresh.
 
-        If the doc item is not found directly from the passed in name and the name contains a space,
-        the first word of the name will be attempted to be used to get the item.
+        If it can't be fetched, fall back to its inventory in the snapshot, if there is one.
         """
-        doc_item = self.doc_symbols.get(symbol_name)
-        if doc_item is None and " " in symbol_name:
-            symbol_name = symbol_name.split(maxsplit=1)[0]
-            doc_item = self.doc_symbols.get(symbol_name)
+        try:
+            inventory = await self.fetch_package_inventory(
+                package["package"], package["inventory_url"], snapshot_entry
+            )
+        except InvalidHeaderError as e:
+            log.warning(f"Invalid inventory header at {package['inventory_url']}. Reason: {e}")
+            return None
 
-        return symbol_name, doc_item
+        if inventory is None and snapshot_entry is not None:
+            log.info(f"Failed to fetch the inventory of {package['package']}, using its last snapshot instead.")
+            return snapshot_entry.inventory
+        return inventory
 
-    async def get_symbol_markdown(self, doc_item: DocItem) -> str:
+    async def get_symbol_markdown(self, doc_item: DocItem, symbols: _symbol_table.SymbolTable) -> str:
         """
-        Get the Markdown from the symbol `doc_item` refers to.
+        Get the Markdown from the symbol `doc_item` refers to, which is one of `symbols`.
 
         First a redis lookup is attempted, if that fails the `item_fetcher`
         is used to fetch the page and parse the HTML from it into Markdown.
@@ -250,7 +282,7 @@ class DocCog(commands.Cog):
         if markdown is None:
             log.debug(f"Redis cache miss with {doc_item}.")
             try:
-                markdown = await self.item_fetcher.get_markdown(doc_item)
+                markdown = await self.item_fetcher.get_markdown(doc_item, symbols)
 
             except aiohttp.ClientError as e:
                 log.warning(f"A network error has occurred when requesting parsing of {doc_item}.", exc_info=e)
@@ -273,33 +305,29 @@ class DocCog(commands.Cog):
         First check the DocRedisCache before querying the cog's `BatchParser`.
         """
         log.trace(f"Building embed for symbol `{symbol_name}`")
-        if not self.refresh_event.is_set():
-            log.debug("Waiting for inventories to be refreshed before processing item.")
-            await self.refresh_event.wait()
-        # Ensure a refresh can't run in case of a context switch until the with block is exited
-        with self.symbol_get_event:
-            symbol_name, doc_item = self.get_symbol_item(symbol_name)
-            if doc_item is None:
-                log.debug("Symbol does not exist.")
-                return None
-
-            self.bot.stats.incr(f"doc_fetches.{doc_item.package}")
-
-            # Show all symbols with the same name that were renamed in the footer,
-            # with a max of 200 chars.
-            if symbol_name in self.renamed_symbols:
-                renamed_symbols = ", ".join(self.renamed_symbols[symbol_name])
-                footer_text = textwrap.shorten("Similar names: " + renamed_symbols, 200, placeholder=" ...")
-            else:
-                footer_text = ""
+        symbols = self.symbols  # A refresh may swap in new symbols while the Markdown is awaited.
+        symbol_name, doc_item = symbols.get_symbol_item(symbol_name)
+        if doc_item is None:
+            log.debug("Symbol does not exist.")
+            return None
+
+        self.bot.stats.incr(f"doc_fetches.{doc_item.package}")
+
+        # Show all symbols with the same name that were renamed in the footer,
+        # with a max of 200 chars.
+        if symbol_name in symbols.renamed_symbols:
+            renamed_symbols = ", ".join(symbols.renamed_symbols[symbol_name])
+            footer_text = textwrap.shorten("Similar names: " + renamed_symbols, 200, placeholder=" ...")
+        else:
+            footer_text = ""
 
-            embed = discord.Embed(
-                title=discord.utils.escape_markdown(symbol_name),
-                url=f"{doc_item.url}#{doc_item.symbol_id}",
-                description=await self.get_symbol_markdown(doc_item)
-            )
-            embed.set_footer(text=footer_text)
-            return embed
+        embed = discord.Embed(
+            title=discord.utils.escape_markdown(symbol_name),
+            url=f"{doc_item.url}#{doc_item.symbol_id}",
+            description=await self.get_symbol_markdown(doc_item, symbols)
+        )
+        embed.set_footer(text=footer_text)
+        return embed
 
     @commands.group(name="docs", aliases=("doc", "d"), invoke_without_command=True)
     async def docs_group(self, ctx: commands.Context, *, symbol_name: str | None) -> None:
@@ -320,13 +348,14 @@ class DocCog(commands.Cog):
             !docs getdoc aiohttp.ClientSession
         """
         if not symbol_name:
+            base_urls = self.symbols.base_urls
             inventory_embed = discord.Embed(
-                title=f"All inventories (`{len(self.base_urls)}` total)",
+                title=f"All inventories (`{len(base_urls)}` total)",
                 colour=discord.Colour.blue()
             )
 
-            lines = sorted(f"- [`{name}`]({url})" for name, url in self.base_urls.items())
-            if self.base_urls:
+            lines = sorted(f"- [`{name}`]({url})" for name, url in base_urls.items())
+            if base_urls:
                 await LinePaginator.paginate(lines, ctx, inventory_embed, max_size=400, empty=False)
 
             else:
@@ -339,7 +368,12 @@ class DocCog(commands.Cog):
                 doc_embed = await self.create_symbol_embed(symbol)
 
             if doc_embed is None:
-                error_message = await send_denial(ctx, "No documentation found for the requested symbol.")
+                reason = "No documentation found for the requested symbol."
+                if suggestions := self.symbols.suggestions(symbol, MAX_SUGGESTIONS):
+                    reason += "\nDid you mean: " + ", ".join(
+                        f"`{discord.utils.escape_markdown(suggestion)}`" for suggestion in suggestions
+                    )
+                error_message = await send_denial(ctx, reason)
                 await wait_for_deletion(error_message, (ctx.author.id,), timeout=NOT_FOUND_DELETE_DELAY)
 
                 # Make sure that we won't cause a ghost-ping by deleting the message
@@ -402,7 +436,10 @@ class DocCog(commands.Cog):
 
         if not base_url:
             base_url = self.base_url_from_inventory_url(inventory_url)
-        self.update_single(package_name, base_url, inventory_dict)
+        await self.update_single(package_name, base_url, inventory_dict)
+        await self.inventory_snapshot.set(
+            package_name, SnapshotEntry(inventory_url, InventoryValidators(), inventory_dict)
+        )
         await ctx.send(f"Added the package `{package_name}` to the database and updated the inventories.")
 
     @docs_group.command(name="deletedoc", aliases=("removedoc", "rm", "d"))
@@ -427,10 +464,10 @@ class DocCog(commands.Cog):
     @lock(NAMESPACE, COMMAND_LOCK_SINGLETON, raise_error=True)
     async def refresh_command(self, ctx: commands.Context) -> None:
         """Refresh inventories and show the difference."""
-        old_inventories = set(self.base_urls)
+        old_inventories = set(self.symbols.base_urls)
         async with ctx.typing():
             await self.refresh_inventories()
-        new_inventories = set(self.base_urls)
+        new_inventories = set(self.symbols.base_urls)
 
         if added := ", ".join(new_inventories - old_inventories):
             added = "+ " + added
@@ -444,6 +481,20 @@ class DocCog(commands.Cog):
         )
         await ctx.send(embed=embed)
 
+    @docs_group.command(name="memory", aliases=("mem",))
+    @commands.has_any_role(*MODERATION_ROLES)
+    async def memory_command(self, ctx: commands.Context) -> None:
+        """Show an estimate of the memory taken up by the loaded symbols."""
+        symbols = self.symbols
+        async with ctx.typing():
+            usage = await asyncio.to_thread(symbols.memory_usage)
+
+        lines = [f"{len(symbols)} symbol names from {len(symbols.base_urls)} inventories.", ""]
+        lines.extend(f"**{part.capitalize()}:** {size / 2**20:.1f} MiB" for part, size in usage.items())
+        lines.append(f"**Total:** {sum(usage.values()) / 2**20:.1f} MiB")
+        embed = discord.Embed(title="Symbol memory usage", description="\n".join(lines))
+        await ctx.send(embed=embed)
+
     @docs_group.command(name="cleardoccache", aliases=("deletedoccache",))
     @commands.has_any_role(*MODERATION_ROLES)
     async def clear_cache_command(
@@ -460,5 +511,8 @@ class DocCog(commands.Cog):
 
     async def cog_unload(self) -> None:
         """Clear scheduled inventories, queued symbols and cleanup task on cog unload."""
+        if self._revalidation_task:
+            self._revalidation_task.cancel()
         self.inventory_scheduler.cancel_all()
         await self.item_fetcher.clear()
+        self.item_fetcher.shutdown()
@@ -1,7 +1,10 @@
+import asyncio
 import re
+import time
 import zlib
 from collections import defaultdict
 from collections.abc import AsyncIterator
+from typing import NamedTuple
 
 import aiohttp
 
@@ -20,8 +23,30 @@ class InvalidHeaderError(Exception):
     """Raised when an inventory file has an invalid header."""
 
 
+class InventoryValidators(NamedTuple):
+    """The validators an inventory was served with, used to only download it again if it changed."""
+
+    etag: str | None = None
+    last_modified: str | None = None
+
+
+class InventoryTimings(NamedTuple):
+    """How long getting an inventory took, in seconds."""
+
+    download: float  # From sending the request to receiving the last of the inventory.
+    parse: float  # Spent parsing the inventory, mostly while it was still being downloaded.
+
+
+class FetchedInventory(NamedTuple):
+    """An inventory along with the validators it was served with."""
+
+    inventory: InventoryDict | None  # None if the inventory wasn't modified since the validators were received.
+    validators: InventoryValidators
+    timings: InventoryTimings | None = None  # None if the inventory wasn't modified.
+
+
 class ZlibStreamReader:
-    """Class used for decoding zlib data of a stream line by line."""
+    """Class used for decoding zlib data of a stream in blocks of whole lines."""
 
     READ_CHUNK_SIZE = 16 * 1024
 
@@ -36,23 +61,32 @@ class ZlibStreamReader:
 
         yield decompressor.flush()
 
-    async def __aiter__(self) -> AsyncIterator[str]:
-        """Yield lines of decompressed text."""
-        buf = b""
-        async for chunk in self._read_compressed_chunks():
-            buf += chunk
-            pos = buf.find(b"\n")
-            while pos != -1:
-                yield buf[:pos].decode()
-                buf = buf[pos + 1:]
-                pos = buf.find(b"\n")
-
-
-async def _load_v1(stream: aiohttp.StreamReader) -> InventoryDict:
-    invdata = defaultdict(list)
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        """
+        Yield blocks of whole lines of decompressed data, without the newline at the end of the block.
 
-    async for line in stream:
-        name, type_, location = line.decode().rstrip().split(maxsplit=2)
+        Only the incomplete line at the end of each chunk is held back, so every byte is only copied once.
+        """
+        incomplete_line = b""
+        async for chunk in self._read_compressed_chunks():
+            block_end = chunk.rfind(b"\n")
+            if block_end == -1:
+                incomplete_line += chunk
+                continue
+            yield incomplete_line + chunk[:block_end]
+            incomplete_line = chunk[block_end + 1:]
+
+        if incomplete_line:
+            yield incomplete_line
+
+
+def _parse_v1(data: bytes, invdata: InventoryDict) -> float:
+    """Parse the lines of a version 1 inventory into `invdata`, and return how long it took."""
+    start = time.perf_counter()
+    for line in data.decode().splitlines():
+        if not line.strip():
+            continue
+        name, type_, location = line.rstrip().split(maxsplit=2)
         # version 1 did not add anchors to the location
         if type_ == "mod":
             type_ = "py:module"
@@ -61,13 +95,13 @@ async def _load_v1(stream: aiohttp.StreamReader) -> InventoryDict:
             type_ = "py:" + type_
             location += "#" + name
         invdata[type_].append((name, location))
-    return invdata
+    return time.perf_counter() - start
 
 
-async def _load_v2(stream: aiohttp.StreamReader) -> InventoryDict:
-    invdata = defaultdict(list)
-
-    async for line in ZlibStreamReader(stream):
+def _parse_v2(block: bytes, invdata: InventoryDict) -> float:
+    """Parse a block of lines of a version 2 inventory into `invdata`, and return how long it took."""
+    start = time.perf_counter()
+    for line in block.decode().split("\n"):
         m = _V2_LINE_RE.match(line.rstrip())
 
         # If we don't have a match, the package is probably doing something
@@ -81,35 +115,82 @@ async def _load_v2(stream: aiohttp.StreamReader) -> InventoryDict:
             location = location[:-1] + name
 
         invdata[type_].append((name, location))
-    return invdata
+    return time.perf_counter() - start
 
 
-async def _fetch_inventory(url: str) -> InventoryDict:
-    """Fetch, parse and return an intersphinx inventory file from an url."""
-    timeout = aiohttp.ClientTimeout(sock_connect=5, sock_read=5)
-    async with bot.instance.http_session.get(url, timeout=timeout, raise_for_status=True) as response:
-        stream = response.content
+async def _load_v1(stream: aiohttp.StreamReader, started_at: float) -> tuple[InventoryDict, InventoryTimings]:
+    invdata = defaultdict(list)
+    data = await stream.read()
+    download_time = time.perf_counter() - started_at
+    parse_time = await asyncio.to_thread(_parse_v1, data, invdata)
+    return invdata, InventoryTimings(download_time, parse_time)
 
-        inventory_header = (await stream.readline()).decode().rstrip()
-        try:
-            inventory_version = int(inventory_header[-1:])
-        except ValueError:
-            raise InvalidHeaderError("Unable to convert inventory version header.")
 
-        has_project_header = (await stream.readline()).startswith(b"# Project")
-        has_version_header = (await stream.readline()).startswith(b"# Version")
-        if not (has_project_header and has_version_header):
-            raise InvalidHeaderError("Inventory missing project or version header.")
+async def _load_v2(stream: aiohttp.StreamReader, started_at: float) -> tuple[InventoryDict, InventoryTimings]:
+    """
+    Parse a version 2 inventory from the stream, as it's downloaded.
 
-        if inventory_version == 1:
-            return await _load_v1(stream)
+    Each block of lines is parsed in a thread while the next one is downloaded, so the event loop isn't held up.
+    """
+    invdata = defaultdict(list)
+    parse_time = 0
+    parse_task = None
 
-        if inventory_version == 2:
-            if b"zlib" not in await stream.readline():
-                raise InvalidHeaderError("'zlib' not found in header of compressed inventory.")
-            return await _load_v2(stream)
+    async for block in ZlibStreamReader(stream):
+        # The blocks are parsed one at a time, in order, as they all go into the same dict.
+        if parse_task is not None:
+            parse_time += await parse_task
+        parse_task = asyncio.create_task(asyncio.to_thread(_parse_v2, block, invdata))
 
-        raise InvalidHeaderError("Incompatible inventory version.")
+    download_time = time.perf_counter() - started_at
+    if parse_task is not None:
+        parse_time += await parse_task
+    return invdata, InventoryTimings(download_time, parse_time)
+
+
+async def _fetch_inventory(url: str, validators: InventoryValidators | None) -> FetchedInventory:
+    """Fetch, parse and return an intersphinx inventory file from an url, unless it wasn't modified."""
+    timeout = aiohttp.ClientTimeout(sock_connect=5, sock_read=5)
+    headers = {}
+    if validators is not None:
+        if validators.etag:
+            headers["If-None-Match"] = validators.etag
+        if validators.last_modified:
+            headers["If-Modified-Since"] = validators.last_modified
+
+    started_at = time.perf_counter()
+    async with bot.instance.http_session.get(
+        url, timeout=timeout, headers=headers, raise_for_status=True
+    ) as response:
+        if response.status == 304:
+            return FetchedInventory(None, validators)
+        new_validators = InventoryValidators(response.headers.get("ETag"), response.headers.get("Last-Modified"))
+        inventory, timings = await _load_inventory(response.content, started_at)
+        return FetchedInventory(inventory, new_validators, timings)
+
+
+async def _load_inventory(stream: aiohttp.StreamReader, started_at: float) -> tuple[InventoryDict, InventoryTimings]:
+    """Parse an intersphinx inventory file from the stream, and time it from when it was requested at."""
+    inventory_header = (await stream.readline()).decode().rstrip()
+    try:
+        inventory_version = int(inventory_header[-1:])
+    except ValueError:
+        raise InvalidHeaderError("Unable to convert inventory version header.")
+
+    has_project_header = (await stream.readline()).startswith(b"# Project")
+    has_version_header = (await stream.readline()).startswith(b"# Version")
+    if not (has_project_header and has_version_header):
+        raise InvalidHeaderError("Inventory missing project or version header.")
+
+    if inventory_version == 1:
+        return await _load_v1(stream, started_at)
+
+    if inventory_version == 2:
+        if b"zlib" not in await stream.readline():
+            raise InvalidHeaderError("'zlib' not found in header of compressed inventory.")
+        return await _load_v2(stream, started_at)
+
+    raise InvalidHeaderError("Incompatible inventory version.")
 
 
 async def fetch_inventory(url: str) -> InventoryDict | None:
@@ -119,9 +200,22 @@ async def fetch_inventory(url: str) -> InventoryDict | None:
     `url` should point at a valid sphinx objects.inv inventory file, which will be parsed into the
     inventory dict in the format of {"domain:role": [("symbol_name", "relative_url_to_symbol"), ...], ...}
     """
+    fetched = await fetch_inventory_if_modified(url)
+    return fetched.inventory if fetched else None
+
+
+async def fetch_inventory_if_modified(
+    url: str, validators: InventoryValidators | None = None
+) -> FetchedInventory | None:
+    """
+    Get an inventory dict from `url` along with its validators, retrying `FAILED_REQUEST_ATTEMPTS` times on errors.
+
+    If `validators` from a previous fetch are given, the inventory is only downloaded if it changed since,
+    otherwise the returned inventory is None.
+    """
     for attempt in range(1, FAILED_REQUEST_ATTEMPTS+1):
         try:
-            inventory = await _fetch_inventory(url)
+            fetched = await _fetch_inventory(url, validators)
         except aiohttp.ClientConnectorError:
             log.warning(
                 f"Failed to connect to inventory url at {url}; "
@@ -140,6 +234,6 @@ async def fetch_inventory(url: str) -> InventoryDict | None:
                 f"trying again ({attempt}/{FAILED_REQUEST_ATTEMPTS})."
             )
         else:
-            return inventory
+            return fetched
 
     return None
@@ -4,7 +4,7 @@ import re
 import string
 import textwrap
 from collections import namedtuple
-from collections.abc import Collection, Iterable, Iterator
+from collections.abc import Collection, Iterable, Iterator, Sequence
 from typing import TYPE_CHECKING
 
 from bs4 import BeautifulSoup
@@ -41,6 +41,9 @@ _MAX_DESCRIPTION_LENGTH = 4096 - _MAX_SIGNATURES_LENGTH
 _TRUNCATE_STRIP_CHARACTERS = "!?:;." + string.whitespace
 
 BracketPair = namedtuple("BracketPair", ["opening_bracket", "closing_bracket"])
+# What's needed to parse a symbol off its page, sent to the parsing workers in place of a `DocItem`,
+# so that the workers don't have to import the cog to unpickle them.
+ParseTarget = namedtuple("ParseTarget", ["symbol_id", "group", "url"])
 _BRACKET_PAIRS = {
     "{": BracketPair("{", "}"),
     "(": BracketPair("(", ")"),
@@ -234,7 +237,7 @@ def _create_markdown(signatures: list[str] | None, description: Iterable[Tag], u
     return description
 
 
-def get_symbol_markdown(soup: BeautifulSoup, symbol_data: DocItem) -> str | None:
+def get_symbol_markdown(soup: BeautifulSoup, symbol_data: DocItem | ParseTarget) -> str | None:
     """
     Return parsed Markdown of the passed item using the passed in soup, truncated to fit within a discord message.
 
@@ -262,3 +265,20 @@ def get_symbol_markdown(soup: BeautifulSoup, symbol_data: DocItem) -> str | None
                 tag.decompose()
 
     return _create_markdown(signature, description, symbol_data.url).strip()
+
+
+def get_page_markdown(html: str, targets: Sequence[ParseTarget]) -> dict[ParseTarget, str | None]:
+    """
+    Return the Markdown of all `targets`, which are on the page the `html` is from, parsing the page only once.
+
+    Symbols which couldn't be found on the page map to None; symbols which failed to parse are logged and left out.
+    Meant to be run in a worker process, so only the resulting strings are sent back rather than the parsed tree.
+    """
+    soup = BeautifulSoup(html, "lxml")
+    results = {}
+    for target in targets:
+        try:
+            results[target] = get_symbol_markdown(soup, target)
+        except Exception:
+            log.exception(f"Unexpected error when handling {target}")
+    return results
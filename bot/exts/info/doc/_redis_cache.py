@@ -1,14 +1,19 @@
 from __future__ import annotations
 
+import asyncio
 import datetime
 import fnmatch
+import json
 import time
-from typing import TYPE_CHECKING
+from collections import defaultdict
+from collections.abc import Iterable, Mapping
+from typing import NamedTuple, TYPE_CHECKING
 
 from async_rediscache.types.base import RedisObject
 
 from bot.log import get_logger
-from bot.utils.lock import lock
+
+from ._inventory_parser import InventoryDict, InventoryValidators
 
 if TYPE_CHECKING:
     from ._cog import DocItem
@@ -18,12 +23,6 @@ WEEK_SECONDS = int(datetime.timedelta(weeks=1).total_seconds())
 log = get_logger(__name__)
 
 
-def serialize_resource_id_from_doc_item(bound_args: dict) -> str:
-    """Return the redis_key of the DocItem `item` from the bound args of DocRedisCache.set."""
-    item: DocItem = bound_args["item"]
-    return f"doc:{item_key(item)}"
-
-
 class DocRedisCache(RedisObject):
     """Interface for redis functionality needed by the Doc cog."""
 
@@ -31,40 +30,38 @@ class DocRedisCache(RedisObject):
         super().__init__(*args, **kwargs)
         self._set_expires = dict[str, float]()
 
-    @lock("DocRedisCache.set", serialize_resource_id_from_doc_item, wait=True)
     async def set(self, item: DocItem, value: str) -> None:
+        """Set the Markdown `value` for the symbol `item`."""
+        await self.set_many({item: value})
+
+    async def set_many(self, page_items: Mapping[DocItem, str]) -> None:
         """
-        Set the Markdown `value` for the symbol `item`.
+        Set the Markdown of each of the symbols in `page_items`, which must all be on the same page.
 
         All keys from a single page are stored together, expiring a week after the first set.
+        The values are sent in a single transaction along with a check of the page's TTL, and the expire is only set
+        if the page had none. Concurrent first sets to the same page may both set it, which comes out the same,
+        so no locking is needed.
         """
-        redis_key = f"{self.namespace}:{item_key(item)}"
-        needs_expire = False
-
+        redis_key = f"{self.namespace}:{item_key(next(iter(page_items)))}"
         set_expire = self._set_expires.get(redis_key)
-        if set_expire is None:
-            # An expire is only set if the key didn't exist before.
-            ttl = await self.redis_session.client.ttl(redis_key)
-            log.debug(f"Checked TTL for `{redis_key}`.")
-
-            if ttl == -1:
-                log.warning(f"Key `{redis_key}` had no expire set.")
-            if ttl < 0:  # not set or didn't exist
-                needs_expire = True
-            else:
-                log.debug(f"Key `{redis_key}` has a {ttl} TTL.")
-                self._set_expires[redis_key] = time.monotonic() + ttl - .1  # we need this to expire before redis
-
-        elif time.monotonic() > set_expire:
-            # If we got here the key expired in redis and we can be sure it doesn't exist.
-            needs_expire = True
-            log.debug(f"Key `{redis_key}` expired in internal key cache.")
-
-        await self.redis_session.client.hset(redis_key, item.symbol_id, value)
-        if needs_expire:
-            self._set_expires[redis_key] = time.monotonic() + WEEK_SECONDS
+        expire_known = set_expire is not None and time.monotonic() < set_expire
+
+        async with self.redis_session.client.pipeline() as pipe:
+            pipe.hset(redis_key, mapping={item.symbol_id: value for item, value in page_items.items()})
+            if not expire_known:
+                pipe.ttl(redis_key)
+            _, *ttl = await pipe.execute()
+
+        if not ttl:
+            return
+        if ttl[0] < 0:  # The page didn't exist before, or had no expire.
             await self.redis_session.client.expire(redis_key, WEEK_SECONDS)
+            self._set_expires[redis_key] = time.monotonic() + WEEK_SECONDS
             log.info(f"Set {redis_key} to expire in a week.")
+        else:
+            log.debug(f"Key `{redis_key}` has a {ttl[0]} TTL.")
+            self._set_expires[redis_key] = time.monotonic() + ttl[0] - .1  # we need this to expire before redis
 
     async def get(self, item: DocItem) -> str | None:
         """Return the Markdown content of the symbol `item` if it exists."""
@@ -86,6 +83,15 @@ class DocRedisCache(RedisObject):
             return True
         return False
 
+    async def delete_pages(self, items: Iterable[DocItem]) -> None:
+        """Remove the values of all symbols on the pages of `items`."""
+        page_keys = {f"{self.namespace}:{item_key(item)}" for item in items}
+        if page_keys:
+            await self.redis_session.client.delete(*page_keys)
+            log.debug(f"Deleted keys from redis: {page_keys}.")
+            for key in page_keys:
+                self._set_expires.pop(key, None)
+
 
 class StaleItemCounter(RedisObject):
     """Manage increment counters for stale `DocItem`s."""
@@ -112,6 +118,51 @@ class StaleItemCounter(RedisObject):
         return False
 
 
+class SnapshotEntry(NamedTuple):
+    """The last fetched inventory of a package, along with where it was fetched from."""
+
+    inventory_url: str
+    validators: InventoryValidators
+    inventory: InventoryDict
+
+
+class InventorySnapshot(RedisObject):
+    """
+    Store the last fetched inventory of each package.
+
+    This allows building the symbols right away on startup, and only downloading the inventories again if they changed.
+    """
+
+    async def get_all(self) -> dict[str, SnapshotEntry]:
+        """Return the snapshot entries of all packages."""
+        raw_entries = await self.redis_session.client.hgetall(self.namespace)
+        # The inventories add up to many megabytes, so they're decoded without blocking the event loop.
+        return await asyncio.to_thread(self._decode_entries, raw_entries)
+
+    @staticmethod
+    def _decode_entries(raw_entries: dict[str, str]) -> dict[str, SnapshotEntry]:
+        """Decode the stored snapshot entries."""
+        entries = {}
+        for package, raw_entry in raw_entries.items():
+            data = json.loads(raw_entry)
+            inventory = defaultdict(list)
+            for group, items in data["inventory"].items():
+                inventory[group] = [tuple(item) for item in items]
+            entries[package] = SnapshotEntry(
+                data["inventory_url"], InventoryValidators(*data["validators"]), inventory
+            )
+        return entries
+
+    async def set(self, package: str, entry: SnapshotEntry) -> None:
+        """Store the snapshot entry of `package`."""
+        await self.redis_session.client.hset(self.namespace, package, json.dumps(entry._asdict()))
+
+    async def delete(self, *packages: str) -> None:
+        """Remove the snapshot entries of the packages."""
+        if packages:
+            await self.redis_session.client.hdel(self.namespace, *packages)
+
+
 def item_key(item: DocItem) -> str:
     """Get the redis redis key string from `item`."""
     return f"{item.package}:{item.relative_url_path.removesuffix('.html')}"
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import heapq
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from collections.abc import Iterable, Iterator, Mapping
+from itertools import islice
+
+from rapidfuzz import fuzz
+
+# The most edits a misspelled name can be away from a symbol for the symbol to be found,
+# each of which can change up to three of the name's trigrams.
+MAX_EDITS = 2
+# The number of the name's rarest trigrams candidates are looked up by,
+# chosen so that a symbol within `MAX_EDITS` edits of the name always shares at least one of them.
+LOOKUP_TRIGRAMS = 3 * MAX_EDITS + 1
+# The number of candidates which share the most trigrams with the name that are scored in each package.
+CANDIDATES_PER_PACKAGE = 20
+# The minimum similarity, out of 100, for a symbol to be suggested.
+SUGGESTION_CUTOFF = 75
+
+
+def _trigrams(folded_name: str) -> set[str]:
+    """Return the trigrams of the name, padded so the start of the name weighs more than the rest."""
+    padded = f"  {folded_name} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _sort_key(name: str) -> tuple[str, str]:
+    """Sort names ignoring case, with ties broken by the original name so the order is always the same."""
+    return name.casefold(), name
+
+
+class PackageIndex:
+    """The names of the symbols of a single package, indexed for prefix and fuzzy lookups. Never modified once built."""
+
+    def __init__(self, names: Iterable[str]):
+        self.names = sorted(names, key=_sort_key)
+        # Names which are already folded are shared, rather than stored twice.
+        self.folded_names = [folded if (folded := name.casefold()) != name else name for name in self.names]
+
+        trigram_positions: dict[str, array[int]] = {}
+        for position, folded in enumerate(self.folded_names):
+            for trigram in _trigrams(folded):
+                if (positions := trigram_positions.get(trigram)) is None:
+                    positions = trigram_positions[trigram] = array("I")
+                positions.append(position)
+        self.trigram_positions = trigram_positions
+
+    def complete(self, folded_prefix: str) -> Iterator[tuple[str, str]]:
+        """Return the folded and original names starting with the prefix, in order."""
+        position = bisect_left(self.folded_names, folded_prefix)
+        while position < len(self.folded_names) and self.folded_names[position].startswith(folded_prefix):
+            yield self.folded_names[position], self.names[position]
+            position += 1
+
+    def candidates(self, trigrams: Iterable[str]) -> list[tuple[int, str, str]]:
+        """Return the names which share the most of the trigrams, with the number they share."""
+        positions = [self.trigram_positions[trigram] for trigram in trigrams if trigram in self.trigram_positions]
+        # The rarest trigrams are enough to find every close enough name, and are much cheaper to count.
+        positions.sort(key=len)
+        shared_trigrams = Counter()
+        for trigram_positions in positions[:LOOKUP_TRIGRAMS]:
+            shared_trigrams.update(trigram_positions)
+        return [
+            (shared, self.folded_names[position], self.names[position])
+            for position, shared in shared_trigrams.most_common(CANDIDATES_PER_PACKAGE)
+        ]
+
+
+class SymbolIndex:
+    """
+    An index of symbol names for completing prefixes and suggesting names close to misspelled ones.
+
+    The index is split by package, so that after a refresh only the packages whose symbols changed are indexed again.
+    """
+
+    def __init__(self, packages: Mapping[str, PackageIndex] | None = None):
+        self.packages = dict(packages or {})
+
+    def updated(self, names_by_package: Mapping[str, Iterable[str]]) -> SymbolIndex:
+        """Return an index of the given names, reusing the indexes of the packages whose names didn't change."""
+        packages = {}
+        for package, names in names_by_package.items():
+            names = sorted(names, key=_sort_key)
+            old_index = self.packages.get(package)
+            if old_index is not None and old_index.names == names:
+                packages[package] = old_index
+            else:
+                packages[package] = PackageIndex(names)
+        return SymbolIndex(packages)
+
+    def complete(self, prefix: str, limit: int = 25) -> list[str]:
+        """Return up to `limit` names starting with `prefix`, ignoring case, in alphabetical order."""
+        folded_prefix = prefix.casefold()
+        completions = heapq.merge(*(package.complete(folded_prefix) for package in self.packages.values()))
+        return [name for _, name in islice(completions, limit)]
+
+    def suggest(self, name: str, limit: int = 5) -> list[str]:
+        """Return up to `limit` names which are similar to `name`, the most similar first."""
+        folded_name = name.casefold()
+        trigrams = _trigrams(folded_name)
+
+        candidates = []
+        for package in self.packages.values():
+            candidates.extend(package.candidates(trigrams))
+        candidates = heapq.nlargest(limit * 4, candidates)
+
+        scored = []
+        for _, folded_candidate, candidate in candidates:
+            score = fuzz.ratio(folded_name, folded_candidate, score_cutoff=SUGGESTION_CUTOFF)
+            if score:
+                scored.append((score, candidate))
+        scored.sort(key=lambda scored_candidate: scored_candidate[0], reverse=True)
+        return [candidate for _, candidate in scored[:limit]]
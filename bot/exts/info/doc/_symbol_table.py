@@ -0,0 +1,329 @@
+from __future__ import annotations
+
+import sys
+from array import array
+from collections import defaultdict
+from collections.abc import Iterable
+
+from bot.log import get_logger
+
+from . import PRIORITY_PACKAGES, _cog
+from ._inventory_parser import InventoryDict
+from ._search import SymbolIndex
+
+log = get_logger(__name__)
+
+# symbols with a group contained here will get the group prefixed on duplicates
+FORCE_PREFIX_GROUPS = (
+    "term",
+    "label",
+    "token",
+    "doc",
+    "pdbcommand",
+    "2to3fixer",
+)
+
+
+class SymbolTable:
+    """
+    The symbols of all loaded inventories, along with the pages they're on.
+
+    A refresh builds a new table next to the one in use and swaps it in once it's complete,
+    so symbols can be served from a consistent table at any point.
+
+    With 100k+ symbols loaded, an object per symbol adds up to a lot of memory, so the symbols are stored in columns.
+    Each symbol is a row, which points into the tables of distinct packages, groups and pages,
+    and `DocItem`s are only created when a symbol is looked up.
+    """
+
+    def __init__(self):
+        # Contains URLs to documentation home pages.
+        self.base_urls: dict[str, str] = {}
+        # Maps a conflicting symbol name to a list of the new, disambiguated names created from conflicts with the name.
+        self.renamed_symbols: defaultdict[str, list[str]] = defaultdict(list)
+        # Only updated by `update_index`, once all packages have been added.
+        self.index = SymbolIndex()
+
+        self._packages: list[str] = []
+        self._package_ids: dict[str, int] = {}
+        self._groups: list[str] = []
+        self._group_ids: dict[str, int] = {}
+
+        # Pages are identified by their package and URL, and point to the rows of the symbols on them.
+        self._page_ids: dict[tuple[int, str], int] = {}
+        self._page_packages = array("I")
+        self._page_paths: list[str] = []
+        self._page_rows: list[array] = []
+        self._package_pages: dict[str, list[int]] = {}
+
+        # Maps symbol names to their rows. Renamed symbols may have more than one name.
+        self._symbol_rows: dict[str, int] = {}
+        self._symbol_pages = array("I")
+        self._symbol_groups = array("I")
+        self._symbol_ids: list[str] = []
+
+    def __len__(self) -> int:
+        return len(self._symbol_rows)
+
+    def copy(self) -> SymbolTable:
+        """Return a copy of the table which packages can be added to without changing this one."""
+        table = SymbolTable()
+        table.base_urls = self.base_urls.copy()
+        table.renamed_symbols = defaultdict(list, {name: names.copy() for name, names in self.renamed_symbols.items()})
+        table.index = self.index
+
+        table._packages = self._packages.copy()
+        table._package_ids = self._package_ids.copy()
+        table._groups = self._groups.copy()
+        table._group_ids = self._group_ids.copy()
+
+        table._page_ids = self._page_ids.copy()
+        table._page_packages = array("I", self._page_packages)
+        table._page_paths = self._page_paths.copy()
+        # Rows are only ever added to new pages, so the rows of the existing ones can be shared.
+        table._page_rows = self._page_rows.copy()
+        table._package_pages = self._package_pages.copy()
+
+        table._symbol_rows = self._symbol_rows.copy()
+        table._symbol_pages = array("I", self._symbol_pages)
+        table._symbol_groups = array("I", self._symbol_groups)
+        table._symbol_ids = self._symbol_ids.copy()
+        return table
+
+    @staticmethod
+    def _intern_id(values: list[str], ids: dict[str, int], value: str) -> int:
+        """Return the index of `value` in `values`, adding it if it isn't there yet."""
+        if (value_id := ids.get(value)) is None:
+            value_id = ids[value] = len(values)
+            values.append(value)
+        return value_id
+
+    def add_package(self, package_name: str, base_url: str, inventory: InventoryDict) -> None:
+        """
+        Add the symbols from the inventory of a single package.
+
+        Where:
+            * `package_name` is the package name to use in logs and when qualifying symbols
+            * `base_url` is the root documentation URL for the specified package, used to build
+                absolute paths that link to specific symbols
+            * `inventory` is the content of a intersphinx inventory.
+        """
+        package_id = self._intern_id(self._packages, self._package_ids, package_name)
+        # If the package was already added, its old pages are left behind and its names are pointed to the new rows.
+        for page_id in self._package_pages.get(package_name, ()):
+            del self._page_ids[package_id, self.base_urls[package_name] + self._page_paths[page_id]]
+        package_pages = self._package_pages[package_name] = []
+        self.base_urls[package_name] = base_url
+
+        for group, items in inventory.items():
+            # e.g. get 'class' from 'py:class'
+            group_name = group.split(":")[1]
+            group_id = self._intern_id(self._groups, self._group_ids, group_name)
+
+            for symbol_name, relative_doc_url in items:
+                symbol_name = self.ensure_unique_symbol_name(
+                    package_name,
+                    group_name,
+                    symbol_name,
+                )
+
+                relative_url_path, _, symbol_id = relative_doc_url.partition("#")
+                page_key = (package_id, base_url + relative_url_path)
+                if (page_id := self._page_ids.get(page_key)) is None:
+                    page_id = self._page_ids[page_key] = len(self._page_paths)
+                    self._page_packages.append(package_id)
+                    self._page_paths.append(relative_url_path)
+                    self._page_rows.append(array("I"))
+                    package_pages.append(page_id)
+
+                row = len(self._symbol_ids)
+                self._symbol_pages.append(page_id)
+                self._symbol_groups.append(group_id)
+                # Most fragment ids are the same as the symbol's name, in which case the name's string is shared.
+                self._symbol_ids.append(symbol_name if symbol_id == symbol_name else symbol_id)
+                self._page_rows[page_id].append(row)
+                self._symbol_rows[symbol_name] = row
+
+        log.trace(f"Fetched inventory for {package_name}.")
+
+    def _doc_item(self, row: int) -> _cog.DocItem:
+        """Create the `DocItem` of the symbol in `row`."""
+        page_id = self._symbol_pages[row]
+        package_name = self._packages[self._page_packages[page_id]]
+        return _cog.DocItem(
+            package_name,
+            self._groups[self._symbol_groups[row]],
+            self.base_urls[package_name],
+            self._page_paths[page_id],
+            self._symbol_ids[row],
+        )
+
+    def get(self, symbol_name: str) -> _cog.DocItem | None:
+        """Return the `DocItem` of the symbol with the given name, or None if there's no such symbol."""
+        if (row := self._symbol_rows.get(symbol_name)) is None:
+            return None
+        return self._doc_item(row)
+
+    def ensure_unique_symbol_name(self, package_name: str, group_name: str, symbol_name: str) -> str:
+        """
+        Ensure `symbol_name` doesn't overwrite an another symbol in the table.
+
+        For conflicts, rename either the current symbol or the existing symbol with which it conflicts.
+        Store the new name in `renamed_symbols` and return the name to use for the symbol.
+
+        If the existing symbol was renamed or there was no conflict, the returned name is equivalent to `symbol_name`.
+        """
+        if (item := self.get(symbol_name)) is None:
+            return symbol_name  # There's no conflict so it's fine to simply use the given symbol name.
+
+        def rename(prefix: str, *, rename_extant: bool = False) -> str:
+            new_name = f"{prefix}.{symbol_name}"
+            if new_name in self._symbol_rows:
+                # If there's still a conflict, qualify the name further.
+                if rename_extant:
+                    new_name = f"{item.package}.{item.group}.{symbol_name}"
+                else:
+                    new_name = f"{package_name}.{group_name}.{symbol_name}"
+
+            self.renamed_symbols[symbol_name].append(new_name)
+
+            if rename_extant:
+                # Instead of renaming the current symbol, rename the symbol with which it conflicts.
+                self._symbol_rows[new_name] = self._symbol_rows[symbol_name]
+                return symbol_name
+            return new_name
+
+        # When there's a conflict, and the package names of the items differ, use the package name as a prefix.
+        if package_name != item.package:
+            if package_name in PRIORITY_PACKAGES:
+                return rename(item.package, rename_extant=True)
+            return rename(package_name)
+
+        # If the symbol's group is a non-priority group from FORCE_PREFIX_GROUPS,
+        # add it as a prefix to disambiguate the symbols.
+        if group_name in FORCE_PREFIX_GROUPS:
+            if item.group in FORCE_PREFIX_GROUPS:
+                needs_moving = FORCE_PREFIX_GROUPS.index(group_name) < FORCE_PREFIX_GROUPS.index(item.group)
+            else:
+                needs_moving = False
+            return rename(item.group if needs_moving else group_name, rename_extant=needs_moving)
+
+        # If the above conditions didn't pass, either the existing symbol has its group in FORCE_PREFIX_GROUPS,
+        # or deciding which item to rename would be arbitrary, so we rename the existing symbol.
+        return rename(item.group, rename_extant=True)
+
+    def get_symbol_item(self, symbol_name: str) -> tuple[str, _cog.DocItem | None]:
+        """
+        Get the `DocItem` and the symbol name used to fetch it from the table.
+
+        If the doc item is not found directly from the passed in name and the name contains a space,
+        the first word of the name will be attempted to be used to get the item.
+        """
+        doc_item = self.get(symbol_name)
+        if doc_item is None and " " in symbol_name:
+            symbol_name = symbol_name.split(maxsplit=1)[0]
+            doc_item = self.get(symbol_name)
+
+        return symbol_name, doc_item
+
+    def page_items(self, doc_item: _cog.DocItem) -> set[_cog.DocItem]:
+        """Return the items of all symbols on the same page as `doc_item`."""
+        return self._page_items(doc_item.package, doc_item.url)
+
+    def _page_items(self, package_name: str, url: str) -> set[_cog.DocItem]:
+        """Return the items on the page of the package with the given URL."""
+        if (page_id := self._page_ids.get((self._package_ids.get(package_name), url))) is None:
+            return set()
+        return {self._doc_item(row) for row in self._page_rows[page_id]}
+
+    def update_index(self, previous_index: SymbolIndex) -> None:
+        """Index the symbol names, reusing the indexes of packages whose names are the same in `previous_index`."""
+        names_by_package = defaultdict(list)
+        for symbol_name, row in self._symbol_rows.items():
+            names_by_package[self._page_packages[self._symbol_pages[row]]].append(symbol_name)
+        self.index = previous_index.updated(
+            {self._packages[package_id]: names for package_id, names in names_by_package.items()}
+        )
+
+    def suggestions(self, symbol_name: str, limit: int = 5) -> list[str]:
+        """Return up to `limit` symbol names the user may have meant, when `symbol_name` doesn't exist."""
+        return self.index.suggest(symbol_name, limit) or self.index.complete(symbol_name, limit)
+
+    def _page_contents(self, package_name: str) -> dict[str, frozenset[tuple[str, str]]]:
+        """Return the group and fragment id of the symbols on each of the pages of the package, by URL."""
+        base_url = self.base_urls.get(package_name, "")
+        return {
+            base_url + self._page_paths[page_id]: frozenset(
+                (self._groups[self._symbol_groups[row]], self._symbol_ids[row]) for row in self._page_rows[page_id]
+            )
+            for page_id in self._package_pages.get(package_name, ())
+        }
+
+    def changed_pages(
+        self, other: SymbolTable, packages: Iterable[str]
+    ) -> dict[str, tuple[set[_cog.DocItem], set[_cog.DocItem]]]:
+        """
+        Return the pages of the `packages` whose symbols differ in `other`, with their items in this table and `other`.
+
+        Packages are compared as a whole first, so only the pages of packages which changed are looked at.
+        """
+        changed = {}
+        for package in packages:
+            old_pages = self._page_contents(package)
+            new_pages = other._page_contents(package)
+            if old_pages == new_pages:
+                continue
+            for url in old_pages.keys() | new_pages.keys():
+                if old_pages.get(url) != new_pages.get(url):
+                    changed[url] = (self._page_items(package, url), other._page_items(package, url))
+        return changed
+
+    def memory_usage(self) -> dict[str, int]:
+        """
+        Return an estimate of how many bytes each part of the table takes up.
+
+        Every object in the table is gone over, so this is slow with all inventories loaded.
+        """
+        seen = set()
+
+        def size(objects: Iterable[object]) -> int:
+            total = 0
+            for obj in objects:
+                if id(obj) not in seen:
+                    seen.add(id(obj))
+                    total += sys.getsizeof(obj)
+            return total
+
+        usage = {
+            "names": size([self._symbol_rows, *self._symbol_rows, *self._symbol_rows.values()]),
+            "symbols": size([self._symbol_pages, self._symbol_groups, self._symbol_ids, *self._symbol_ids]),
+            "pages": size([
+                self._page_ids,
+                *self._page_ids,
+                *(url for _, url in self._page_ids),
+                *self._page_ids.values(),
+                self._page_packages,
+                self._page_paths,
+                *self._page_paths,
+                self._page_rows,
+                *self._page_rows,
+            ]),
+            "renamed symbols": size([
+                self.renamed_symbols,
+                *self.renamed_symbols,
+                *self.renamed_symbols.values(),
+                *(name for names in self.renamed_symbols.values() for name in names),
+            ]),
+            "search index": 0,
+        }
+        for package_index in self.index.packages.values():
+            usage["search index"] += size([
+                package_index.names,
+                *package_index.names,
+                package_index.folded_names,
+                *package_index.folded_names,
+                package_index.trigram_positions,
+                *package_index.trigram_positions,
+                *package_index.trigram_positions.values(),
+            ])
+        return usage
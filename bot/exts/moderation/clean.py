@@ -19,7 +19,7 @@ from bot.constants import Channels, CleanMessages, Colours, Emojis, Event, Icons
 from bot.converters import Age, ISODateTime
 from bot.exts.moderation.modlog import ModLog
 from bot.log import get_logger
-from bot.utils.channel import is_mod_channel
+from bot.utils.channel import channel_visibility, is_mod_channel
 from bot.utils.messages import upload_log
 from bot.utils.modlog import send_log_message
 
@@ -137,7 +137,7 @@ class Clean(Cog):
                     channel for channel in itertools.chain(ctx.guild.channels, ctx.guild.threads)
                     if isinstance(channel, TextChannel | Thread)
                     # Assume that non-public channels are not needed to optimize for speed.
-                    and channel.permissions_for(ctx.guild.default_role).view_channel
+                    and channel_visibility.can_view(channel, ctx.guild.default_role)
                 }
             else:
                 channels = set(channels)
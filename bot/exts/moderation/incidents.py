@@ -11,6 +11,7 @@ from pydis_core.utils import scheduling
 from bot.bot import Bot
 from bot.constants import Channels, Colours, Emojis, Guild, Roles, Webhooks
 from bot.log import get_logger
+from bot.utils.channel import channel_visibility
 from bot.utils.messages import format_user, sub_clyde
 from bot.utils.time import TimestampFormats, discord_timestamp
 
@@ -223,7 +224,7 @@ async def make_message_link_embed(ctx: Context, message_link: str) -> discord.Em
         log.exception(f"Failed to make message link embed for '{message_link}', raised exception: {e}")
     else:
         channel = message.channel
-        if not channel.permissions_for(channel.guild.get_role(Roles.helpers)).view_channel:
+        if not channel_visibility.can_view(channel, channel.guild.get_role(Roles.helpers)):
             log.info(
                 f"Helpers don't have read permissions in #{channel.name},"
                 f" not sending message link embed for {message_link}"
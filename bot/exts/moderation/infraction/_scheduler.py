@@ -2,6 +2,7 @@ import textwrap
 import typing as t
 from abc import abstractmethod
 from collections.abc import Awaitable, Callable
+from datetime import datetime
 from gettext import ngettext
 
 import arrow
@@ -9,7 +10,6 @@ import dateutil.parser
 import discord
 from discord.ext.commands import Context
 from pydis_core.site_api import ResponseCodeError
-from pydis_core.utils import scheduling
 
 from bot import constants
 from bot.bot import Bot
@@ -20,6 +20,7 @@ from bot.exts.moderation.modlog import ModLog
 from bot.log import get_logger
 from bot.utils import messages, time
 from bot.utils.channel import is_mod_channel
+from bot.utils.deadlines import DeadlineScheduler, catch_up
 from bot.utils.modlog import send_log_message
 
 log = get_logger(__name__)
@@ -30,11 +31,16 @@ class InfractionScheduler:
 
     def __init__(self, bot: Bot, supported_infractions: t.Container[str]):
         self.bot = bot
-        self.scheduler = scheduling.Scheduler(self.__class__.__name__)
+        self.scheduler = DeadlineScheduler(
+            self.__class__.__name__,
+            self.deactivate_infraction,
+            self._load_expiring_infractions,
+            catch_up=self._catch_up_expired_infractions,
+        )
         self.supported_infractions = supported_infractions
 
     async def cog_unload(self) -> None:
-        """Cancel scheduled tasks."""
+        """Stop expiring infractions."""
         self.scheduler.cancel_all()
 
     @property
@@ -43,41 +49,46 @@ class InfractionScheduler:
         return self.bot.get_cog("ModLog")
 
     async def cog_load(self) -> None:
-        """Schedule expiration for previous infractions."""
+        """Start expiring previous infractions."""
         await self.bot.wait_until_guild_available()
-        supported_infractions = self.supported_infractions
-
-        log.trace(f"Rescheduling infractions for {self.__class__.__name__}.")
 
-        infractions = await self.bot.api_client.get(
-            "bot/infractions",
-            params={
-                "active": "true",
-                "ordering": "expires_at",
-                "permanent": "false",
-                "types": ",".join(supported_infractions),
-            },
+        log.trace(f"Scheduling infractions for {self.__class__.__name__}.")
+        self.scheduler.start()
+
+    async def _load_expiring_infractions(
+        self, after: datetime | None, until: datetime
+    ) -> list[tuple[int, datetime, _utils.Infraction]]:
+        """Get the active infractions expiring after `after` up to `until`, to be scheduled for expiration."""
+        params = {
+            "active": "true",
+            "ordering": "expires_at",
+            "permanent": "false",
+            "types": ",".join(self.supported_infractions),
+            "expires_before": until.isoformat(),
+        }
+        if after is not None:
+            params["expires_after"] = after.isoformat()
+
+        infractions = await self.bot.api_client.get("bot/infractions", params=params)
+        return [
+            (infraction["id"], dateutil.parser.isoparse(infraction["expires_at"]), infraction)
+            for infraction in infractions
+        ]
+
+    async def _catch_up_expired_infractions(self, infractions: list[_utils.Infraction]) -> None:
+        """Deactivate the infractions which expired while the bot was down, a few users at a time."""
+        async def deactivate(batch: list[_utils.Infraction]) -> None:
+            for infraction in batch:
+                await self.deactivate_infraction(infraction)
+
+        await catch_up(
+            f"infractions.{self.__class__.__name__.lower()}",
+            infractions,
+            deactivate,
+            due=lambda infraction: dateutil.parser.isoparse(infraction["expires_at"]),
+            group=lambda infraction: infraction["user"],
         )
 
-        to_schedule = [i for i in infractions if i["id"] not in self.scheduler]
-
-        for infraction in to_schedule:
-            log.trace("Scheduling %r", infraction)
-            self.schedule_expiration(infraction)
-
-        # Call ourselves again when the last infraction would expire. This will be the "oldest" infraction we've seen
-        # from the database so far, and new ones are scheduled as part of application.
-        # We make sure to fire this
-        if to_schedule:
-            next_reschedule_point = max(
-                dateutil.parser.isoparse(infr["expires_at"]) for infr in to_schedule
-            )
-            log.trace("Will reschedule remaining infractions at %s", next_reschedule_point)
-
-            self.scheduler.schedule_at(next_reschedule_point, -1, self.cog_load())
-
-        log.trace("Done rescheduling")
-
     async def reapply_infraction(
         self,
         infraction: _utils.Infraction,
@@ -503,7 +514,7 @@ class InfractionScheduler:
             else:
                 log_text["Failure"] = log_line
 
-        # Cancel the expiration task.
+        # Cancel the scheduled expiration.
         if infraction["expires_at"] is not None:
             self.scheduler.cancel(infraction["id"])
 
@@ -549,8 +560,7 @@ class InfractionScheduler:
         """
         Marks an infraction expired after the delay from time of scheduling to time of expiration.
 
-        At the time of expiration, the infraction is marked as inactive on the website and the
-        expiration task is cancelled.
+        At the time of expiration, the infraction is marked as inactive on the website.
         """
         expiry = dateutil.parser.isoparse(infraction["expires_at"])
-        self.scheduler.schedule_at(expiry, infraction["id"], self.deactivate_infraction(infraction))
+        self.scheduler.schedule_at(expiry, infraction["id"], infraction)
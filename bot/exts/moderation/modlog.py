@@ -1,7 +1,9 @@
-import asyncio
 import difflib
 import itertools
+from collections import deque
+from collections.abc import Hashable
 from datetime import UTC, datetime
+from time import monotonic
 
 import discord
 from dateutil.relativedelta import relativedelta
@@ -10,12 +12,12 @@ from discord import Colour, Message, Thread
 from discord.abc import GuildChannel
 from discord.ext.commands import Cog
 from discord.utils import escape_markdown, format_dt, snowflake_time
-from pydis_core.utils.channel import get_or_fetch_channel
 
 from bot.bot import Bot
 from bot.constants import Channels, Colours, Emojis, Event, Guild as GuildConstant, Icons, Roles
 from bot.log import get_logger
 from bot.utils import time
+from bot.utils.channel import channel_visibility
 from bot.utils.messages import format_user, upload_log
 from bot.utils.modlog import send_log_message
 
@@ -33,21 +35,58 @@ VOICE_STATE_ATTRIBUTES = {
     "self_video": "Broadcasting",
 }
 
+# How long an item is ignored for, in seconds, if the event it's ignored for doesn't happen.
+IGNORED_ITEM_TTL = 10 * 60
+
+
+class ExpiringSet:
+    """A set whose items are dropped once they've been in it for `ttl` seconds."""
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._expiries: dict[Hashable, float] = {}
+        # The items in the order they expire in, as they all live for the same time.
+        # Items which were removed or added again since are skipped when they come up.
+        self._queue: deque[tuple[float, Hashable]] = deque()
+
+    def __contains__(self, item: Hashable) -> bool:
+        self._drop_expired()
+        return item in self._expiries
+
+    def __len__(self) -> int:
+        self._drop_expired()
+        return len(self._expiries)
+
+    def add(self, item: Hashable) -> None:
+        """Add the item, restarting its time to live if it's already in the set."""
+        self._drop_expired()
+        expiry = self._expiries[item] = monotonic() + self.ttl
+        self._queue.append((expiry, item))
+
+    def discard(self, item: Hashable) -> None:
+        """Remove the item if it's in the set."""
+        self._expiries.pop(item, None)
+
+    def _drop_expired(self) -> None:
+        now = monotonic()
+        while self._queue and self._queue[0][0] <= now:
+            expiry, item = self._queue.popleft()
+            if self._expiries.get(item) == expiry:
+                del self._expiries[item]
+
 
 class ModLog(Cog, name="ModLog"):
     """Logging for server events and staff actions."""
 
     def __init__(self, bot: Bot):
         self.bot = bot
-        self._ignored = {event: [] for event in Event}
-
-        self._cached_edits = []
+        # Items are only ignored for a while, in case the event they're ignored for never happens.
+        self._ignored = {event: ExpiringSet(IGNORED_ITEM_TTL) for event in Event}
 
     def ignore(self, event: Event, *items: int) -> None:
         """Add event to ignored events to suppress log emission."""
         for item in items:
-            if item not in self._ignored[event]:
-                self._ignored[event].append(item)
+            self._ignored[event].add(item)
 
     @Cog.listener()
     async def on_guild_channel_create(self, channel: GUILD_CHANNEL) -> None:
@@ -108,7 +147,7 @@ class ModLog(Cog, name="ModLog"):
             return
 
         if before.id in self._ignored[Event.guild_channel_update]:
-            self._ignored[Event.guild_channel_update].remove(before.id)
+            self._ignored[Event.guild_channel_update].discard(before.id)
             return
 
         diff = DeepDiff(before, after)
@@ -312,7 +351,7 @@ class ModLog(Cog, name="ModLog"):
             return
 
         if member.id in self._ignored[Event.member_ban]:
-            self._ignored[Event.member_ban].remove(member.id)
+            self._ignored[Event.member_ban].discard(member.id)
             return
 
         await send_log_message(
@@ -356,7 +395,7 @@ class ModLog(Cog, name="ModLog"):
             return
 
         if member.id in self._ignored[Event.member_remove]:
-            self._ignored[Event.member_remove].remove(member.id)
+            self._ignored[Event.member_remove].discard(member.id)
             return
 
         await send_log_message(
@@ -376,7 +415,7 @@ class ModLog(Cog, name="ModLog"):
             return
 
         if member.id in self._ignored[Event.member_unban]:
-            self._ignored[Event.member_unban].remove(member.id)
+            self._ignored[Event.member_unban].discard(member.id)
             return
 
         await send_log_message(
@@ -411,7 +450,7 @@ class ModLog(Cog, name="ModLog"):
             return
 
         if before.id in self._ignored[Event.member_update]:
-            self._ignored[Event.member_update].remove(before.id)
+            self._ignored[Event.member_update].discard(before.id)
             return
 
         changes = self.get_role_diff(before.roles, after.roles)
@@ -480,14 +519,12 @@ class ModLog(Cog, name="ModLog"):
         if not channel or channel.guild is None or channel.guild.id != GuildConstant.id:
             return True
 
-        # Look at the parent channel of a thread.
-        if isinstance(channel, Thread):
-            channel = channel.parent
-
-        # Mod team doesn't have view permission to the channel.
-        if not channel.permissions_for(channel.guild.get_role(Roles.mod_team)).view_channel:
+        # Mod team doesn't have view permission to the channel, or parent channel in the case of threads.
+        if not channel_visibility.can_view(channel, channel.guild.get_role(Roles.mod_team)):
             return True
 
+        if isinstance(channel, Thread):
+            channel = channel.parent
         return channel.id in GuildConstant.modlog_blacklist
 
     async def log_cached_deleted_message(self, message: discord.Message) -> None:
@@ -503,7 +540,7 @@ class ModLog(Cog, name="ModLog"):
             return
 
         if message.id in self._ignored[Event.message_delete]:
-            self._ignored[Event.message_delete].remove(message.id)
+            self._ignored[Event.message_delete].discard(message.id)
             return
 
         if channel.category:
@@ -585,7 +622,7 @@ class ModLog(Cog, name="ModLog"):
             return
 
         if event.message_id in self._ignored[Event.message_delete]:
-            self._ignored[Event.message_delete].remove(event.message_id)
+            self._ignored[Event.message_delete].discard(event.message_id)
             return
 
         channel = self.bot.get_channel(event.channel_id)
@@ -630,8 +667,6 @@ class ModLog(Cog, name="ModLog"):
         if self.is_message_blacklisted(msg_before):
             return
 
-        self._cached_edits.append(msg_before.id)
-
         if msg_before.content == msg_after.content:
             return
 
@@ -703,25 +738,32 @@ class ModLog(Cog, name="ModLog"):
 
     @Cog.listener()
     async def on_raw_message_edit(self, event: discord.RawMessageUpdateEvent) -> None:
-        """Log raw message edit event to message change log."""
-        if event.guild_id is None:
-            return  # ignore DM edits
+        """
+        Log raw message edit event to message change log.
+
+        Edits of cached messages are logged by `on_message_edit`, so only edits of uncached messages are handled here.
+        The edited message is built from the event's payload, and only fetched if the payload is partial.
+        """
+        if event.guild_id is None or event.cached_message is not None:
+            return  # Ignore DM edits, and edits `on_message_edit` is fired for.
 
         await self.bot.wait_until_guild_available()
-        try:
-            channel = await get_or_fetch_channel(self.bot, int(event.data["channel_id"]))
-            message = await channel.fetch_message(event.message_id)
-        except discord.NotFound:  # Channel/message was deleted before we got the event
+        if self.is_channel_ignored(event.channel_id):
             return
 
-        if self.is_message_blacklisted(message):
+        channel = self.bot.get_channel(event.channel_id)
+        if channel is None:
             return
+        try:
+            message = discord.Message(state=self.bot._connection, channel=channel, data=event.data)
+        except KeyError:
+            # Partial updates, such as embeds being resolved, don't have all the fields of the message.
+            try:
+                message = await channel.fetch_message(event.message_id)
+            except discord.NotFound:  # The message was deleted before we got the event
+                return
 
-        await asyncio.sleep(1)  # Wait here in case the normal event was fired
-
-        if event.message_id in self._cached_edits:
-            # It was in the cache and the normal event was fired, so we can just ignore it
-            self._cached_edits.remove(event.message_id)
+        if self.is_message_blacklisted(message):
             return
 
         channel = message.channel
@@ -839,7 +881,7 @@ class ModLog(Cog, name="ModLog"):
             return
 
         if member.id in self._ignored[Event.voice_state_update]:
-            self._ignored[Event.voice_state_update].remove(member.id)
+            self._ignored[Event.voice_state_update].discard(member.id)
             return
 
         # Exclude all channel attributes except the name.
@@ -1,3 +1,5 @@
+import asyncio
+import contextlib
 import random
 import textwrap
 import typing as t
@@ -11,7 +13,6 @@ from discord.ext.commands import Cog, Context, Greedy, group
 from pydis_core.site_api import ResponseCodeError
 from pydis_core.utils import scheduling
 from pydis_core.utils.members import get_or_fetch_member
-from pydis_core.utils.scheduling import Scheduler
 
 from bot.bot import Bot
 from bot.constants import (
@@ -30,7 +31,8 @@ from bot.log import get_logger
 from bot.pagination import LinePaginator
 from bot.utils import time
 from bot.utils.checks import has_any_role_check, has_no_roles_check
-from bot.utils.lock import lock_arg
+from bot.utils.deadlines import DeadlineScheduler, catch_up
+from bot.utils.lock import get_lock, lock_arg
 from bot.utils.messages import send_denial
 
 log = get_logger(__name__)
@@ -38,6 +40,10 @@ log = get_logger(__name__)
 LOCK_NAMESPACE = "reminder"
 WHITELISTED_CHANNELS = Guild.reminder_whitelist
 MAXIMUM_REMINDERS = 5
+# Overdue reminders sent to the same channel are sent together, as up to this many embeds in a single message.
+OVERDUE_REMINDERS_PER_MESSAGE = 10
+# The most characters Discord allows across all embeds of a message.
+MAX_EMBEDS_LENGTH = 6000
 REMINDER_EDIT_CONFIRMATION_TIMEOUT = 60
 
 Mentionable = discord.Member | discord.Role
@@ -80,14 +86,22 @@ class Reminders(Cog):
 
     def __init__(self, bot: Bot):
         self.bot = bot
-        self.scheduler = Scheduler(self.__class__.__name__)
+        # The reminders endpoint can't filter by expiration, so all active reminders are loaded at once.
+        self.scheduler = DeadlineScheduler(self.__class__.__name__, self.send_reminder)
+        self._catch_up_task: asyncio.Task | None = None
 
     async def cog_unload(self) -> None:
-        """Cancel scheduled tasks."""
+        """Stop sending reminders."""
         self.scheduler.cancel_all()
+        if self._catch_up_task:
+            self._catch_up_task.cancel()
 
     async def cog_load(self) -> None:
-        """Get all current reminders from the API and reschedule them."""
+        """
+        Get all current reminders from the API and reschedule them.
+
+        Reminders which are already overdue are sent in the background, so that new reminders are scheduled meanwhile.
+        """
         await self.bot.wait_until_guild_available()
         response = await self.bot.api_client.get(
             "bot/reminders",
@@ -95,6 +109,7 @@ class Reminders(Cog):
         )
 
         now = datetime.now(UTC)
+        overdue = []
 
         for reminder in response:
             is_valid, *_ = self.ensure_valid_reminder(reminder)
@@ -105,10 +120,21 @@ class Reminders(Cog):
 
             # If the reminder is already overdue ...
             if remind_at < now:
-                await self.send_reminder(reminder, remind_at)
+                overdue.append(reminder)
             else:
                 self.schedule_reminder(reminder)
 
+        self.scheduler.start()
+        if overdue:
+            self._catch_up_task = scheduling.create_task(catch_up(
+                "reminders",
+                overdue,
+                self._send_overdue_reminders,
+                due=lambda reminder: isoparse(reminder["expiration"]),
+                group=itemgetter("channel_id"),
+                batch_size=OVERDUE_REMINDERS_PER_MESSAGE,
+            ))
+
     def ensure_valid_reminder(self, reminder: dict) -> tuple[bool, discord.TextChannel]:
         """Ensure reminder channel can be fetched otherwise delete the reminder."""
         channel = self.bot.get_channel(reminder["channel_id"])
@@ -182,9 +208,9 @@ class Reminders(Cog):
                 yield mentionable
 
     def schedule_reminder(self, reminder: dict) -> None:
-        """A coroutine which sends the reminder once the time is reached, and cancels the running task."""
+        """Send the reminder once the time is reached."""
         reminder_datetime = isoparse(reminder["expiration"])
-        self.scheduler.schedule_at(reminder_datetime, reminder["id"], self.send_reminder(reminder))
+        self.scheduler.schedule_at(reminder_datetime, reminder["id"], reminder)
 
     async def _edit_reminder(self, reminder_id: int, payload: dict) -> dict:
         """
@@ -201,21 +227,14 @@ class Reminders(Cog):
 
     async def _reschedule_reminder(self, reminder: dict) -> None:
         """Reschedule a reminder object."""
-        log.trace(f"Cancelling old task #{reminder['id']}")
-        self.scheduler.cancel(reminder["id"])
-
-        log.trace(f"Scheduling new task #{reminder['id']}")
+        log.trace(f"Rescheduling reminder #{reminder['id']}")
         self.schedule_reminder(reminder)
 
-    @lock_arg(LOCK_NAMESPACE, "reminder", itemgetter("id"), raise_error=True)
-    async def send_reminder(self, reminder: dict, expected_time: time.Timestamp | None = None) -> None:
-        """Send the reminder."""
-        is_valid, channel = self.ensure_valid_reminder(reminder)
-        if not is_valid:
-            # No need to cancel the task too; it'll simply be done once this coroutine returns.
-            return
+    @staticmethod
+    def _reminder_embed(reminder: dict, *, late: bool) -> discord.Embed:
+        """Build the embed a reminder is sent with."""
         embed = discord.Embed()
-        if expected_time:
+        if late:
             embed.colour = discord.Colour.red()
             embed.set_author(
                 icon_url=Icons.remind_red,
@@ -230,14 +249,80 @@ class Reminders(Cog):
 
         # Let's not use a codeblock to keep emojis and mentions working. Embeds are safe anyway.
         embed.description = f"Here's your reminder: {reminder['content']}"
+        embed.description += f"\n[Jump back to when you created the reminder]({reminder.get('jump_url')})"
+        return embed
 
-        # Here the jump URL is in the format of base_url/guild_id/channel_id/message_id
+    async def _send_overdue_reminders(self, reminders: list[dict]) -> None:
+        """
+        Send overdue reminders to their channel together, in as few messages as the embed limits allow.
+
+        Reminders which are being edited or deleted are skipped; edited reminders get rescheduled.
+        """
+        async with contextlib.AsyncExitStack() as stack:
+            locked = []
+            for reminder in reminders:
+                lock = get_lock(LOCK_NAMESPACE, reminder["id"])
+                if lock.locked():
+                    log.info(f"Not sending overdue reminder #{reminder['id']}, as it is being modified.")
+                    continue
+                await stack.enter_async_context(lock)
+                locked.append(reminder)
+
+            if locked:
+                await self._send_late_reminders(locked)
+
+    async def _send_late_reminders(self, reminders: list[dict]) -> None:
+        """Send the late reminders to their channel, then delete them."""
+        channel = self.bot.get_channel(reminders[0]["channel_id"])
+        messages: list[tuple[dict[str, None], list[discord.Embed], list[dict]]] = []
+        length = MAX_EMBEDS_LENGTH
+        for reminder in reminders:
+            embed = self._reminder_embed(reminder, late=True)
+            if length + len(embed) > MAX_EMBEDS_LENGTH:
+                messages.append(({}, [], []))
+                length = 0
+            mentions, embeds, message_reminders = messages[-1]
+            # The mentions are kept in a dict as an ordered set, as reminders may share their author or mentions.
+            mentions[f"<@{reminder['author']}>"] = None
+            async for mentionable in self.get_mentionables(reminder["mentions"]):
+                mentions[mentionable.mention] = None
+            embeds.append(embed)
+            message_reminders.append(reminder)
+            length += len(embed)
+
+        for mentions, embeds, message_reminders in messages:
+            reference = None
+            if len(message_reminders) == 1:
+                # A lone reminder replies to the message it was created with, like a reminder sent on time.
+                # Here the jump URL is in the format of base_url/guild_id/channel_id/message_id
+                message_id = int(message_reminders[0]["jump_url"].split("/")[-1])
+                reference = channel.get_partial_message(message_id).to_reference(fail_if_not_exists=False)
+            await channel.send(content=" ".join(mentions), embeds=embeds, reference=reference)
+
+        results = await asyncio.gather(
+            *(self.bot.api_client.delete(f"bot/reminders/{reminder['id']}") for reminder in reminders),
+            return_exceptions=True,
+        )
+        for reminder, result in zip(reminders, results, strict=True):
+            if isinstance(result, Exception):
+                log.error(f"Failed to delete reminder #{reminder['id']} after sending it late.", exc_info=result)
+            else:
+                log.debug(f"Deleted reminder #{reminder['id']} (the user has been reminded late).")
+
+    @lock_arg(LOCK_NAMESPACE, "reminder", itemgetter("id"), raise_error=True)
+    async def send_reminder(self, reminder: dict, expected_time: time.Timestamp | None = None) -> None:
+        """Send the reminder."""
+        is_valid, channel = self.ensure_valid_reminder(reminder)
+        if not is_valid:
+            # The reminder is no longer scheduled once it's due, so there's nothing to cancel.
+            return
+        embed = self._reminder_embed(reminder, late=bool(expected_time))
         additional_mentions = " ".join([
             mentionable.mention async for mentionable in self.get_mentionables(reminder["mentions"])
         ])
 
+        # Here the jump URL is in the format of base_url/guild_id/channel_id/message_id
         jump_url = reminder.get("jump_url")
-        embed.description += f"\n[Jump back to when you created the reminder]({jump_url})"
         partial_message = channel.get_partial_message(int(jump_url.split("/")[-1]))
         try:
             await partial_message.reply(content=f"{additional_mentions}", embed=embed)
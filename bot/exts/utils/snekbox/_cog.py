@@ -8,19 +8,31 @@ from operator import attrgetter
 from textwrap import dedent
 from typing import Literal, NamedTuple, TYPE_CHECKING
 
-from discord import AllowedMentions, HTTPException, Interaction, Message, NotFound, Reaction, User, enums, ui
+from discord import (
+    AllowedMentions,
+    HTTPException,
+    Interaction,
+    Message,
+    NotFound,
+    RawMessageDeleteEvent,
+    Reaction,
+    User,
+    enums,
+    ui,
+)
 from discord.ext.commands import Cog, Command, Context, Converter, command, guild_only
 from pydis_core.utils import interactions, paste_service
 from pydis_core.utils.paste_service import PasteFile, send_to_paste_service
 from pydis_core.utils.regex import FORMATTED_CODE_REGEX, RAW_CODE_REGEX
 
 from bot.bot import Bot
-from bot.constants import BaseURLs, Channels, Emojis, MODERATION_ROLES, Roles, URLs
+from bot.constants import BaseURLs, Channels, Emojis, MODERATION_ROLES, Roles, SnekboxQueue, URLs
 from bot.decorators import redirect_output
 from bot.exts.filtering._filter_lists.extension import TXT_LIKE_FILES
 from bot.exts.help_channels._channel import is_help_forum_post
 from bot.exts.utils.snekbox._eval import EvalJob, EvalResult
 from bot.exts.utils.snekbox._io import FileAttachment
+from bot.exts.utils.snekbox._queue import EvalJobCancelledError, EvalQueue, EvalQueueFullError
 from bot.log import get_logger
 from bot.utils.lock import LockedResourceError, lock_arg
 
@@ -172,6 +184,7 @@ class Snekbox(Cog):
     def __init__(self, bot: Bot):
         self.bot = bot
         self.jobs = {}
+        self.eval_queue = EvalQueue(SnekboxQueue.max_running_jobs, SnekboxQueue.max_queued_jobs)
 
     def build_python_version_switcher_view(
         self,
@@ -204,6 +217,37 @@ class Snekbox(Cog):
         async with self.bot.http_session.post(URLs.snekbox_eval_api, json=data, raise_for_status=True) as resp:
             return EvalResult.from_dict(await resp.json())
 
+    async def post_queued_job(self, ctx: Context, job: EvalJob) -> EvalResult:
+        """
+        Wait for the job's turn in the eval queue, then post it to Snekbox.
+
+        While the job is queued, its position in the queue is shown to the user.
+        Raise `EvalQueueFullError` if too many jobs are already queued,
+        and `EvalJobCancelledError` if the invoking message is edited or deleted before the job's turn comes.
+        """
+        queued = self.eval_queue.enqueue(ctx.channel.id, ctx.author.id, ctx.message.id)
+        self.bot.stats.gauge("snekbox.queue.depth", len(self.eval_queue))
+        try:
+            if not queued.running:
+                log.trace(f"Queueing {ctx.author}'s {job.name} job as all Snekbox workers are busy.")
+                position_message = await ctx.send(
+                    f":hourglass_flowing_sand: Snekbox is busy, {ctx.author.display_name}'s {job.name} job is "
+                    f"number {self.eval_queue.position(queued)} in the queue and will run shortly.",
+                    allowed_mentions=AllowedMentions.none(),
+                )
+                try:
+                    await queued.wait()
+                finally:
+                    with contextlib.suppress(HTTPException):
+                        await position_message.delete()
+            self.bot.stats.timing("snekbox.queue.wait_time", queued.waited * 1000)
+
+            async with ctx.typing():
+                return await self.post_job(job)
+        finally:
+            self.eval_queue.finish(queued)
+            self.bot.stats.gauge("snekbox.queue.depth", len(self.eval_queue))
+
     async def upload_output(self, output: str) -> str | None:
         """Upload the job's output to a paste service and return a URL to it if successful."""
         log.trace("Uploading full output to paste service...")
@@ -383,8 +427,8 @@ class Snekbox(Cog):
 
         Return the bot response.
         """
+        result = await self.post_queued_job(ctx, job)
         async with ctx.typing():
-            result = await self.post_job(job)
             # Collect stats of job fails + successes
             if result.returncode != 0:
                 self.bot.stats.incr("snekbox.python.fail")
@@ -502,14 +546,18 @@ class Snekbox(Cog):
                     await ctx.message.clear_reaction(REDO_EMOJI)
                 return None
 
-            codeblocks = await CodeblockConverter.convert(ctx, code)
-
-            if job_name == "timeit":
-                return EvalJob(self.prepare_timeit_input(codeblocks))
-            return EvalJob.from_code("\n".join(codeblocks))
+            return await self.job_from_code(ctx, code, job_name)
 
         return None
 
+    async def job_from_code(self, ctx: Context, code: str, job_name: str) -> EvalJob:
+        """Return a new job of the `job_name` command, evaluating `code`."""
+        codeblocks = await CodeblockConverter.convert(ctx, code)
+
+        if job_name == "timeit":
+            return EvalJob(self.prepare_timeit_input(codeblocks), name="timeit")
+        return EvalJob.from_code("\n".join(codeblocks))
+
     async def get_code(self, message: Message, command: Command) -> str | None:
         """
         Return the code from `message` to be evaluated.
@@ -559,6 +607,23 @@ class Snekbox(Cog):
                     "please wait for it to finish!"
                 )
                 return
+            except EvalQueueFullError:
+                self.bot.stats.incr("snekbox.queue.rejected")
+                await ctx.send(
+                    f"{ctx.author.mention} Snekbox is busy with too many jobs - "
+                    "please try again in a minute!"
+                )
+                return
+            except EvalJobCancelledError as e:
+                if e.edited is None:
+                    log.info(f"{ctx.author}'s queued {job.name} job was cancelled as its message was deleted.")
+                    return
+                if (code := await self.get_code(e.edited, ctx.command)) is None:
+                    log.info(f"{ctx.author}'s queued {job.name} job was cancelled as its code was edited out.")
+                    return
+                job = (await self.job_from_code(ctx, code, job.name)).as_version(job.version)
+                log.info(f"Queueing the edited code from message {ctx.message.id} again:\n{job}")
+                continue
 
             # Store the bot's response message id per invocation, to ensure the `wait_for`s in `continue_job`
             # don't trigger if the response has already been replaced by a new response.
@@ -570,6 +635,18 @@ class Snekbox(Cog):
                 break
             log.info(f"Re-evaluating code from message {ctx.message.id}:\n{job}")
 
+    @Cog.listener()
+    async def on_raw_message_delete(self, payload: RawMessageDeleteEvent) -> None:
+        """Cancel the queued eval job of a deleted message."""
+        if self.eval_queue.cancel(payload.message_id):
+            self.bot.stats.incr("snekbox.queue.cancelled")
+
+    @Cog.listener()
+    async def on_message_edit(self, before: Message, after: Message) -> None:
+        """Cancel the queued eval job of a message whose content was edited, for it to be queued with the new code."""
+        if before.content != after.content and self.eval_queue.cancel(after.id, edited=after):
+            self.bot.stats.incr("snekbox.queue.requeued")
+
     @command(name="eval", aliases=("e",), usage="[python_version] <code, ...>")
     @guild_only()
     @redirect_output(
@@ -0,0 +1,173 @@
+"""Fair queueing of eval jobs, so only a limited number are sent to snekbox at once."""
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import OrderedDict, deque
+from collections.abc import Hashable, Iterator
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from discord import Message
+
+# Queued jobs by user, by channel. Both levels are in the order they take turns in.
+_Queues = OrderedDict[Hashable, OrderedDict[Hashable, deque["QueuedJob"]]]
+
+
+class EvalJobCancelledError(Exception):
+    """Raised when a queued eval job is cancelled before it started, as its message was edited or deleted."""
+
+    def __init__(self, edited: Message | None = None):
+        super().__init__()
+        # The message after it was edited, or None if it was deleted.
+        self.edited = edited
+
+
+class EvalQueueFullError(Exception):
+    """Raised when an eval job can't be queued, as the queue is already full."""
+
+
+class QueuedJob:
+    """An eval job's place in the queue."""
+
+    def __init__(self, channel_id: Hashable, user_id: Hashable, message_id: int):
+        self.channel_id = channel_id
+        self.user_id = user_id
+        self.message_id = message_id
+        self.running = False
+
+        self._queued_at = time.perf_counter()
+        self._started_at: float | None = None
+        self._started = asyncio.get_running_loop().create_future()
+
+    @property
+    def waited(self) -> float:
+        """How many seconds the job waited in the queue, or has been waiting so far if it hasn't started."""
+        return (self._started_at or time.perf_counter()) - self._queued_at
+
+    async def wait(self) -> None:
+        """Wait for the job's turn. Raise `EvalJobCancelledError` if the job is cancelled before then."""
+        await self._started
+
+    def _start(self) -> None:
+        self.running = True
+        self._started_at = time.perf_counter()
+        self._started.set_result(None)
+
+    def _cancel(self, edited: Message | None) -> None:
+        self._started.set_exception(EvalJobCancelledError(edited))
+
+
+def _pop_next(queues: _Queues) -> QueuedJob:
+    """Pop the job whose turn is next, moving its channel and user to the back of the line."""
+    channel_id, users = next(iter(queues.items()))
+    user_id, jobs = next(iter(users.items()))
+    job = jobs.popleft()
+
+    if jobs:
+        users.move_to_end(user_id)
+    else:
+        del users[user_id]
+    if users:
+        queues.move_to_end(channel_id)
+    else:
+        del queues[channel_id]
+    return job
+
+
+class EvalQueue:
+    """
+    Limit how many eval jobs are running at once, queueing the rest.
+
+    Queued jobs are started fairly: the channels with queued jobs take turns, and so do the users within a channel,
+    so that a busy channel or user can't hold up everyone else.
+    """
+
+    def __init__(self, max_running: int, max_queued: int):
+        self.max_running = max_running
+        self.max_queued = max_queued
+        self.running = 0
+
+        self._queues: _Queues = OrderedDict()
+        self._by_message: dict[int, QueuedJob] = {}
+
+    def __len__(self) -> int:
+        """Return the number of queued jobs, excluding the running ones."""
+        return len(self._by_message)
+
+    def enqueue(self, channel_id: Hashable, user_id: Hashable, message_id: int) -> QueuedJob:
+        """
+        Queue a job, starting it right away if there's a free slot and nothing else is queued.
+
+        Raise `EvalQueueFullError` if the job would have to wait, but there are already `max_queued` jobs waiting.
+        """
+        if self.running < self.max_running and not self._queues:
+            job = QueuedJob(channel_id, user_id, message_id)
+            self.running += 1
+            job._start()
+        elif len(self) >= self.max_queued:
+            raise EvalQueueFullError
+        else:
+            job = QueuedJob(channel_id, user_id, message_id)
+            self._queues.setdefault(channel_id, OrderedDict()).setdefault(user_id, deque()).append(job)
+            self._by_message[message_id] = job
+        return job
+
+    def finish(self, job: QueuedJob) -> None:
+        """Free the slot of a job which has finished running, or drop the job from the queue if it never started."""
+        if job.running:
+            job.running = False
+            self.running -= 1
+            self._start_next()
+        else:
+            self._remove(job)
+
+    def cancel(self, message_id: int, *, edited: Message | None = None) -> bool:
+        """
+        Cancel the queued job of the message, returning whether there was one.
+
+        If the job is cancelled because its message was edited, the `edited` message is passed on to the job's owner.
+        """
+        if (job := self._by_message.get(message_id)) is None:
+            return False
+        self._remove(job)
+        job._cancel(edited)
+        return True
+
+    def position(self, job: QueuedJob) -> int:
+        """Return the 1-based position of the job in the order queued jobs will be started in."""
+        queues: _Queues = OrderedDict(
+            (channel_id, OrderedDict((user_id, deque(jobs)) for user_id, jobs in users.items()))
+            for channel_id, users in self._queues.items()
+        )
+        for position, queued in enumerate(self._drain(queues), start=1):
+            if queued is job:
+                return position
+        raise ValueError("The job isn't queued.")
+
+    @staticmethod
+    def _drain(queues: _Queues) -> Iterator[QueuedJob]:
+        while queues:
+            yield _pop_next(queues)
+
+    def _start_next(self) -> None:
+        """Start queued jobs in turn while there are free slots."""
+        while self.running < self.max_running and self._queues:
+            job = _pop_next(self._queues)
+            del self._by_message[job.message_id]
+            self.running += 1
+            job._start()
+
+    def _remove(self, job: QueuedJob) -> None:
+        """Remove the job from the queue, if it's in it."""
+        if self._by_message.get(job.message_id) is not job:
+            return
+        del self._by_message[job.message_id]
+
+        users = self._queues[job.channel_id]
+        jobs = users[job.user_id]
+        jobs.remove(job)
+        if not jobs:
+            del users[job.user_id]
+        if not users:
+            del self._queues[job.channel_id]
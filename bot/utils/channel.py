@@ -44,3 +44,39 @@ def is_staff_channel(channel: discord.TextChannel) -> bool:
 def is_in_category(channel: discord.TextChannel, category_id: int) -> bool:
     """Return True if `channel` is within a category with `category_id`."""
     return getattr(channel, "category_id", None) == category_id
+
+
+class ChannelVisibility:
+    """
+    Remember whether roles can view channels, as resolving permissions goes through all of a channel's overwrites.
+
+    Threads are looked up by their parent channel. The bot forgets what it knows about a channel when the channel is
+    updated or deleted, and forgets everything when a role is updated or deleted.
+    """
+
+    def __init__(self):
+        self._visible: dict[int, dict[int, bool]] = {}
+
+    def can_view(self, channel: discord.abc.GuildChannel | discord.Thread, role: discord.Role) -> bool:
+        """Return whether members with only the given role can view the channel."""
+        if isinstance(channel, discord.Thread):
+            channel = channel.parent
+
+        channel_roles = self._visible.setdefault(channel.id, {})
+        if (visible := channel_roles.get(role.id)) is None:
+            visible = channel_roles[role.id] = channel.permissions_for(role).view_channel
+        return visible
+
+    def forget_channel(self, channel: discord.abc.GuildChannel) -> None:
+        """Forget about the channel, and about the channels in it if it's a category, as they may sync with it."""
+        if isinstance(channel, discord.CategoryChannel):
+            self.forget_all()
+        else:
+            self._visible.pop(channel.id, None)
+
+    def forget_all(self) -> None:
+        """Forget about all channels."""
+        self._visible.clear()
+
+
+channel_visibility = ChannelVisibility()
@@ -0,0 +1,279 @@
+import asyncio
+import contextlib
+import heapq
+import itertools
+import time
+from collections.abc import Awaitable, Callable, Hashable, Iterable
+from datetime import UTC, datetime, timedelta
+from typing import Any, TypeVar
+
+from pydis_core.utils import scheduling
+
+import bot
+from bot.log import get_logger
+
+log = get_logger(__name__)
+
+# How far ahead of the current time entries are kept in memory when they can be paged in from a loader.
+DEFAULT_WINDOW = timedelta(hours=6)
+# How long to wait before trying to page in entries again after the loader failed.
+LOAD_RETRY_DELAY = timedelta(minutes=1)
+# How many groups of overdue items are caught up on at once.
+CATCH_UP_CONCURRENCY = 5
+
+T = TypeVar("T")
+
+Callback = Callable[[Any], Awaitable[None]]
+# Given the end of the window entries were last loaded up to (None if nothing was loaded yet) and the new end of the
+# window, return the ID, deadline and payload of every entry with a deadline in between.
+Loader = Callable[[datetime | None, datetime], Awaitable[Iterable[tuple[Hashable, datetime, Any]]]]
+CatchUp = Callable[[list[Any]], Awaitable[None]]
+
+
+async def catch_up(
+    name: str,
+    items: Iterable[T],
+    handler: Callable[[list[T]], Awaitable[None]],
+    *,
+    due: Callable[[T], Any],
+    group: Callable[[T], Hashable],
+    batch_size: int = 1,
+    concurrency: int = CATCH_UP_CONCURRENCY,
+) -> None:
+    """
+    Handle a backlog of overdue items in the order they were due, a bounded number at a time.
+
+    The items are split into groups by `group`, such as the channel they're sent to. The items of a group are passed
+    to `handler` in batches of up to `batch_size`, one batch after another, while up to `concurrency` groups are worked
+    on at once. Groups are started in the order of their most overdue item.
+
+    The progress is reported to stats under `catch_up.<name>`.
+    """
+    groups: dict[Hashable, list[T]] = {}
+    for item in sorted(items, key=due):
+        groups.setdefault(group(item), []).append(item)
+    remaining = sum(len(group_items) for group_items in groups.values())
+    log.info(f"Catching up on {remaining} overdue {name} in {len(groups)} groups.")
+    bot.instance.stats.gauge(f"catch_up.{name}.remaining", remaining)
+    started_at = time.perf_counter()
+
+    # The workers share the iterator, so each group is only taken by a single worker.
+    pending_groups = iter(groups.values())
+
+    async def worker() -> None:
+        nonlocal remaining
+        for group_items in pending_groups:
+            for start in range(0, len(group_items), batch_size):
+                batch = group_items[start:start + batch_size]
+                try:
+                    await handler(batch)
+                except Exception:
+                    log.exception(f"Failed to catch up on a batch of {len(batch)} overdue {name}.")
+                    bot.instance.stats.incr(f"catch_up.{name}.failed", len(batch))
+                else:
+                    bot.instance.stats.incr(f"catch_up.{name}.handled", len(batch))
+                remaining -= len(batch)
+                bot.instance.stats.gauge(f"catch_up.{name}.remaining", remaining)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started_at
+    bot.instance.stats.timing(f"catch_up.{name}.duration", elapsed * 1000)
+    log.info(f"Caught up on overdue {name} in {elapsed:.2f}s.")
+
+
+class Clock:
+    """The time the driver of a `DeadlineScheduler` goes by."""
+
+    def now(self) -> datetime:
+        """Return the current time."""
+        return datetime.now(UTC)
+
+    async def wait(self, event: asyncio.Event, timeout: float | None) -> None:
+        """Wait until the event is set, or until `timeout` seconds passed if it isn't None."""
+        with contextlib.suppress(TimeoutError):
+            await asyncio.wait_for(event.wait(), timeout)
+
+
+class DeadlineScheduler:
+    """
+    Call `callback` with the payload of each entry once its deadline is reached, from a single driver task.
+
+    Entries are kept in a heap ordered by their deadline, rather than each one getting a task sleeping until it's due.
+    When a `loader` is given, only the entries due within `window` of the current time are kept in memory,
+    and the driver pages in the following ones as time goes on. Entries scheduled past the window are dropped,
+    as the loader is expected to return them once the window reaches them.
+
+    If `catch_up` is given, the entries which are already overdue when they're paged in,
+    such as the ones which came due while the bot was down, are passed to it together in the background,
+    instead of each being fired at once.
+
+    The driver goes by the real time, unless another `clock` is given.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        callback: Callback,
+        loader: Loader | None = None,
+        *,
+        catch_up: CatchUp | None = None,
+        window: timedelta = DEFAULT_WINDOW,
+        clock: Clock | None = None,
+    ):
+        self.name = name
+        self.clock = clock or Clock()
+
+        self._callback = callback
+        self._loader = loader
+        self._catch_up = catch_up
+        self._window = window
+
+        # The heap may hold entries which were cancelled or rescheduled since, which are skipped once popped.
+        self._heap: list[tuple[datetime, int, Hashable]] = []
+        self._entries: dict[Hashable, tuple[int, Any]] = {}
+        self._sequence = itertools.count()
+
+        # The end of the window entries were loaded up to. Everything is kept in memory until the first load.
+        self._window_end: datetime | None = None
+        self._next_load_at: datetime | None = None
+        # The entries cancelled during a load, which the loader may return regardless.
+        self._cancelled_while_loading: set[Hashable] | None = None
+
+        self._wakeup = asyncio.Event()
+        self._driver: asyncio.Task | None = None
+        self._running: set[asyncio.Task] = set()
+        # The catch-up tasks are cancelled along with the driver, unlike the callbacks of single entries.
+        self._catching_up: set[asyncio.Task] = set()
+
+    def __contains__(self, entry_id: Hashable) -> bool:
+        return entry_id in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def start(self) -> None:
+        """Start the driver task, loading the first window of entries if there's a loader."""
+        if self._driver is None or self._driver.done():
+            self._driver = scheduling.create_task(self._drive(), name=f"{self.name}_deadline_driver")
+
+    def schedule_at(self, deadline: datetime, entry_id: Hashable, payload: Any) -> None:
+        """
+        Call the callback with `payload` at `deadline`, replacing any entry with the same `entry_id`.
+
+        A deadline in the past is reached as soon as the driver runs.
+        """
+        self._entries.pop(entry_id, None)
+        if self._window_end is not None and deadline > self._window_end:
+            log.trace(f"{self.name}: #{entry_id} is due past the loaded window and will be paged in later.")
+            return
+
+        log.trace(f"{self.name}: scheduling #{entry_id} for {deadline}.")
+        sequence = next(self._sequence)
+        self._entries[entry_id] = (sequence, payload)
+        if not self._heap or deadline < self._heap[0][0]:
+            self._wakeup.set()
+        heapq.heappush(self._heap, (deadline, sequence, entry_id))
+
+    def cancel(self, entry_id: Hashable) -> None:
+        """Drop the entry with the given ID, if there is one."""
+        if self._cancelled_while_loading is not None:
+            self._cancelled_while_loading.add(entry_id)
+        if self._entries.pop(entry_id, None) is None:
+            return
+
+        log.trace(f"{self.name}: cancelled #{entry_id}.")
+        if len(self._heap) > 2 * len(self._entries) + 64:
+            # Too many of the heap's entries are stale; rebuild it from the live ones.
+            self._heap = [item for item in self._heap if self._is_live(item)]
+            heapq.heapify(self._heap)
+
+    def cancel_all(self) -> None:
+        """
+        Stop the driver and any catch-up, and drop all entries.
+
+        Callbacks of single entries which are already running are left to finish.
+        """
+        if self._driver is not None:
+            self._driver.cancel()
+            self._driver = None
+        for task in self._catching_up:
+            task.cancel()
+        self._heap.clear()
+        self._entries.clear()
+        self._window_end = self._next_load_at = None
+
+    def _is_live(self, item: tuple[datetime, int, Hashable]) -> bool:
+        """Return whether the heap item is the current entry for its ID."""
+        _, sequence, entry_id = item
+        entry = self._entries.get(entry_id)
+        return entry is not None and entry[0] == sequence
+
+    async def _drive(self) -> None:
+        """Fire entries as they're due, and page in the next ones when the loaded window runs low."""
+        while True:
+            self._wakeup.clear()
+            now = self.clock.now()
+            if self._loader is not None and (self._next_load_at is None or now >= self._next_load_at):
+                await self._load(now)
+
+            self._fire_due(self.clock.now())
+
+            wake_at = self._next_load_at
+            if self._heap and (wake_at is None or self._heap[0][0] < wake_at):
+                wake_at = self._heap[0][0]
+            timeout = None if wake_at is None else max((wake_at - self.clock.now()).total_seconds(), 0)
+            await self.clock.wait(self._wakeup, timeout)
+
+    async def _load(self, now: datetime) -> None:
+        """Page in the entries due between the end of the loaded window and a full window from now."""
+        previous_end = self._window_end
+        # Move the window first, so that entries scheduled during the load aren't dropped.
+        self._window_end = now + self._window
+        self._cancelled_while_loading = set()
+        try:
+            entries = await self._loader(previous_end, self._window_end)
+        except Exception:
+            log.exception(f"{self.name}: failed to load the entries due until {self._window_end}, will retry.")
+            self._window_end = previous_end
+            self._next_load_at = now + LOAD_RETRY_DELAY
+            return
+        finally:
+            cancelled, self._cancelled_while_loading = self._cancelled_while_loading, None
+
+        loaded = 0
+        overdue = []
+        for entry_id, deadline, payload in entries:
+            # Entries scheduled or cancelled during the load are more recent than what the loader returned.
+            if entry_id in self._entries or entry_id in cancelled:
+                continue
+            if self._catch_up is not None and deadline <= now:
+                overdue.append(payload)
+            else:
+                self.schedule_at(deadline, entry_id, payload)
+            loaded += 1
+        log.trace(f"{self.name}: loaded {loaded} entries due until {self._window_end}.")
+        self._next_load_at = self._window_end - self._window / 2
+
+        if overdue:
+            task = self._run(self._catch_up(overdue), f"{self.name}_catch_up")
+            self._catching_up.add(task)
+            task.add_done_callback(self._catching_up.discard)
+
+    def _fire_due(self, now: datetime) -> None:
+        """Run the callback of every entry whose deadline is reached."""
+        while self._heap and self._heap[0][0] <= now:
+            item = heapq.heappop(self._heap)
+            if not self._is_live(item):
+                continue
+            _, _, entry_id = item
+            _, payload = self._entries.pop(entry_id)
+
+            log.trace(f"{self.name}: #{entry_id} is due.")
+            self._run(self._callback(payload), f"{self.name}_{entry_id}")
+
+    def _run(self, coroutine: Awaitable[None], name: str) -> asyncio.Task:
+        """Run the coroutine in a task, keeping a reference to it until it's done."""
+        task = scheduling.create_task(coroutine, name=name)
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+        return task
@@ -49,6 +49,12 @@ class SharedEvent:
         await self._event.wait()
 
 
+def get_lock(namespace: Hashable, id_: Hashable) -> asyncio.Lock:
+    """Get the lock of the resource `id_` in `namespace`, creating it if it doesn't exist yet."""
+    locks = __lock_dicts[namespace]
+    return locks.setdefault(id_, asyncio.Lock())
+
+
 def lock(
     namespace: Hashable,
     resource_id: ResourceId,
@@ -95,9 +101,7 @@ def lock(
 
             log.trace(f"{name}: getting the lock object for resource {namespace!r}:{id_!r}")
 
-            # Get the lock for the ID. Create a lock if one doesn't exist yet.
-            locks = __lock_dicts[namespace]
-            lock_ = locks.setdefault(id_, asyncio.Lock())
+            lock_ = get_lock(namespace, id_)
 
             # It's safe to check an asyncio.Lock is free before acquiring it because:
             #   1. Synchronous code like `if not lock_.locked()` does not yield execution
@@ -1,10 +1,160 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
 from datetime import UTC, datetime
 
 import discord
+from pydis_core.utils import scheduling
 
 from bot.bot import Bot
 from bot.constants import Channels, Roles
 
+# The most embeds Discord allows in a message, and the most characters across all of them.
+MAX_EMBEDS_PER_MESSAGE = 10
+MAX_EMBEDS_LENGTH = 6000
+
+
+@dataclass
+class _LogEntry:
+    """A log entry waiting to be sent, along with a future for the message it ends up in."""
+
+    embeds: list[discord.Embed]
+    content: str | None
+    files: list[discord.File] | None
+    sent: asyncio.Future = field(default_factory=lambda: asyncio.get_running_loop().create_future())
+    queued_at: float = field(default_factory=time.perf_counter)
+
+
+@dataclass
+class _LogMessage:
+    """A message packed with log entries."""
+
+    content: str | None
+    files: list[discord.File] | None
+    embeds: list[discord.Embed] = field(default_factory=list)
+    length: int = 0
+    # The entries whose first embed is in this message.
+    entries: list[_LogEntry] = field(default_factory=list)
+
+    def fits(self, embed: discord.Embed) -> bool:
+        """Return whether the embed can be added to the message."""
+        return len(self.embeds) < MAX_EMBEDS_PER_MESSAGE and self.length + len(embed) <= MAX_EMBEDS_LENGTH
+
+
+def _pack(entries: list[_LogEntry]) -> list[_LogMessage]:
+    """
+    Pack the entries' embeds into as few messages as possible, keeping their order.
+
+    An entry with content or files starts a new message, so that they're shown along with the entry's first embed.
+    """
+    messages = []
+    for entry in entries:
+        for i, embed in enumerate(entry.embeds):
+            starts_message = i == 0 and (entry.content or entry.files)
+            if starts_message or not messages or not messages[-1].fits(embed):
+                messages.append(_LogMessage(entry.content if i == 0 else None, entry.files if i == 0 else None))
+            message = messages[-1]
+            message.embeds.append(embed)
+            message.length += len(embed)
+            if i == 0:
+                message.entries.append(entry)
+    return messages
+
+
+class _ChannelLogSender:
+    """
+    Send the log entries of a single channel in order, packing the entries logged while others are sent together.
+
+    Entries are sent right away when nothing else is being sent. While a batch is being sent, new entries pile up
+    for the next one, so a flood of entries is sent in fewer messages rather than lagging behind on the channel's
+    rate limit. The sending task only runs while there are entries.
+
+    Entries with content, such as the ones pinging moderators, are sent right away on their own instead,
+    so that they're not held up by the batch being sent.
+    """
+
+    def __init__(self, bot: Bot, channel_id: int):
+        self.bot = bot
+        self.channel_id = channel_id
+        channel = bot.get_channel(channel_id)
+        self._stats_prefix = f"log_sender.{channel.name if channel else channel_id}"
+
+        self._pending: list[_LogEntry] = []
+        # The entries of the batch being sent.
+        self._sending: list[_LogEntry] = []
+        self._task: asyncio.Task | None = None
+        # The tasks sending entries with content on their own, by the entry they're sending.
+        self._urgent: dict[asyncio.Task, _LogEntry] = {}
+
+    def send(self, entry: _LogEntry) -> None:
+        """Queue the entry, to be sent as soon as the entries being sent are, or right away if it has content."""
+        if entry.content:
+            task = scheduling.create_task(self._send_entries([entry]), name=f"log_sender_{self.channel_id}_urgent")
+            self._urgent[task] = entry
+            task.add_done_callback(self._urgent_stopped)
+            return
+
+        self._pending.append(entry)
+        self.bot.stats.gauge(f"{self._stats_prefix}.backlog", len(self._pending))
+        if self._task is None or self._task.done():
+            self._task = scheduling.create_task(self._send_pending(), name=f"log_sender_{self.channel_id}")
+            self._task.add_done_callback(self._stopped)
+
+    def _stopped(self, task: asyncio.Task) -> None:
+        """Fail the entries which won't be sent if the task was cancelled or failed, for no one to hang on them."""
+        unsent, self._sending = self._sending, []
+        if self._task is task and (task.cancelled() or task.exception() is not None):
+            unsent += self._pending
+            self._pending = []
+        _fail_unsent(unsent, task)
+
+    def _urgent_stopped(self, task: asyncio.Task) -> None:
+        """Fail the entry sent on its own if the task was cancelled or failed before it was sent."""
+        _fail_unsent([self._urgent.pop(task)], task)
+
+    async def _send_pending(self) -> None:
+        while self._pending:
+            entries = self._sending = self._pending
+            self._pending = []
+            self.bot.stats.gauge(f"{self._stats_prefix}.backlog", 0)
+            await self._send_entries(entries)
+            self._sending = []
+
+            oldest_entry_wait = time.perf_counter() - entries[0].queued_at
+            self.bot.stats.timing(f"{self._stats_prefix}.flush_latency", oldest_entry_wait * 1000)
+
+    async def _send_entries(self, entries: list[_LogEntry]) -> None:
+        """Send the entries packed into messages, resolving each entry with the message its first embed is in."""
+        channel = self.bot.get_channel(self.channel_id)
+        for message in _pack(entries):
+            try:
+                sent = await channel.send(content=message.content, embeds=message.embeds, files=message.files)
+            except Exception as e:
+                for entry in message.entries:
+                    # The entry's future is cancelled if whoever logged it stopped waiting.
+                    if not entry.sent.done():
+                        entry.sent.set_exception(e)
+                continue
+            for entry in message.entries:
+                if not entry.sent.done():
+                    entry.sent.set_result(sent)
+
+
+def _fail_unsent(entries: list[_LogEntry], task: asyncio.Task) -> None:
+    """Fail the entries which weren't sent by the task, with its exception, or by cancelling them."""
+    if not task.cancelled() and task.exception() is None:
+        return
+    for entry in entries:
+        if entry.sent.done():
+            continue
+        if task.cancelled():
+            entry.sent.cancel()
+        else:
+            entry.sent.set_exception(task.exception())
+
+
+_senders: dict[int, _ChannelLogSender] = {}
+
 
 async def send_log_message(
     bot: Bot,
@@ -22,7 +172,13 @@ async def send_log_message(
     timestamp_override: datetime | None = None,
     footer: str | None = None,
 ) -> discord.Message:
-    """Generate log embed and send to logging channel."""
+    """
+    Generate log embed and send to logging channel.
+
+    Entries logged while the channel's earlier entries are being sent are sent together once those are,
+    unless they have content, such as a ping, in which case they're sent right away.
+    Return the message the embed was sent in.
+    """
     await bot.wait_until_guild_available()
     # Truncate string directly here to avoid removing newlines
     embed = discord.Embed(
@@ -55,15 +211,9 @@ async def send_log_message(
     if content and len(content) > 2000:
         content = content[:2000 - 3] + "..."
 
-    channel = bot.get_channel(channel_id)
-    log_message = await channel.send(
-        content=content,
-        embed=embed,
-        files=files
-    )
-
-    if additional_embeds:
-        for additional_embed in additional_embeds:
-            await channel.send(embed=additional_embed)
+    if (sender := _senders.get(channel_id)) is None or sender.bot is not bot:
+        sender = _senders[channel_id] = _ChannelLogSender(bot, channel_id)
 
-    return log_message
+    entry = _LogEntry([embed, *(additional_embeds or ())], content, files)
+    sender.send(entry)
+    return await entry.sent
@@ -1,10 +1,17 @@
 import unittest
 from unittest import mock
 
-from discord.errors import NotFound
-
-from bot.exts.backend.sync._syncers import UserSyncer, _Diff
+from pydis_core.site_api import ResponseCodeError
+
+from bot.exts.backend.sync._syncers import (
+    UNSYNCED_DIGEST,
+    UserCheckpoint,
+    UserSyncer,
+    _Diff,
+    _member_digest,
+)
 from tests import helpers
+from tests.base import RedisTestCase
 
 
 def fake_user(**kwargs):
@@ -137,7 +144,7 @@ class UserSyncerDiffTests(unittest.IsolatedAsyncioTestCase):
             self.get_mock_member(fake_user()),
             None
         ]
-        guild.fetch_member.side_effect = NotFound(mock.Mock(status=404), "Not found")
+        guild.query_members.return_value = []
 
         actual_diff = await UserSyncer._get_diff(guild)
         expected_diff = ([], [{"id": 63, "in_guild": False}], None)
@@ -162,7 +169,7 @@ class UserSyncerDiffTests(unittest.IsolatedAsyncioTestCase):
             self.get_mock_member(updated_user),
             None
         ]
-        guild.fetch_member.side_effect = NotFound(mock.Mock(status=404), "Not found")
+        guild.query_members.return_value = []
 
         actual_diff = await UserSyncer._get_diff(guild)
         expected_diff = ([new_user], [{"id": 55, "name": "updated"}, {"id": 63, "in_guild": False}], None)
@@ -182,7 +189,7 @@ class UserSyncerDiffTests(unittest.IsolatedAsyncioTestCase):
             self.get_mock_member(fake_user()),
             None
         ]
-        guild.fetch_member.side_effect = NotFound(mock.Mock(status=404), "Not found")
+        guild.query_members.return_value = []
 
         actual_diff = await UserSyncer._get_diff(guild)
         expected_diff = ([], [], None)
@@ -190,6 +197,179 @@ class UserSyncerDiffTests(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(actual_diff, expected_diff)
 
 
+    async def test_diff_for_users_missing_from_cache(self):
+        """Users missing from the cache should be looked up in a batch, and marked as left if they weren't found."""
+        cached_user = fake_user()
+        uncached_user = fake_user(id=55, name="old name")
+        self.bot.api_client.get.return_value = {
+            "count": 3,
+            "next_page_no": None,
+            "previous_page_no": None,
+            "results": [cached_user, uncached_user, fake_user(id=63)]
+        }
+        guild = self.get_guild(cached_user)
+        guild.get_member.side_effect = [self.get_mock_member(cached_user), None, None]
+        guild.query_members.return_value = [self.get_mock_member(fake_user(id=55, name="new name"))]
+
+        actual_diff = await UserSyncer._get_diff(guild)
+        expected_diff = ([], [{"id": 55, "name": "new name"}, {"id": 63, "in_guild": False}], None)
+
+        self.assertEqual(actual_diff, expected_diff)
+        guild.query_members.assert_awaited_once_with(user_ids=[55, 63], limit=2)
+
+    async def test_pages_requested_ahead(self):
+        """The following pages should be requested before the current one is gone through, and yielded in order."""
+        pages = {
+            page_no: {"count": 5, "next_page_no": page_no + 1 if page_no < 5 else None, "results": [{"id": page_no}]}
+            for page_no in range(1, 6)
+        }
+        requested = []
+
+        async def get(endpoint: str, params: dict) -> dict:
+            requested.append(params["page"])
+            return pages[params["page"]]
+
+        self.bot.api_client.get.side_effect = get
+        seen = []
+        async for user in UserSyncer._get_users():
+            seen.append((user["id"], len(requested)))
+
+        self.assertEqual(requested, [1, 2, 3, 4, 5])
+        self.assertEqual([user_id for user_id, _ in seen], [1, 2, 3, 4, 5])
+        # The second page's users are gone through with the pages after it already requested.
+        self.assertEqual(seen[1][1], 4)
+
+
+class UserSyncerIncrementalDiffTests(unittest.IsolatedAsyncioTestCase):
+    """Tests for the diff of the users which changed since the last sync."""
+
+    def setUp(self):
+        patcher = mock.patch("bot.instance", new=helpers.MockBot())
+        self.bot = patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.guild = helpers.MockGuild()
+        self.guild.query_members.return_value = []
+
+    @staticmethod
+    def get_mock_member(**kwargs):
+        member = fake_user(**kwargs)
+        del member["in_guild"]
+        del member["roles"]
+        mock_member = helpers.MockMember(**member)
+        mock_member.roles = [helpers.MockRole(id=666)]
+        return mock_member
+
+    async def test_unchanged_members_skipped(self):
+        """Members whose digest matches the checkpoint shouldn't be looked at further."""
+        member = self.get_mock_member()
+        self.guild.members = [member]
+
+        actual_diff = await UserSyncer._get_incremental_diff(self.guild, {member.id: _member_digest(member)})
+
+        self.assertEqual(actual_diff, ([], [], None))
+        self.bot.api_client.get.assert_not_called()
+        self.guild.query_members.assert_not_called()
+
+    async def test_changed_and_left_members_updated(self):
+        """Changed members should be updated in full, and members no longer found should be marked as left."""
+        changed = self.get_mock_member(id=55, name="new")
+        still_member = self.get_mock_member(id=66)
+        self.guild.members = [changed]
+        self.guild.query_members.return_value = [still_member]
+        digests = {
+            55: _member_digest(self.get_mock_member(id=55, name="old")),
+            63: "left",
+            66: _member_digest(still_member),
+        }
+
+        actual_diff = await UserSyncer._get_incremental_diff(self.guild, digests)
+
+        updated = [fake_user(id=55, name="new", roles=[666]), {"id": 63, "in_guild": False}]
+        self.assertEqual(actual_diff, ([], updated, None))
+        self.guild.query_members.assert_awaited_once_with(user_ids=[63, 66], limit=2)
+
+    async def test_unknown_members_looked_up(self):
+        """Members missing from the checkpoint should be created, or updated if the site already knows them."""
+        self.guild.members = [self.get_mock_member(id=55), self.get_mock_member(id=66), self.get_mock_member(id=77)]
+        db_users = {
+            "bot/users/66": fake_user(id=66, roles=[666]),
+            "bot/users/77": fake_user(id=77, name="old", roles=[666], in_guild=False),
+        }
+
+        async def get(endpoint: str) -> dict:
+            if endpoint not in db_users:
+                raise ResponseCodeError(mock.MagicMock(status=404))
+            return db_users[endpoint]
+
+        self.bot.api_client.get.side_effect = get
+
+        actual_diff = await UserSyncer._get_incremental_diff(self.guild, {})
+
+        updated = [{"id": 77, "name": "bob the test man", "in_guild": True}]
+        self.assertEqual(actual_diff, ([fake_user(id=55, roles=[666])], updated, None))
+        self.assertEqual(self.bot.api_client.get.await_count, 3)
+
+    async def test_unsynced_members_updated(self):
+        """Members marked as unsynced in the checkpoint should be updated in full without being looked up."""
+        member = self.get_mock_member()
+        self.guild.members = [member]
+
+        actual_diff = await UserSyncer._get_incremental_diff(self.guild, {member.id: UNSYNCED_DIGEST})
+
+        self.assertEqual(actual_diff, ([], [fake_user(roles=[666])], None))
+        self.bot.api_client.get.assert_not_called()
+
+    async def test_full_diff_without_checkpoint(self):
+        """The users should be compared in full when there's no checkpoint, or a full sync was asked for."""
+        for full, digests in ((False, {}), (True, {43: "digest"})):
+            with (
+                self.subTest(full=full, digests=digests),
+                mock.patch.object(UserSyncer, "checkpoint") as checkpoint,
+                mock.patch.object(UserSyncer, "_get_full_diff") as get_full_diff,
+                mock.patch.object(UserSyncer, "_get_incremental_diff") as get_incremental_diff,
+            ):
+                checkpoint.get_all = mock.AsyncMock(return_value=digests)
+                await UserSyncer._get_diff(self.guild, full)
+
+                get_full_diff.assert_awaited_once_with(self.guild)
+                get_incremental_diff.assert_not_called()
+
+
+class UserCheckpointTests(RedisTestCase):
+    """Tests for the digests of the members as of the last sync."""
+
+    async def asyncSetUp(self):
+        await super().asyncSetUp()
+        # Decode responses like the bot's client does.
+        await self.session.client.close()
+        with mock.patch.dict(self.session._session_kwargs, decode_responses=True):
+            await self.session.connect()
+        self.checkpoint = UserCheckpoint(namespace="test_checkpoint")
+
+    async def test_checkpoint_replaced(self):
+        """Replacing the checkpoint should drop the members which aren't in it anymore."""
+        first = helpers.MockMember(id=1, name="first", discriminator=1, roles=[])
+        second = helpers.MockMember(id=2, name="second", discriminator=2, roles=[])
+        await self.checkpoint.replace([first, second])
+        await self.checkpoint.replace([second])
+
+        self.assertEqual(await self.checkpoint.get_all(), {2: _member_digest(second)})
+
+        await self.checkpoint.replace([])
+        self.assertEqual(await self.checkpoint.get_all(), {})
+
+    async def test_unsynced_members_marked(self):
+        """The members marked as unsynced should be added to an existing checkpoint, without creating one."""
+        await self.checkpoint.mark_unsynced([1])
+        self.assertEqual(await self.checkpoint.get_all(), {})
+
+        member = helpers.MockMember(id=2, name="member", discriminator=2, roles=[])
+        await self.checkpoint.replace([member])
+        await self.checkpoint.mark_unsynced([1, 2])
+        self.assertEqual(await self.checkpoint.get_all(), {1: UNSYNCED_DIGEST, 2: UNSYNCED_DIGEST})
+
+
 class UserSyncerSyncTests(unittest.IsolatedAsyncioTestCase):
     """Tests for the API requests that sync users."""
 
@@ -0,0 +1,187 @@
+import asyncio
+import unittest
+from unittest import mock
+
+from pydis_core.site_api import ResponseCodeError
+
+from bot.exts.backend.sync._syncers import UserSyncer
+from bot.exts.backend.sync._writer import UserWriter
+from tests.helpers import MockBot
+
+
+def response_error(status: int) -> ResponseCodeError:
+    """Return a ResponseCodeError with the given status code."""
+    return ResponseCodeError(mock.MagicMock(status=status))
+
+
+class UserWriterTests(unittest.IsolatedAsyncioTestCase):
+    """Tests for writing the changes to users in bulk."""
+
+    def setUp(self):
+        self.bot = MockBot()
+        self.writer = UserWriter(self.bot)
+
+        patcher = mock.patch("bot.exts.backend.sync._writer.FLUSH_DELAY", 0.05)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        checkpoint_patcher = mock.patch.object(UserSyncer, "checkpoint")
+        self.checkpoint = checkpoint_patcher.start()
+        self.addCleanup(checkpoint_patcher.stop)
+        self.checkpoint.mark_unsynced = mock.AsyncMock()
+
+    async def test_changes_folded_per_user(self):
+        """The changes to each user should be folded into one, and written together in one request."""
+        self.writer.update(1, {"roles": [1]})
+        self.writer.update(1, {"roles": [1, 2]})
+        self.writer.update(2, {"in_guild": False})
+        self.writer.update(1, {"name": "new name"})
+        self.assertEqual(len(self.writer), 2)
+
+        await self.writer.drain()
+
+        self.bot.api_client.patch.assert_awaited_once_with(
+            "bot/users/bulk_patch",
+            json=({"id": 1, "roles": [1, 2], "name": "new name"}, {"id": 2, "in_guild": False}),
+        )
+        self.bot.stats.gauge.assert_called_with("sync.users.pending", 0)
+        self.bot.stats.incr.assert_called_with("sync.users.written", 2)
+
+    async def test_joined_users_created_with_later_changes(self):
+        """Members who joined should be created along with the changes which came after, instead of being patched."""
+        self.writer.update(1, {"roles": [1]})
+        self.writer.join({"id": 1, "in_guild": True, "roles": []})
+        self.writer.update(1, {"roles": [2]})
+
+        await self.writer.drain()
+
+        self.bot.api_client.post.assert_awaited_once_with(
+            "bot/users", json=({"id": 1, "in_guild": True, "roles": [2]},)
+        )
+        self.bot.api_client.patch.assert_not_awaited()
+
+    async def test_changes_written_after_delay(self):
+        """The pending changes should be written on their own once the delay passed."""
+        self.writer.update(1, {"in_guild": False})
+        self.bot.api_client.patch.assert_not_awaited()
+
+        await asyncio.wait_for(self.writer._task, 5)
+        self.bot.api_client.patch.assert_awaited_once()
+
+    async def test_changes_written_right_away_when_full(self):
+        """Once enough users have pending changes to fill a request, they should be written without waiting."""
+        with (
+            mock.patch("bot.exts.backend.sync._writer.FLUSH_DELAY", 60),
+            mock.patch("bot.exts.backend.sync._writer.MAX_PENDING_USERS", 2),
+        ):
+            self.writer.update(1, {"in_guild": False})
+            self.writer.update(2, {"in_guild": False})
+            await asyncio.wait_for(self.writer._task, 5)
+
+        self.bot.api_client.patch.assert_awaited_once()
+
+    async def test_rejected_joins_written_one_at_a_time(self):
+        """When creating a single joined user is rejected, they should be updated, or created if they don't exist."""
+        known = {"id": 1, "in_guild": True}
+        new = {"id": 2, "in_guild": True}
+        self.bot.api_client.post.side_effect = [response_error(400), response_error(400), None]
+        self.bot.api_client.put.side_effect = [None]
+        self.writer.join(known)
+        self.writer.join(new)
+
+        await self.writer.drain()
+
+        self.bot.api_client.put.assert_awaited_once_with("bot/users/1", json=known)
+        self.bot.api_client.post.assert_awaited_with("bot/users", json=(new,))
+        self.bot.stats.incr.assert_any_call("sync.users.fallback")
+        self.checkpoint.mark_unsynced.assert_awaited_once_with([1, 2])
+
+    async def test_rejected_chunk_split_in_halves(self):
+        """A rejected chunk should be split in halves, so only the half with the rejected user is split further."""
+        users = [{"id": i, "in_guild": True} for i in range(4)]
+
+        async def post(endpoint: str, json: tuple) -> None:
+            if users[0] in json:
+                raise response_error(400)
+
+        self.bot.api_client.post.side_effect = post
+        for user in users:
+            self.writer.join(user)
+
+        await self.writer.drain()
+
+        self.assertEqual(
+            [call.kwargs["json"] for call in self.bot.api_client.post.await_args_list],
+            [tuple(users), tuple(users[:2]), (users[0],), (users[1],), tuple(users[2:])],
+        )
+        self.bot.api_client.put.assert_awaited_once_with("bot/users/0", json=users[0])
+        self.checkpoint.mark_unsynced.assert_awaited_once_with([0, 1, 2, 3])
+
+    async def test_created_users_marked_in_checkpoint(self):
+        """The members who were written should be marked in the checkpoint, unlike the ones which failed."""
+        self.bot.api_client.post.side_effect = [response_error(400), None, response_error(400)]
+        self.bot.api_client.put.side_effect = [response_error(500)]
+        self.writer.join({"id": 1, "in_guild": True})
+        self.writer.join({"id": 2, "in_guild": True})
+
+        await self.writer.drain()
+
+        self.checkpoint.mark_unsynced.assert_awaited_once_with([1])
+
+    async def test_rejected_updates_written_one_at_a_time(self):
+        """When patching users in bulk is rejected, such as for an unknown user, each should be patched on its own."""
+        self.bot.api_client.patch.side_effect = [response_error(404), response_error(404), None, None]
+        self.writer.update(1, {"name": "unknown"})
+        self.writer.update(2, {"name": "known"})
+
+        await self.writer.drain()
+
+        self.bot.api_client.patch.assert_has_awaits([
+            mock.call("bot/users/bulk_patch", json=({"id": 1, "name": "unknown"}, {"id": 2, "name": "known"})),
+            mock.call("bot/users/bulk_patch", json=({"id": 1, "name": "unknown"},)),
+            mock.call("bot/users/1", json={"name": "unknown"}),
+            mock.call("bot/users/bulk_patch", json=({"id": 2, "name": "known"},)),
+        ])
+
+    async def test_failed_write_not_retried(self):
+        """Users shouldn't be written one at a time when the site fails for other reasons."""
+        self.bot.api_client.patch.side_effect = response_error(500)
+        self.writer.update(1, {"in_guild": False})
+
+        await self.writer.drain()
+
+        self.bot.api_client.patch.assert_awaited_once()
+        self.bot.stats.incr.assert_called_once_with("sync.users.failed", 1)
+
+    async def test_batch_queued_again_without_response(self):
+        """Users whose write failed without a response should be queued again under their newer changes."""
+        patched = asyncio.Event()
+
+        async def patch(endpoint: str, json: tuple) -> None:
+            if not patched.is_set():
+                patched.set()
+                self.writer.update(1, {"roles": [2]})
+                raise TimeoutError
+
+        self.bot.api_client.patch.side_effect = patch
+        self.writer.update(1, {"name": "new name", "roles": [1]})
+        self.writer.update(2, {"in_guild": False})
+
+        await asyncio.wait_for(self.writer._task, 5)
+
+        self.bot.api_client.patch.assert_awaited_with(
+            "bot/users/bulk_patch",
+            json=({"id": 1, "name": "new name", "roles": [2]}, {"id": 2, "in_guild": False}),
+        )
+        self.bot.stats.incr.assert_any_call("sync.users.requeued", 2)
+
+    async def test_batch_not_queued_again_when_draining(self):
+        """Users whose write failed without a response should be left for the next sync while draining."""
+        self.bot.api_client.post.side_effect = TimeoutError
+        self.writer.join({"id": 1, "in_guild": True})
+
+        await self.writer.drain()
+
+        self.bot.api_client.post.assert_awaited_once()
+        self.assertEqual(len(self.writer), 0)
+        self.bot.stats.incr.assert_any_call("sync.users.failed", 1)
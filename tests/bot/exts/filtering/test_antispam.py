@@ -0,0 +1,128 @@
+import unittest
+from datetime import timedelta
+
+import arrow
+
+from bot.exts.filtering._filter_context import Event, FilterContext
+from bot.exts.filtering._filters.antispam._window import AntispamWindow
+from bot.exts.filtering._filters.antispam.burst import BurstFilter
+from bot.exts.filtering._filters.antispam.duplicates import DuplicatesFilter
+from tests.helpers import MockMember, MockMessage, MockTextChannel
+
+
+def make_message(author: MockMember, content: str = "hello", seconds_ago: float = 0) -> MockMessage:
+    """Create a mock message sent by the author the given number of seconds ago."""
+    created_at = (arrow.utcnow() - timedelta(seconds=seconds_ago)).datetime
+    return MockMessage(author=author, content=content, created_at=created_at)
+
+
+def make_rule(rule_type: type, interval: int, threshold: int) -> BurstFilter | DuplicatesFilter:
+    """Create an antispam rule with the given settings."""
+    now = arrow.utcnow().timestamp()
+    return rule_type({
+        "id": 1,
+        "content": rule_type.name,
+        "description": None,
+        "settings": {},
+        "additional_settings": {"interval": interval, "threshold": threshold},
+        "created_at": now,
+        "updated_at": now
+    })
+
+
+class AntispamWindowTests(unittest.TestCase):
+    """Test the per-author window of recent messages."""
+
+    def setUp(self):
+        self.window = AntispamWindow()
+        self.author = MockMember(id=1)
+        self.other_author = MockMember(id=2)
+
+    def test_messages_grouped_by_author(self):
+        """Only the author's own messages should be returned for them, newest first."""
+        first = make_message(self.author, seconds_ago=2)
+        other = make_message(self.other_author, seconds_ago=1)
+        second = make_message(self.author)
+        for message in (first, other, second):
+            self.window.add(message)
+
+        messages = [features.message for features in self.window.for_author(self.author).since(10)]
+        self.assertEqual(messages, [second, first])
+
+    def test_since_limits_to_interval(self):
+        """Only messages within the interval should be returned."""
+        old = make_message(self.author, seconds_ago=8)
+        new = make_message(self.author, seconds_ago=1)
+        self.window.add(old)
+        self.window.add(new)
+
+        messages = [features.message for features in self.window.for_author(self.author).since(5)]
+        self.assertEqual(messages, [new])
+
+    def test_old_messages_evicted(self):
+        """Messages older than the maximum interval should be evicted, along with authors left without messages."""
+        self.window.add(make_message(self.other_author, seconds_ago=20))
+        self.window.add(make_message(self.author, seconds_ago=20))
+        new = make_message(self.author, seconds_ago=1)
+        self.window.add(new)
+
+        self.window.evict(10)
+
+        self.assertEqual(len(self.window), 1)
+        self.assertEqual(self.window.for_author(self.other_author).since(30), [])
+        self.assertEqual([features.message for features in self.window.for_author(self.author).since(30)], [new])
+
+    def test_edited_message_replaced(self):
+        """An edited message should replace its previous version, with its quantities computed anew."""
+        message = make_message(self.author, content="short")
+        self.window.add(message)
+        [features] = self.window.for_author(self.author).since(10)
+        self.assertEqual(features.chars, 5)
+
+        edited = MockMessage(
+            id=message.id, author=self.author, content="a longer message", created_at=message.created_at
+        )
+        self.window.update(edited)
+
+        [features] = self.window.for_author(self.author).since(10)
+        self.assertIs(features.message, edited)
+        self.assertEqual(features.chars, 16)
+        self.assertEqual(len(self.window), 1)
+
+
+class AntispamRulesTests(unittest.IsolatedAsyncioTestCase):
+    """Test the antispam rules on top of the window."""
+
+    def setUp(self):
+        self.window = AntispamWindow()
+        self.author = MockMember(id=1)
+        self.channel = MockTextChannel(id=345)
+
+    def _ctx(self, message: MockMessage) -> FilterContext:
+        return FilterContext(Event.MESSAGE, self.author, self.channel, self.window.for_author(self.author), message)
+
+    async def test_burst(self):
+        """The burst rule should trigger once the author sends more messages than the threshold."""
+        rule = make_rule(BurstFilter, interval=10, threshold=2)
+        messages = [make_message(self.author, content=str(i)) for i in range(3)]
+        self.window.add(make_message(MockMember(id=2)))
+
+        for message in messages[:2]:
+            self.window.add(message)
+        self.assertFalse(await rule.triggered_on(self._ctx(messages[1])))
+
+        self.window.add(messages[2])
+        ctx = self._ctx(messages[2])
+        self.assertTrue(await rule.triggered_on(ctx))
+        self.assertEqual(ctx.related_messages, set(messages))
+
+    async def test_duplicates(self):
+        """The duplicates rule should only count messages identical to the current one."""
+        rule = make_rule(DuplicatesFilter, interval=10, threshold=1)
+        duplicates = [make_message(self.author, content="spam") for _ in range(2)]
+        for message in (*duplicates, make_message(self.author, content="other")):
+            self.window.add(message)
+
+        ctx = self._ctx(duplicates[-1])
+        self.assertTrue(await rule.triggered_on(ctx))
+        self.assertEqual(ctx.related_messages, set(duplicates))
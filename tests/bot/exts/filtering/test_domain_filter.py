@@ -0,0 +1,96 @@
+import unittest
+from unittest.mock import MagicMock
+
+import arrow
+
+from bot.exts.filtering._filter_context import Event, FilterContext
+from bot.exts.filtering._filter_lists.domain import DomainsList
+from bot.exts.filtering._filter_lists.filter_list import ListType
+from tests.helpers import MockMember, MockMessage, MockTextChannel
+
+
+class DomainsListTests(unittest.IsolatedAsyncioTestCase):
+    """Test the DomainsList class."""
+
+    def setUp(self):
+        self.filter_list = DomainsList(MagicMock())
+        now = arrow.utcnow().timestamp()
+        domains = (
+            ("example.com", {}),
+            ("bad.co.uk", {}),
+            ("sub.python.org", {}),
+            ("discord.gg", {"only_subdomains": True}),
+        )
+        filters = [
+            {
+                "id": i, "content": content, "description": None, "settings": {},
+                "additional_settings": additional_settings, "created_at": now, "updated_at": now
+            }
+            for i, (content, additional_settings) in enumerate(domains, start=1)
+        ]
+        self.filter_list.add_list({
+            "id": 1,
+            "list_type": 0,
+            "created_at": now,
+            "updated_at": now,
+            "settings": {},
+            "filters": filters
+        })
+
+        member = MockMember(id=123)
+        channel = MockTextChannel(id=345)
+        message = MockMessage(author=member, channel=channel)
+        self.ctx = FilterContext(Event.MESSAGE, member, channel, "", message)
+
+    async def test_triggers(self):
+        """The list should trigger on the filters matching the domains in the content."""
+        test_cases = (
+            ("no links here", set()),
+            ("https://example.com", {1}),
+            ("http://www.EXAMPLE.com/path", {1}),
+            ("https://notexample.com", set()),
+            ("https://bad.co.uk and https://example.com/x", {1, 2}),
+            ("https://python.org", set()),
+            ("https://sub.python.org/page", {3}),
+            ("https://discord.gg", set()),
+            ("https://discord.gg/python", {4}),
+        )
+
+        for content, expected in test_cases:
+            with self.subTest(content=content, expected=expected):
+                ctx = self.ctx.replace(content=content, matches=[])
+                _, _, triggers = await self.filter_list.actions_for(ctx)
+                self.assertEqual({filter_.id for filter_ in triggers[ListType.DENY]}, expected)
+
+    async def test_unknown_urls_are_potential_phish(self):
+        """URLs not matching any filter should be recorded as potential phishing."""
+        ctx = self.ctx.replace(content="https://example.com https://unknown.net", potential_phish={})
+        await self.filter_list.actions_for(ctx)
+        self.assertEqual(ctx.potential_phish[self.filter_list], {"unknown.net"})
+
+    async def test_index_updated_on_change(self):
+        """Added and removed filters should be reflected in the index."""
+        now = arrow.utcnow().timestamp()
+        self.filter_list.add_filter(ListType.DENY, {
+            "id": 10, "content": "new.net", "description": None, "settings": {},
+            "additional_settings": {}, "created_at": now, "updated_at": now
+        })
+        _, _, triggers = await self.filter_list.actions_for(self.ctx.replace(content="https://new.net"))
+        self.assertEqual([filter_.id for filter_ in triggers[ListType.DENY]], [10])
+
+        self.filter_list.remove_filter(ListType.DENY, 10)
+        _, _, triggers = await self.filter_list.actions_for(self.ctx.replace(content="https://new.net"))
+        self.assertEqual(triggers[ListType.DENY], [])
+
+    async def test_edited_filter_is_reindexed_in_place(self):
+        """An edited filter should move to its new domain while keeping its position in the list."""
+        now = arrow.utcnow().timestamp()
+        self.filter_list.add_filter(ListType.DENY, {
+            "id": 1, "content": "python.org", "description": None, "settings": {},
+            "additional_settings": {}, "created_at": now, "updated_at": now
+        })
+
+        _, _, triggers = await self.filter_list.actions_for(self.ctx.replace(content="https://example.com"))
+        self.assertEqual(triggers[ListType.DENY], [])
+        _, _, triggers = await self.filter_list.actions_for(self.ctx.replace(content="https://sub.python.org"))
+        self.assertEqual([filter_.id for filter_ in triggers[ListType.DENY]], [1, 3])
@@ -0,0 +1,118 @@
+import unittest
+from unittest import mock
+
+from bot.exts.filtering._filter_context import Event, FilterContext
+from bot.exts.filtering._utils import clean_input
+from tests.helpers import MockMember, MockMessage, MockTextChannel
+
+
+class FilterContextViewsTests(unittest.TestCase):
+    """Test the memoised views of the content of a filter context."""
+
+    def setUp(self):
+        member = MockMember(id=123)
+        channel = MockTextChannel(id=345)
+        self.ctx = FilterContext(Event.MESSAGE, member, channel, "", MockMessage(author=member, channel=channel))
+
+    def test_cleaned_content(self):
+        """Zalgo and invisible characters should be removed, including around spoilers."""
+        test_cases = (
+            "plain text",
+            "z\u0335a\u0336l\u0337g\u0338o",
+            "in\u200bvis\u2060ible",
+            "||spoiler|| and ||sp\u200boiler||",
+            "|\u200b|not a spoiler||",
+        )
+
+        for content in test_cases:
+            with self.subTest(content=content):
+                self.ctx.content = content
+                self.assertEqual(self.ctx.cleaned_content, clean_input(content))
+
+    def test_expanded_content(self):
+        """The expanded content should be the cleaned concatenation of all interpretations of the spoilers."""
+        test_cases = (
+            ("no spoilers", "no spoilers"),
+            ("a||b||c", "ac||b||a||b||c"),
+            ("x||\u200by||", "x||y||x||y||"),
+            ("|\u200b|y||", "||y||"),
+        )
+
+        for content, expected in test_cases:
+            with self.subTest(content=content):
+                self.ctx.content = content
+                self.assertEqual(self.ctx.expanded_content, expected)
+
+    def test_urls_and_invites(self):
+        """URLs and invites should be extracted from the cleaned content."""
+        self.ctx.content = "see HTTPS://Example.com/ and discord.gg/pyth\\on or https://py\u200bthon.org)"
+        self.assertEqual(self.ctx.urls, {"example.com", "python.org"})
+        self.assertEqual([match.group("invite") for match in self.ctx.invite_matches], ["python"])
+
+    def test_normalised_content(self):
+        """The normalised content should be in NFKC form, and optionally without combining characters."""
+        self.ctx.content = "\uff46\uff55\uff4c\uff4c e\u0301"
+        self.assertEqual(self.ctx.normalised_content, "full \u00e9")
+        self.assertEqual(self.ctx.cleaned_normalised_content, "full \u00e9")
+        self.ctx.content = "a\u0323\u0308"
+        self.assertEqual(self.ctx.cleaned_normalised_content, "\u1ea1")
+
+    def test_views_follow_content(self):
+        """Views should be recomputed when the content changes, and not carried over to replaced contexts."""
+        self.ctx.content = "first"
+        self.assertEqual(self.ctx.cleaned_content, "first")
+        self.ctx.content = "second"
+        self.assertEqual(self.ctx.cleaned_content, "second")
+
+        new_ctx = self.ctx.replace(content="third")
+        self.assertEqual(new_ctx.cleaned_content, "third")
+        self.assertEqual(self.ctx.cleaned_content, "second")
+
+
+class FilterContextMergeTests(unittest.TestCase):
+    """Test merging the output of an isolated copy of a filter context back into it."""
+
+    def setUp(self):
+        member = MockMember(id=123)
+        channel = MockTextChannel(id=345)
+        self.ctx = FilterContext(Event.MESSAGE, member, channel, "", MockMessage(author=member, channel=channel))
+
+    def test_isolated_copy_starts_without_output(self):
+        """The copy should have the input of the context, and none of its output."""
+        self.ctx.matches.append("match")
+        self.ctx.upload_deletion_logs = False
+
+        isolated = self.ctx.isolated()
+
+        self.assertIs(isolated.author, self.ctx.author)
+        self.assertEqual(isolated.matches, [])
+        self.assertTrue(isolated.upload_deletion_logs)
+
+    def test_isolated_copy_shares_views(self):
+        """Views of the content computed by either the context or its copy shouldn't be computed again by the other."""
+        self.ctx.content = "some ||content||"
+        with mock.patch("bot.exts.filtering._filter_context.clean_input", wraps=clean_input) as clean:
+            cleaned = self.ctx.cleaned_content
+            isolated = self.ctx.isolated()
+            self.assertEqual(isolated.cleaned_content, cleaned)
+            self.assertEqual(self.ctx.expanded_content, isolated.expanded_content)
+
+        # Once for each part around the spoiler.
+        self.assertEqual(clean.call_count, 3)
+
+    def test_output_merged(self):
+        """Collections written to the copy should be added to the context's, and other set output should override."""
+        self.ctx.matches.append("first")
+        self.ctx.blocked_exts.add(".exe")
+        self.ctx.notification_domain = "first.com"
+        isolated = self.ctx.isolated()
+        isolated.matches.append("second")
+        isolated.blocked_exts.add(".zip")
+        isolated.upload_deletion_logs = False
+
+        self.ctx.merge(isolated)
+
+        self.assertEqual(self.ctx.matches, ["first", "second"])
+        self.assertEqual(self.ctx.blocked_exts, {".exe", ".zip"})
+        self.assertEqual(self.ctx.notification_domain, "first.com")
+        self.assertFalse(self.ctx.upload_deletion_logs)
@@ -0,0 +1,109 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, MagicMock
+
+from bot.exts.filtering._filter_context import Event, FilterContext
+from bot.exts.filtering._filter_lists.filter_list import ListType
+from bot.exts.filtering.filtering import Filtering
+from tests.helpers import MockBot, MockMember, MockMessage, MockTextChannel
+
+
+class ResolveActionTests(unittest.IsolatedAsyncioTestCase):
+    """Test the dispatching of events to the filter lists."""
+
+    def setUp(self):
+        self.bot = MockBot()
+        self.cog = Filtering(self.bot)
+        member = MockMember(id=123)
+        channel = MockTextChannel(id=345)
+        self.ctx = FilterContext(Event.MESSAGE, member, channel, "", MockMessage(author=member, channel=channel))
+
+    def _subscribe_list(self, name: str, delay: float, result: tuple, timeout: float | None = None) -> MagicMock:
+        """Subscribe a mock filter list which returns the result after the delay."""
+        async def actions_for(_ctx: FilterContext) -> tuple:
+            await asyncio.sleep(delay)
+            return result
+
+        filter_list = MagicMock()
+        filter_list.name = name
+        filter_list.timeout = timeout
+        filter_list.actions_for = AsyncMock(side_effect=actions_for)
+        filter_list.__getitem__.side_effect = lambda list_type: (name, list_type)
+        self.cog._subscriptions[Event.MESSAGE].append(filter_list)
+        return filter_list
+
+    async def test_lists_with_timeout_run_concurrently(self):
+        """A list waiting on something external shouldn't prevent the others from starting."""
+        started = []
+        all_started = asyncio.Event()
+
+        for i in range(3):
+            # The last list runs on the context itself, alongside the others.
+            filter_list = self._subscribe_list(f"list{i}", 0, (None, [], {}), timeout=None if i == 2 else 1)
+
+            async def actions_for(_ctx: FilterContext, name: str = filter_list.name) -> tuple:
+                started.append(name)
+                if len(started) == 3:
+                    all_started.set()
+                await all_started.wait()
+                return None, [], {}
+
+            filter_list.actions_for.side_effect = actions_for
+
+        # If the lists were awaited one after the other, the first one would never finish.
+        await asyncio.wait_for(self.cog._resolve_action(self.ctx), 1)
+        self.assertEqual(sorted(started), ["list0", "list1", "list2"])
+
+    async def test_lists_without_timeout_see_earlier_output(self):
+        """Lists without a timeout should run one after the other on the context itself."""
+        first = self._subscribe_list("first", 0, (None, [], {}))
+        second = self._subscribe_list("second", 0, (None, [], {}))
+        first.actions_for.side_effect = lambda ctx: ctx.matches.append("first") or (None, [], {})
+        second.actions_for.side_effect = lambda ctx: ctx.matches.append(len(ctx.matches)) or (None, [], {})
+
+        await self.cog._resolve_action(self.ctx)
+
+        self.assertEqual(self.ctx.matches, ["first", 1])
+
+    async def test_results_merged_in_subscription_order(self):
+        """The messages and triggers should be in the order of subscription, regardless of completion order."""
+        slow = self._subscribe_list("slow", 0.05, (None, ["slow"], {ListType.DENY: ["slow filter"]}), timeout=1)
+        fast = self._subscribe_list("fast", 0, (None, ["fast"], {ListType.DENY: ["fast filter"]}))
+
+        async def slow_actions_for(ctx: FilterContext) -> tuple:
+            await asyncio.sleep(0.05)
+            ctx.matches.append("slow")
+            ctx.send_alert = True
+            return None, ["slow"], {ListType.DENY: ["slow filter"]}
+
+        slow.actions_for.side_effect = slow_actions_for
+        fast.actions_for.side_effect = (
+            lambda ctx: ctx.matches.append("fast") or (None, ["fast"], {ListType.DENY: ["fast filter"]})
+        )
+
+        _, messages, triggers = await self.cog._resolve_action(self.ctx)
+
+        self.assertEqual(list(messages), [slow, fast])
+        self.assertEqual(list(triggers.values()), [["slow filter"], ["fast filter"]])
+        # The output of lists running on their own copy of the context is added once the rest are done.
+        self.assertEqual(self.ctx.matches, ["fast", "slow"])
+        self.assertTrue(self.ctx.send_alert)
+
+    async def test_timed_out_list_skipped(self):
+        """A list exceeding its timeout should be skipped without affecting the others, or the context."""
+        actions = MagicMock()
+        slow = self._subscribe_list("slow", 1, (actions, ["slow"], {}), timeout=0.01)
+        fast = self._subscribe_list("fast", 0, (actions, ["fast"], {}))
+
+        async def slow_actions_for(ctx: FilterContext) -> tuple:
+            ctx.matches.append("half written")
+            await asyncio.sleep(1)
+
+        slow.actions_for.side_effect = slow_actions_for
+
+        result_actions, messages, _ = await self.cog._resolve_action(self.ctx)
+
+        self.assertEqual(list(messages), [fast])
+        self.assertEqual(result_actions, actions)
+        self.assertEqual(self.ctx.matches, [])
+        self.bot.stats.incr.assert_called_once_with("filters.list_timeouts.slow")
@@ -0,0 +1,75 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from discord import NotFound
+
+from bot.exts.filtering._filter_lists.invite import InviteCache
+from tests.helpers import MockBot
+
+
+class InviteCacheTests(unittest.IsolatedAsyncioTestCase):
+    """Test the cache of resolved invites."""
+
+    def setUp(self):
+        self.bot = MockBot()
+        patcher = patch("bot.instance", self.bot)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.cache = InviteCache(maxsize=2, ttl=60, not_found_ttl=60)
+
+    async def test_resolved_invite_is_cached(self):
+        """A resolved invite should only be fetched once."""
+        invite = MagicMock()
+        self.bot.fetch_invite = AsyncMock(return_value=invite)
+
+        self.assertIs(await self.cache.fetch("python"), invite)
+        self.assertIs(await self.cache.fetch("python"), invite)
+        self.bot.fetch_invite.assert_awaited_once_with("python")
+
+    async def test_unresolved_invite_is_cached(self):
+        """An invite which doesn't exist should be cached as None."""
+        self.bot.fetch_invite = AsyncMock(side_effect=NotFound(MagicMock(), "Unknown invite"))
+
+        self.assertIsNone(await self.cache.fetch("missing"))
+        self.assertIsNone(await self.cache.fetch("missing"))
+        self.bot.fetch_invite.assert_awaited_once_with("missing")
+
+    async def test_expired_entry_is_refetched(self):
+        """An entry past its TTL should be fetched again."""
+        self.cache.ttl = 0
+        self.bot.fetch_invite = AsyncMock(return_value=MagicMock())
+
+        await self.cache.fetch("python")
+        await self.cache.fetch("python")
+        self.assertEqual(self.bot.fetch_invite.await_count, 2)
+
+    async def test_concurrent_lookups_are_coalesced(self):
+        """Concurrent lookups of the same code should share a single request."""
+        release = asyncio.Event()
+        invite = MagicMock()
+
+        async def fetch_invite(_code: str) -> MagicMock:
+            await release.wait()
+            return invite
+
+        self.bot.fetch_invite = AsyncMock(side_effect=fetch_invite)
+        lookups = asyncio.gather(*(self.cache.fetch("python") for _ in range(5)))
+        await asyncio.sleep(0)
+        release.set()
+
+        self.assertEqual(await lookups, [invite] * 5)
+        self.bot.fetch_invite.assert_awaited_once_with("python")
+
+    async def test_least_recently_used_evicted(self):
+        """The least recently used code should be evicted once the cache is full."""
+        self.bot.fetch_invite = AsyncMock(return_value=MagicMock())
+
+        for code in ("first", "second", "first", "third"):
+            await self.cache.fetch(code)
+
+        self.bot.fetch_invite.reset_mock()
+        await self.cache.fetch("first")
+        self.bot.fetch_invite.assert_not_awaited()
+        await self.cache.fetch("second")
+        self.bot.fetch_invite.assert_awaited_once_with("second")
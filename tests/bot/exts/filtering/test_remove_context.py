@@ -0,0 +1,145 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from discord import HTTPException
+
+from bot.exts.filtering._settings_types.actions.remove_context import (
+    BULK_DELETE_LIMIT,
+    DeletionScheduler,
+    TokenBucket,
+    upload_messages_attachments,
+)
+from tests.helpers import MockMessage, MockTextChannel
+
+
+class DeletionSchedulerTests(unittest.IsolatedAsyncioTestCase):
+    """Test the coalescing of message deletions across filter contexts."""
+
+    def setUp(self):
+        self.scheduler = DeletionScheduler(window=0, bucket=TokenBucket(rate=1000, capacity=1000))
+        self.channel = MockTextChannel(id=1)
+        self.other_channel = MockTextChannel(id=2)
+
+    def make_messages(self, channel: MockTextChannel, ids: range) -> list[MockMessage]:
+        """Create messages with the given IDs in the channel."""
+        return [MockMessage(id=id_, channel=channel) for id_ in ids]
+
+    async def test_overlapping_requests_coalesced(self):
+        """Messages requested by several contexts should be deleted once, with a single request per channel."""
+        first = self.make_messages(self.channel, range(1, 4))
+        second = first[1:] + self.make_messages(self.other_channel, range(4, 6))
+
+        (deleted_first, failed_first), (deleted_second, failed_second) = await asyncio.gather(
+            self.scheduler.delete(first), self.scheduler.delete(second)
+        )
+
+        self.channel.delete_messages.assert_awaited_once()
+        self.assertEqual(list(self.channel.delete_messages.await_args.args[0]), first)
+        self.other_channel.delete_messages.assert_awaited_once()
+        self.assertEqual((deleted_first, failed_first), (first, []))
+        self.assertEqual((deleted_second, failed_second), (second, []))
+
+    async def test_failed_deletions_reported(self):
+        """Messages in a channel where the deletion failed should be reported as failed."""
+        self.other_channel.delete_messages = AsyncMock(side_effect=HTTPException(MagicMock(status=403), "Forbidden"))
+        messages = self.make_messages(self.channel, range(1, 3)) + self.make_messages(self.other_channel, range(3, 5))
+
+        deleted, failed = await self.scheduler.delete(messages)
+
+        self.assertEqual(deleted, messages[:2])
+        self.assertEqual(failed, messages[2:])
+
+    async def test_deleted_messages_not_deleted_again(self):
+        """A message which was already deleted for another context should count as deleted without a new request."""
+        messages = self.make_messages(self.channel, range(1, 3))
+        await self.scheduler.delete(messages)
+
+        deleted, failed = await self.scheduler.delete(messages)
+
+        self.channel.delete_messages.assert_awaited_once()
+        self.assertEqual((deleted, failed), (messages, []))
+
+    async def test_lone_deletion_not_delayed(self):
+        """Messages should be deleted right away when no other deletions are being made."""
+        scheduler = DeletionScheduler(window=60, bucket=TokenBucket(rate=1000, capacity=1000))
+        messages = self.make_messages(self.channel, range(1, 3))
+
+        deleted, _ = await asyncio.wait_for(scheduler.delete(messages), 5)
+
+        self.assertEqual(deleted, messages)
+
+    async def test_requests_during_deletion_coalesced(self):
+        """Messages requested while others are being deleted should be deleted together once those are done."""
+        release = asyncio.Event()
+        self.channel.delete_messages = AsyncMock(side_effect=lambda _: release.wait())
+        first, second, third = (self.make_messages(self.channel, range(id_, id_ + 1)) for id_ in range(1, 4))
+
+        first_task = asyncio.create_task(self.scheduler.delete(first))
+        await asyncio.sleep(0)
+        later_tasks = asyncio.gather(self.scheduler.delete(second), self.scheduler.delete(third))
+        await asyncio.sleep(0)
+        release.set()
+        await asyncio.gather(first_task, later_tasks)
+
+        self.assertEqual(self.channel.delete_messages.await_count, 2)
+        self.assertEqual(list(self.channel.delete_messages.await_args.args[0]), second + third)
+
+    async def test_cancelled_flush_fails_pending_deletions(self):
+        """If the deletions are cancelled, the contexts waiting on them should get them as failed instead of hanging."""
+        self.channel.delete_messages = AsyncMock(side_effect=lambda _: asyncio.Event().wait())
+        messages = self.make_messages(self.channel, range(1, 3))
+
+        task = asyncio.create_task(self.scheduler.delete(messages))
+        await asyncio.sleep(0)
+        self.scheduler._flush_task.cancel()
+
+        deleted, failed = await asyncio.wait_for(task, 5)
+        self.assertEqual((deleted, failed), ([], messages))
+
+    async def test_large_deletions_batched(self):
+        """Deletions in a channel should be split to batches of the most messages a request can delete."""
+        messages = self.make_messages(self.channel, range(1, BULK_DELETE_LIMIT + 2))
+
+        deleted, _ = await self.scheduler.delete(messages)
+
+        self.assertEqual(self.channel.delete_messages.await_count, 2)
+        self.assertEqual(len(deleted), BULK_DELETE_LIMIT + 1)
+
+
+class TokenBucketTests(unittest.IsolatedAsyncioTestCase):
+    """Test the spacing of requests by the token bucket."""
+
+    @patch("bot.exts.filtering._settings_types.actions.remove_context.asyncio.sleep", new_callable=AsyncMock)
+    async def test_waits_once_burst_used(self, sleep):
+        """Requests within the capacity should go through immediately, and the rest should wait."""
+        bucket = TokenBucket(rate=10, capacity=2)
+
+        await bucket.acquire()
+        await bucket.acquire()
+        sleep.assert_not_awaited()
+
+        await bucket.acquire()
+        sleep.assert_awaited_once()
+        self.assertAlmostEqual(sleep.await_args.args[0], 0.1, places=2)
+
+
+class UploadAttachmentsTests(unittest.IsolatedAsyncioTestCase):
+    """Test re-uploading the attachments of deleted messages."""
+
+    @patch("bot.exts.filtering._settings_types.actions.remove_context.send_attachments")
+    async def test_successful_uploads_kept_when_one_fails(self, send_attachments):
+        """The uploads which succeeded should be recorded, even when another one failed."""
+        messages = [MockMessage(id=i, attachments=[MagicMock()]) for i in range(3)]
+
+        async def upload(message: MockMessage, *_, **__) -> list[str]:
+            if message.id == 1:
+                raise HTTPException(MagicMock(status=500), "upload failed")
+            return [f"url{message.id}"]
+
+        send_attachments.side_effect = upload
+        ctx = MagicMock(uploaded_attachments={})
+
+        await upload_messages_attachments(ctx, messages)
+
+        self.assertEqual(ctx.uploaded_attachments, {0: ["url0"], 2: ["url2"]})
@@ -0,0 +1,58 @@
+import unittest
+from unittest.mock import patch
+
+import arrow
+
+from bot.exts.filtering._replay import load_cog, replay
+
+
+class ReplayTests(unittest.IsolatedAsyncioTestCase):
+    """Test replaying recorded messages through the filter lists."""
+
+    def setUp(self) -> None:
+        now = arrow.utcnow().timestamp()
+        patterns = (r"\bspam\b", r"eggs+")
+        self.filter_lists = [{
+            "id": 1,
+            "name": "token",
+            "list_type": 0,
+            "created_at": now,
+            "updated_at": now,
+            "settings": {"bypass_roles": ["Helpers"]},
+            "filters": [
+                {
+                    "id": i, "content": pattern, "description": None, "settings": {},
+                    "additional_settings": {}, "created_at": now, "updated_at": now
+                }
+                for i, pattern in enumerate(patterns, start=1)
+            ]
+        }]
+        patcher = patch("bot.instance")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def test_replay_counts_triggers_and_latencies(self):
+        """Each triggered filter should be counted, and the latency of the list recorded for every message."""
+        records = [
+            {"content": "spam and eggs", "author_id": 1, "channel_id": 10},
+            {"content": "eggsss", "author_id": 2, "author_roles": [5], "channel_id": 10},
+            {"content": "spam", "author_id": 3, "author_roles": ["Helpers"], "channel_id": 10},
+            {"content": "nothing to see", "author_id": 1},
+        ]
+        report = await replay(load_cog(self.filter_lists), records)
+
+        self.assertEqual(report.messages, 4)
+        self.assertEqual(
+            dict(report.triggers),
+            {("denied token", 1, r"\bspam\b"): 1, ("denied token", 2, "eggs+"): 2}
+        )
+        self.assertEqual(len(report.list_latencies["token"]), 4)
+        self.assertIn("denied token #2: eggs+", report.format())
+
+    async def test_lists_can_be_left_out(self):
+        """Lists which weren't named shouldn't be replayed through."""
+        report = await replay(load_cog(self.filter_lists, ["domain"]), [{"content": "spam"}])
+
+        self.assertEqual(report.messages, 1)
+        self.assertFalse(report.triggers)
+        self.assertNotIn("token", report.list_latencies)
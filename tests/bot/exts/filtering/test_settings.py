@@ -1,7 +1,11 @@
 import unittest
+from unittest.mock import patch
 
 import bot.exts.filtering._settings
+from bot.exts.filtering._filter_context import Event, FilterContext
 from bot.exts.filtering._settings import create_settings
+from bot.exts.filtering._settings_types.validations.bypass_roles import RoleBypass
+from tests.helpers import MockCategoryChannel, MockMember, MockMessage, MockRole, MockTextChannel
 
 
 class FilterTests(unittest.TestCase):
@@ -18,3 +22,44 @@ class FilterTests(unittest.TestCase):
         create_settings({"abcd": {}})
 
         self.assertIn("abcd", bot.exts.filtering._settings._already_warned)
+
+
+class ValidationSettingsTests(unittest.TestCase):
+    """Tests for the shared evaluation of validation settings."""
+
+    def setUp(self):
+        bot.exts.filtering._settings._evaluation_cache.clear()
+        self.addCleanup(bot.exts.filtering._settings._evaluation_cache.clear)
+        self.member = MockMember(id=123, roles=[MockRole(id=1, name="Helpers")])
+        self.channel = MockTextChannel(id=345, category=MockCategoryChannel(id=456, name="Python Help"))
+        self.ctx = FilterContext(Event.MESSAGE, self.member, self.channel, "", MockMessage())
+
+    def test_equal_validations_have_equal_signatures(self):
+        """Validations with the same values should have the same signature regardless of order."""
+        _, first = create_settings({"bypass_roles": [1, "Helpers"], "filter_dm": True})
+        _, second = create_settings({"filter_dm": True, "bypass_roles": ["Helpers", 1]})
+        _, different = create_settings({"filter_dm": True, "bypass_roles": [2]})
+
+        self.assertEqual(first.signature, second.signature)
+        self.assertNotEqual(first.signature, different.signature)
+
+    def test_evaluation_is_reused_for_the_same_scope(self):
+        """Validations with the same signature are only evaluated once per scope."""
+        _, first = create_settings({"bypass_roles": [1]})
+        _, second = create_settings({"bypass_roles": [1]})
+
+        with patch.object(RoleBypass, "triggers_on", autospec=True, return_value=False) as triggers_on:
+            self.assertEqual(first.evaluate(self.ctx), (frozenset(), {"bypass_roles"}))
+            self.assertEqual(second.evaluate(self.ctx.replace(content="other")), (frozenset(), {"bypass_roles"}))
+
+        triggers_on.assert_called_once()
+
+    def test_evaluation_is_repeated_for_a_different_scope(self):
+        """A change in the channel or in the author's roles requires a new evaluation."""
+        _, validations = create_settings({"bypass_roles": [1]})
+        other_channel = MockTextChannel(id=346, category=self.channel.category)
+        other_member = MockMember(id=123, roles=[MockRole(id=2, name="Members")])
+
+        self.assertEqual(validations.evaluate(self.ctx), (frozenset(), {"bypass_roles"}))
+        self.assertEqual(validations.evaluate(self.ctx.replace(channel=other_channel)), (frozenset(), {"bypass_roles"}))
+        self.assertEqual(validations.evaluate(self.ctx.replace(author=other_member)), ({"bypass_roles"}, frozenset()))
@@ -1,8 +1,11 @@
 import unittest
+from unittest.mock import MagicMock
 
 import arrow
 
 from bot.exts.filtering._filter_context import Event, FilterContext
+from bot.exts.filtering._filter_lists.filter_list import ListType
+from bot.exts.filtering._filter_lists.token import TokensList
 from bot.exts.filtering._filters.token import TokenFilter
 from tests.helpers import MockMember, MockMessage, MockTextChannel
 
@@ -47,3 +50,107 @@ class TokenFilterTests(unittest.IsolatedAsyncioTestCase):
                 self.ctx.content = content
                 result = await filter_.triggered_on(self.ctx)
                 self.assertEqual(result, expected)
+
+
+class TokensListTests(unittest.IsolatedAsyncioTestCase):
+    """Test the prefiltering of the token filter list."""
+
+    def setUp(self) -> None:
+        self.filter_list = TokensList(MagicMock())
+        now = arrow.utcnow().timestamp()
+        self.patterns = (r"hi", r"bla\d{2,4}", r"(\w)\1{5}", r"(?i)loud", r"(?P<word>spam)")
+        filters = [
+            {
+                "id": i, "content": pattern, "description": None, "settings": {},
+                "additional_settings": {}, "created_at": now, "updated_at": now
+            }
+            for i, pattern in enumerate(self.patterns, start=1)
+        ]
+        self.filter_list.add_list({
+            "id": 1,
+            "list_type": 0,
+            "created_at": now,
+            "updated_at": now,
+            "settings": {},
+            "filters": filters
+        })
+
+        member = MockMember(id=123)
+        channel = MockTextChannel(id=345)
+        message = MockMessage(author=member, channel=channel)
+        self.ctx = FilterContext(Event.NICKNAME, member, channel, "", message)
+
+    def test_incompatible_patterns_are_standalone(self):
+        """Patterns with group references, global flags or named groups should be checked on their own."""
+        standalone = {filter_.content for filter_ in self.filter_list._prefilter.standalone.values()}
+        self.assertEqual(standalone, {r"(\w)\1{5}", r"(?i)loud", r"(?P<word>spam)"})
+
+    async def test_triggers_match_individual_filters(self):
+        """The list should trigger on exactly the filters which match on their own."""
+        test_cases = (
+            ("goodbye", set()),
+            ("oh hi there", {1}),
+            ("HI bla123", {1, 2}),
+            ("aaaaaa", {3}),
+            ("LOUD SPAM", {4, 5}),
+        )
+
+        for content, expected in test_cases:
+            with self.subTest(content=content, expected=expected):
+                ctx = self.ctx.replace(content=content, matches=[])
+                _, _, triggers = await self.filter_list.actions_for(ctx)
+                self.assertEqual({filter_.id for filter_ in triggers[ListType.DENY]}, expected)
+
+    async def test_prefilter_updated_on_change(self):
+        """Adding and removing filters should be reflected in the prefilter."""
+        now = arrow.utcnow().timestamp()
+        self.filter_list.add_filter(ListType.DENY, {
+            "id": 10, "content": "new", "description": None, "settings": {},
+            "additional_settings": {}, "created_at": now, "updated_at": now
+        })
+        _, _, triggers = await self.filter_list.actions_for(self.ctx.replace(content="brand new"))
+        self.assertEqual([filter_.id for filter_ in triggers[ListType.DENY]], [10])
+
+        self.filter_list.remove_filter(ListType.DENY, 10)
+        _, _, triggers = await self.filter_list.actions_for(self.ctx.replace(content="brand new"))
+        self.assertEqual(triggers[ListType.DENY], [])
+
+    async def test_invalid_pattern_skipped(self):
+        """A filter with an invalid pattern should be left out, without preventing the rest of the list from loading."""
+        now = arrow.utcnow().timestamp()
+        filter_list = TokensList(MagicMock())
+        filter_list.add_list({
+            "id": 1, "list_type": 0, "created_at": now, "updated_at": now, "settings": {},
+            "filters": [
+                {
+                    "id": i, "content": pattern, "description": None, "settings": {},
+                    "additional_settings": {}, "created_at": now, "updated_at": now
+                }
+                for i, pattern in enumerate((r"(unclosed", r"hi"), start=1)
+            ]
+        })
+
+        self.assertEqual(list(filter_list[ListType.DENY].filters), [2])
+        _, _, triggers = await filter_list.actions_for(self.ctx.replace(content="oh hi there"))
+        self.assertEqual([filter_.id for filter_ in triggers[ListType.DENY]], [2])
+
+    def test_prefilter_recompiled_after_enough_changes(self):
+        """Added filters should be checked individually until enough filters changed to recompile the pattern."""
+        now = arrow.utcnow().timestamp()
+        prefilter = self.filter_list._prefilter
+        pattern = prefilter.pattern
+        version = self.filter_list.version
+
+        for i in range(10, 10 + prefilter.MIN_CHANGES_TO_RECOMPILE - 1):
+            self.filter_list.add_filter(ListType.DENY, {
+                "id": i, "content": f"word{i}", "description": None, "settings": {},
+                "additional_settings": {}, "created_at": now, "updated_at": now
+            })
+        self.assertIs(prefilter.pattern, pattern)
+        self.assertIn("word10", {filter_.content for filter_ in prefilter.standalone.values()})
+        self.assertEqual(self.filter_list.version, version + prefilter.MIN_CHANGES_TO_RECOMPILE - 1)
+
+        self.filter_list.remove_filter(ListType.DENY, 10)
+        self.assertIsNot(prefilter.pattern, pattern)
+        self.assertNotIn("word11", {filter_.content for filter_ in prefilter.standalone.values()})
+        self.assertTrue(prefilter.pattern.search("word11"))
@@ -0,0 +1,75 @@
+import asyncio
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from bot.exts.info.doc import _batch_parser
+from bot.exts.info.doc._cog import DocItem
+from tests.helpers import MockBot
+
+HTML = """
+<dl class="py class">
+    <dt id="aiohttp.ClientSession">class aiohttp.ClientSession()</dt>
+    <dd><p>Client session.</p></dd>
+</dl>
+<dl class="py method">
+    <dt id="aiohttp.ClientSession.get">get(url)</dt>
+    <dd><p>Perform a GET request.</p></dd>
+</dl>
+"""
+
+
+class BatchParserTests(unittest.IsolatedAsyncioTestCase):
+    """Tests for parsing the pages of requested symbols."""
+
+    async def asyncSetUp(self):
+        self.bot = MockBot()
+        self.bot.loop = asyncio.get_running_loop()
+        response = MagicMock()
+        response.text = AsyncMock(return_value=HTML)
+        self.bot.http_session.get.return_value.__aenter__.return_value = response
+
+        for patcher in (
+            patch("bot.instance", self.bot),
+            patch.object(_batch_parser, "doc_cache", AsyncMock()),
+            # Threads do just as well in tests, and are much quicker to start.
+            patch.object(_batch_parser.BatchParser, "_create_executor", staticmethod(lambda: ThreadPoolExecutor(1))),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.parser = _batch_parser.BatchParser()
+        self.addCleanup(self.parser.shutdown)
+        base_url = "https://docs.aiohttp.org/en/stable/"
+        self.session = DocItem("aiohttp", "class", base_url, "client_reference.html", "aiohttp.ClientSession")
+        self.get = self.session._replace(group="method", symbol_id="aiohttp.ClientSession.get")
+        self.symbols = MagicMock()
+        self.symbols.page_items.return_value = {self.session, self.get}
+
+    async def test_page_parsed_once(self):
+        """Symbols requested from the same page at once should share a single fetch and parse."""
+        session_markdown, get_markdown = await asyncio.gather(
+            self.parser.get_markdown(self.session, self.symbols), self.parser.get_markdown(self.get, self.symbols)
+        )
+
+        self.assertIn("Client session.", session_markdown)
+        self.assertIn("Perform a GET request.", get_markdown)
+        self.bot.http_session.get.assert_called_once()
+
+    async def test_all_markdown_sent_to_redis_at_once(self):
+        """The Markdown of every symbol on the page should be sent to redis in one call."""
+        await self.parser.get_markdown(self.session, self.symbols)
+
+        _batch_parser.doc_cache.set_many.assert_awaited_once()
+        self.assertEqual(_batch_parser.doc_cache.set_many.await_args.args[0].keys(), {self.session, self.get})
+
+    async def test_missing_symbols_reported_as_stale(self):
+        """Symbols which aren't on the page should get no Markdown, and be reported."""
+        missing = self.session._replace(symbol_id="aiohttp.Missing")
+        self.symbols.page_items.return_value.add(missing)
+
+        with patch.object(self.parser.stale_inventory_notifier, "send_warning", AsyncMock()) as send_warning:
+            self.assertIsNone(await self.parser.get_markdown(missing, self.symbols))
+            await asyncio.sleep(0)
+
+        send_warning.assert_awaited_once_with(missing)
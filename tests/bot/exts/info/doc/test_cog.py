@@ -0,0 +1,41 @@
+import unittest
+from unittest import mock
+
+from bot.exts.info.doc._cog import DocCog
+from tests.helpers import MockBot
+
+BASE_URL = "https://docs.aiohttp.org/en/stable/"
+
+
+class RefreshInventoriesTests(unittest.IsolatedAsyncioTestCase):
+    """Tests for refreshing the documentation inventories."""
+
+    async def asyncSetUp(self):
+        self.bot = MockBot()
+        self.cog = DocCog(self.bot)
+        self.bot.api_client.get.return_value = [
+            {"package": "aiohttp", "base_url": BASE_URL, "inventory_url": BASE_URL + "objects.inv"},
+        ]
+        self.inventory = {
+            "py:class": [("aiohttp.ClientSession", "client_reference.html#aiohttp.ClientSession")],
+        }
+
+        patchers = (
+            mock.patch.object(DocCog, "inventory_snapshot"),
+            mock.patch.object(DocCog, "_fetch_for_refresh", return_value=self.inventory),
+            mock.patch("bot.exts.info.doc._cog.doc_cache"),
+        )
+        snapshot, _, self.doc_cache = (patcher.start() for patcher in patchers)
+        for patcher in patchers:
+            self.addCleanup(patcher.stop)
+        snapshot.get_all = mock.AsyncMock(return_value={})
+        snapshot.delete = mock.AsyncMock()
+        self.doc_cache.delete_pages = mock.AsyncMock()
+
+    async def test_cached_pages_kept_on_cold_start(self):
+        """Without symbols to compare against, no pages should be dropped from the cache."""
+        await self.cog.refresh_inventories()
+
+        self.assertEqual(len(self.cog.symbols), 1)
+        self.doc_cache.delete_pages.assert_awaited_once()
+        self.assertEqual(list(self.doc_cache.delete_pages.await_args.args[0]), [])
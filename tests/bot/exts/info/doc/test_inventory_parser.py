@@ -0,0 +1,88 @@
+import asyncio
+import unittest
+import zlib
+from unittest.mock import MagicMock, patch
+
+import aiohttp
+
+from bot.exts.info.doc import _inventory_parser
+
+INVENTORY_LINES = [
+    "aiohttp.ClientSession py:class 1 client_reference.html#$ -",
+    "aiohttp.ClientSession.get py:method 1 client_reference.html#aiohttp.ClientSession.get -",
+    "client-quickstart std:label -1 client_quickstart.html#client-quickstart Client Quickstart",
+    "aiohttp py:module 0 index.html#module-$ -",
+]
+INVENTORY_HEADER = (
+    b"# Sphinx inventory version 2\n# Project: aiohttp\n# Version: 3.9\n# The remainder is zlib compressed.\n"
+)
+
+
+def make_stream(data: bytes) -> aiohttp.StreamReader:
+    stream = aiohttp.StreamReader(MagicMock(), limit=2**16, loop=asyncio.get_running_loop())
+    stream.feed_data(data)
+    stream.feed_eof()
+    return stream
+
+
+class ZlibStreamReaderTests(unittest.IsolatedAsyncioTestCase):
+    """Tests for decompressing an inventory in blocks of lines."""
+
+    async def test_lines_split_across_chunks(self):
+        """Lines split across chunks should be put back together, whatever the size of the chunks."""
+        data = "\n".join(INVENTORY_LINES).encode()
+        for chunk_size in (1, 7, 64, 2**16):
+            with (
+                self.subTest(chunk_size=chunk_size),
+                patch.object(_inventory_parser.ZlibStreamReader, "READ_CHUNK_SIZE", chunk_size),
+            ):
+                reader = _inventory_parser.ZlibStreamReader(make_stream(zlib.compress(data)))
+                blocks = [block async for block in reader]
+
+                self.assertEqual(b"\n".join(blocks).decode().split("\n"), INVENTORY_LINES)
+                self.assertTrue(all(block for block in blocks))
+
+
+class LoadInventoryTests(unittest.IsolatedAsyncioTestCase):
+    """Tests for parsing an inventory as it's downloaded."""
+
+    async def test_v2_inventory_parsed(self):
+        """All lines of the inventory should be parsed, with shorthand locations expanded."""
+        data = INVENTORY_HEADER + zlib.compress("\n".join(INVENTORY_LINES).encode())
+
+        with patch.object(_inventory_parser.ZlibStreamReader, "READ_CHUNK_SIZE", 16):
+            inventory, timings = await _inventory_parser._load_inventory(make_stream(data), 0)
+
+        self.assertEqual(
+            dict(inventory),
+            {
+                "py:class": [("aiohttp.ClientSession", "client_reference.html#aiohttp.ClientSession")],
+                "py:method": [("aiohttp.ClientSession.get", "client_reference.html#aiohttp.ClientSession.get")],
+                "std:label": [("client-quickstart", "client_quickstart.html#client-quickstart")],
+                "py:module": [("aiohttp", "index.html#module-aiohttp")],
+            },
+        )
+        self.assertGreater(timings.download, 0)
+        self.assertGreater(timings.parse, 0)
+
+    async def test_v1_inventory_parsed(self):
+        """Version 1 inventories should have the anchors added to their locations."""
+        data = (
+            b"# Sphinx inventory version 1\n# Project: aiohttp\n# Version: 0.1\n"
+            b"aiohttp mod index.html\naiohttp.ClientSession class client_reference.html\n"
+        )
+
+        inventory, _ = await _inventory_parser._load_inventory(make_stream(data), 0)
+
+        self.assertEqual(
+            dict(inventory),
+            {
+                "py:module": [("aiohttp", "index.html#module-aiohttp")],
+                "py:class": [("aiohttp.ClientSession", "client_reference.html#aiohttp.ClientSession")],
+            },
+        )
+
+    async def test_invalid_header(self):
+        """An inventory without the project and version headers should be rejected."""
+        with self.assertRaises(_inventory_parser.InvalidHeaderError):
+            await _inventory_parser._load_inventory(make_stream(b"# Sphinx inventory version 2\n"), 0)
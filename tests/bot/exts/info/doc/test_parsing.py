@@ -1,6 +1,7 @@
 from unittest import TestCase
 
 from bot.exts.info.doc import _parsing as parsing
+from bot.exts.info.doc._cog import DocItem
 from bot.exts.info.doc._markdown import DocMarkdownConverter
 
 
@@ -87,3 +88,32 @@ class MarkdownConverterTest(TestCase):
             with self.subTest(input_string=input_string):
                 d = DocMarkdownConverter(page_url="https://example.com")
                 self.assertEqual(d.convert(input_string), expected_output)
+
+
+class PageMarkdownTests(TestCase):
+    """Tests for parsing all symbols of a page at once."""
+
+    html = """
+    <dl class="py class">
+        <dt id="aiohttp.ClientSession">class aiohttp.ClientSession(base_url=None)</dt>
+        <dd><p>Client session.</p></dd>
+    </dl>
+    <dl class="py attribute">
+        <dt id="aiohttp.ClientSession.closed">closed</dt>
+        <dd><p>Whether the session is closed.</p></dd>
+    </dl>
+    """
+
+    def test_all_items_parsed(self):
+        """Every symbol should get its Markdown, and symbols missing from the page None."""
+        base_url = "https://docs.aiohttp.org/en/stable/"
+        session = DocItem("aiohttp", "class", base_url, "client_reference.html", "aiohttp.ClientSession")
+        closed = session._replace(group="attribute", symbol_id="aiohttp.ClientSession.closed")
+        missing = session._replace(symbol_id="aiohttp.ClientSession.missing")
+
+        results = parsing.get_page_markdown(self.html, [session, closed, missing])
+
+        self.assertIn("Client session.", results[session])
+        self.assertIn("aiohttp.ClientSession(base_url=None)", results[session])
+        self.assertEqual(results[closed], "Whether the session is closed.")
+        self.assertIsNone(results[missing])
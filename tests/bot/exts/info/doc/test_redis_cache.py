@@ -0,0 +1,112 @@
+import time
+from collections import defaultdict
+from unittest.mock import patch
+
+from async_rediscache import RedisSession
+
+from bot.exts.info.doc._cog import DocItem
+from bot.exts.info.doc._inventory_parser import InventoryValidators
+from bot.exts.info.doc._redis_cache import DocRedisCache, InventorySnapshot, SnapshotEntry
+from tests.base import RedisTestCase
+
+
+async def reconnect_decoding_responses(session: RedisSession) -> None:
+    """Reconnect with a client which decodes responses, like the bot's does."""
+    await session.client.close()
+    with patch.dict(session._session_kwargs, decode_responses=True):
+        await session.connect()
+
+
+class InventorySnapshotTests(RedisTestCase):
+    """Tests for the snapshot of the inventories."""
+
+    async def asyncSetUp(self):
+        await super().asyncSetUp()
+        await reconnect_decoding_responses(self.session)
+
+        self.snapshot = InventorySnapshot(namespace="test_inventories")
+        inventory = defaultdict(list)
+        inventory["py:class"] = [("aiohttp.ClientSession", "client_reference.html#aiohttp.ClientSession")]
+        self.entry = SnapshotEntry(
+            "https://docs.aiohttp.org/en/stable/objects.inv",
+            InventoryValidators('"etag"', "Wed, 21 Oct 2015 07:28:00 GMT"),
+            inventory,
+        )
+
+    async def test_entries_round_trip(self):
+        """Stored entries should be returned as they were stored."""
+        await self.snapshot.set("aiohttp", self.entry)
+
+        self.assertEqual(await self.snapshot.get_all(), {"aiohttp": self.entry})
+
+    async def test_delete_entries(self):
+        """Deleted entries should no longer be returned."""
+        await self.snapshot.set("aiohttp", self.entry)
+        await self.snapshot.set("python", self.entry)
+
+        await self.snapshot.delete("aiohttp")
+
+        self.assertEqual(set(await self.snapshot.get_all()), {"python"})
+
+
+class DocRedisCacheTests(RedisTestCase):
+    """Tests for the cache of the symbols' Markdown."""
+
+    async def asyncSetUp(self):
+        await super().asyncSetUp()
+        await reconnect_decoding_responses(self.session)
+        self.doc_cache = DocRedisCache(namespace="test_doc")
+        base_url = "https://docs.aiohttp.org/en/stable/"
+        self.client_item = DocItem("aiohttp", "class", base_url, "client_reference.html", "aiohttp.ClientSession")
+        self.client_method_item = self.client_item._replace(symbol_id="aiohttp.ClientSession.get")
+        self.web_item = DocItem("aiohttp", "class", base_url, "web_reference.html", "aiohttp.web.Application")
+
+    async def test_delete_pages(self):
+        """All symbols on the given pages should be deleted, and nothing else."""
+        for item in (self.client_item, self.client_method_item, self.web_item):
+            await self.doc_cache.set(item, "markdown")
+
+        await self.doc_cache.delete_pages([self.client_item])
+
+        self.assertIsNone(await self.doc_cache.get(self.client_item))
+        self.assertIsNone(await self.doc_cache.get(self.client_method_item))
+        self.assertIsNotNone(await self.doc_cache.get(self.web_item))
+
+    async def test_set_after_delete_pages_sets_expire(self):
+        """A page set again after being deleted should expire."""
+        await self.doc_cache.set(self.client_item, "markdown")
+        await self.doc_cache.delete_pages([self.client_item])
+
+        await self.doc_cache.set(self.client_item, "markdown")
+
+        self.assertGreater(await self.session.client.ttl("test_doc:aiohttp:client_reference"), 0)
+
+    async def test_set_many_round_trip(self):
+        """All values set for a page should be returned, with None when missing."""
+        await self.doc_cache.set_many({self.client_item: "session", self.client_method_item: "get"})
+        await self.doc_cache.set(self.web_item, "application")
+        missing_item = self.web_item._replace(symbol_id="aiohttp.web.Missing")
+
+        self.assertEqual(
+            [await self.doc_cache.get(item) for item in (self.client_method_item, self.web_item, missing_item)],
+            ["get", "application", None],
+        )
+
+    async def test_expire_only_set_once(self):
+        """Setting more values on a page shouldn't push its expire back."""
+        await self.doc_cache.set_many({self.client_item: "session"})
+        await self.session.client.expire("test_doc:aiohttp:client_reference", 100)
+
+        await self.doc_cache.set_many({self.client_method_item: "get"})
+
+        self.assertLessEqual(await self.session.client.ttl("test_doc:aiohttp:client_reference"), 100)
+
+    async def test_existing_expire_recorded(self):
+        """The expire of a page set by someone else should be recorded when setting values on it."""
+        await self.session.client.hset("test_doc:aiohttp:client_reference", "aiohttp.ClientSession", "session")
+        await self.session.client.expire("test_doc:aiohttp:client_reference", 100)
+
+        await self.doc_cache.set(self.client_method_item, "get")
+
+        expires_in = self.doc_cache._set_expires["test_doc:aiohttp:client_reference"] - time.monotonic()
+        self.assertAlmostEqual(expires_in, 100, delta=1)
@@ -0,0 +1,55 @@
+import unittest
+
+from bot.exts.info.doc._search import SymbolIndex
+
+
+class SymbolIndexTests(unittest.TestCase):
+    """Tests for the index of symbol names."""
+
+    def setUp(self):
+        self.index = SymbolIndex().updated({
+            "aiohttp": ["aiohttp.ClientSession", "aiohttp.ClientSession.get", "aiohttp.web.Application"],
+            "python": ["asyncio.gather", "asyncio.get_event_loop", "str.join", "ClientError"],
+        })
+
+    def test_complete_across_packages(self):
+        """Completions should come from all packages, in alphabetical order, ignoring case."""
+        self.assertEqual(
+            self.index.complete("aSyncIO.g"),
+            ["asyncio.gather", "asyncio.get_event_loop"],
+        )
+        self.assertEqual(
+            self.index.complete("a"),
+            ["aiohttp.ClientSession", "aiohttp.ClientSession.get", "aiohttp.web.Application", "asyncio.gather",
+             "asyncio.get_event_loop"],
+        )
+
+    def test_complete_limit(self):
+        """No more completions than the limit should be returned."""
+        self.assertEqual(self.index.complete("", limit=2), ["aiohttp.ClientSession", "aiohttp.ClientSession.get"])
+
+    def test_suggest_misspelled(self):
+        """Names a couple of edits away should be suggested, the closest first."""
+        self.assertEqual(self.index.suggest("aiohttp.ClientSesion")[0], "aiohttp.ClientSession")
+        self.assertEqual(self.index.suggest("asyncio.gahter")[0], "asyncio.gather")
+
+    def test_suggest_nothing_similar(self):
+        """Names which aren't similar to any symbol shouldn't get suggestions."""
+        self.assertEqual(self.index.suggest("numpy.ndarray"), [])
+
+    def test_unchanged_packages_reused(self):
+        """Only the packages whose names changed should be indexed again."""
+        updated = self.index.updated({
+            "aiohttp": ["aiohttp.web.Application", "aiohttp.ClientSession.get", "aiohttp.ClientSession"],
+            "python": ["asyncio.gather"],
+        })
+
+        self.assertIs(updated.packages["aiohttp"], self.index.packages["aiohttp"])
+        self.assertIsNot(updated.packages["python"], self.index.packages["python"])
+        self.assertEqual(updated.complete("asyncio"), ["asyncio.gather"])
+
+    def test_removed_packages_dropped(self):
+        """Packages which aren't given anymore should be left out of the index."""
+        updated = self.index.updated({"python": ["asyncio.gather"]})
+
+        self.assertEqual(updated.complete(""), ["asyncio.gather"])
@@ -0,0 +1,130 @@
+import unittest
+
+from bot.exts.info.doc._cog import DocItem
+from bot.exts.info.doc._symbol_table import SymbolTable
+
+BASE_URL = "https://docs.aiohttp.org/en/stable/"
+
+
+def build_table(inventory: dict, base_url: str = BASE_URL) -> SymbolTable:
+    table = SymbolTable()
+    table.add_package("aiohttp", base_url, inventory)
+    return table
+
+
+class SymbolTableTests(unittest.TestCase):
+    """Tests for the table of symbols built from the inventories."""
+
+    def setUp(self):
+        self.inventory = {
+            "py:class": [
+                ("aiohttp.ClientSession", "client_reference.html#aiohttp.ClientSession"),
+                ("aiohttp.web.Application", "web_reference.html#aiohttp.web.Application"),
+            ],
+            "py:method": [
+                ("aiohttp.ClientSession.get", "client_reference.html#aiohttp.ClientSession.get"),
+            ],
+        }
+
+    def test_symbols_looked_up(self):
+        """Symbols should be looked up by name, and nothing returned for unknown names."""
+        table = build_table(self.inventory)
+
+        self.assertEqual(
+            table.get("aiohttp.ClientSession.get"),
+            DocItem("aiohttp", "method", BASE_URL, "client_reference.html", "aiohttp.ClientSession.get"),
+        )
+        self.assertIsNone(table.get("aiohttp.ClientSession.post"))
+        self.assertEqual(len(table), 3)
+
+    def test_symbols_grouped_by_page(self):
+        """Each page should map to the items on it."""
+        table = build_table(self.inventory)
+
+        self.assertEqual(
+            table.page_items(table.get("aiohttp.ClientSession")),
+            {
+                DocItem("aiohttp", "class", BASE_URL, "client_reference.html", "aiohttp.ClientSession"),
+                DocItem("aiohttp", "method", BASE_URL, "client_reference.html", "aiohttp.ClientSession.get"),
+            },
+        )
+
+    def test_conflicting_symbols_renamed(self):
+        """A symbol conflicting with one from another package should be prefixed with its package."""
+        table = build_table(self.inventory)
+        table.add_package(
+            "requests", "https://requests.readthedocs.io/en/latest/",
+            {"py:class": [("aiohttp.ClientSession", "api.html#aiohttp.ClientSession")]},
+        )
+
+        self.assertEqual(table.get("aiohttp.ClientSession").package, "aiohttp")
+        self.assertEqual(table.get("requests.aiohttp.ClientSession").package, "requests")
+        self.assertEqual(table.renamed_symbols["aiohttp.ClientSession"], ["requests.aiohttp.ClientSession"])
+
+    def test_copy_changed_without_original(self):
+        """Adding packages to a copy of the table should leave the original as it was."""
+        table = build_table(self.inventory)
+        copy = table.copy()
+        copy.add_package(
+            "requests", "https://requests.readthedocs.io/en/latest/",
+            {"py:class": [("aiohttp.ClientSession", "api.html#aiohttp.ClientSession")]},
+        )
+        copy.add_package("aiohttp", BASE_URL, {"py:class": [("aiohttp.Timeout", "client_reference.html#Timeout")]})
+
+        self.assertEqual(len(table), 3)
+        self.assertEqual(table.get("aiohttp.ClientSession").package, "aiohttp")
+        self.assertEqual(len(table.page_items(table.get("aiohttp.ClientSession"))), 2)
+        self.assertNotIn("aiohttp.ClientSession", table.renamed_symbols)
+        self.assertEqual(copy.get("requests.aiohttp.ClientSession").package, "requests")
+        self.assertEqual(len(copy.page_items(copy.get("aiohttp.Timeout"))), 1)
+
+    def test_memory_usage_reported_for_all_parts(self):
+        """Every part of the table should take up some memory."""
+        table = build_table(self.inventory)
+        table.update_index(table.index)
+
+        usage = table.memory_usage()
+
+        self.assertEqual(usage.keys(), {"names", "symbols", "pages", "renamed symbols", "search index"})
+        self.assertTrue(all(size > 0 for size in usage.values()))
+
+    def test_unchanged_tables_have_no_changed_pages(self):
+        """Tables built from the same inventories shouldn't differ."""
+        self.assertEqual(build_table(self.inventory).changed_pages(build_table(self.inventory), ["aiohttp"]), {})
+
+    def test_only_changed_pages_reported(self):
+        """Only the pages on which a symbol was added, removed or moved should be reported."""
+        old_table = build_table(self.inventory)
+        self.inventory["py:method"].append(
+            ("aiohttp.ClientSession.post", "client_reference.html#aiohttp.ClientSession.post")
+        )
+        new_table = build_table(self.inventory)
+
+        changed_pages = old_table.changed_pages(new_table, ["aiohttp"])
+
+        self.assertEqual(changed_pages.keys(), {BASE_URL + "client_reference.html"})
+        old_items, new_items = changed_pages[BASE_URL + "client_reference.html"]
+        self.assertEqual(len(old_items), 2)
+        self.assertEqual(len(new_items), 3)
+
+    def test_all_pages_changed_with_base_url(self):
+        """Moving the documentation should change the URLs of all of its pages."""
+        new_base_url = "https://docs.aiohttp.org/en/latest/"
+
+        changed_pages = build_table(self.inventory).changed_pages(
+            build_table(self.inventory, new_base_url), ["aiohttp"]
+        )
+
+        self.assertEqual(
+            changed_pages.keys(),
+            {
+                BASE_URL + "client_reference.html",
+                BASE_URL + "web_reference.html",
+                new_base_url + "client_reference.html",
+                new_base_url + "web_reference.html",
+            },
+        )
+
+    def test_packages_not_compared_ignored(self):
+        """Packages which weren't asked about shouldn't be compared."""
+        self.assertEqual(build_table(self.inventory).changed_pages(SymbolTable(), []), {})
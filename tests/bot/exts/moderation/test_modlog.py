@@ -1,10 +1,15 @@
+import asyncio
 import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import discord
 
-from bot.exts.moderation.modlog import ModLog
+from bot import constants
+from bot.constants import Event
+from bot.exts.moderation.modlog import ExpiringSet, ModLog
+from bot.utils import modlog
 from bot.utils.modlog import send_log_message
-from tests.helpers import MockBot, MockTextChannel
+from tests.helpers import MockBot, MockGuild, MockMember, MockMessage, MockTextChannel
 
 
 class ModLogTests(unittest.IsolatedAsyncioTestCase):
@@ -14,18 +19,251 @@ class ModLogTests(unittest.IsolatedAsyncioTestCase):
         self.bot = MockBot()
         self.cog = ModLog(self.bot)
         self.channel = MockTextChannel()
+        self.bot.get_channel.return_value = self.channel
+
+    def send_log(self, text: str = "foo", **kwargs) -> asyncio.Task:
+        return asyncio.create_task(
+            send_log_message(self.bot, icon_url="foo", colour=discord.Colour.blue(), title="bar", text=text, **kwargs)
+        )
 
     async def test_log_entry_description_truncation(self):
         """Test that embed description for ModLog entry is truncated."""
-        self.bot.get_channel.return_value = self.channel
-        await send_log_message(
-            self.bot,
-            icon_url="foo",
-            colour=discord.Colour.blue(),
-            title="bar",
-            text="foo bar" * 3000
-        )
-        embed = self.channel.send.call_args[1]["embed"]
+        await self.send_log("foo bar" * 3000)
+        embed = self.channel.send.call_args[1]["embeds"][0]
         self.assertEqual(
             embed.description, ("foo bar" * 3000)[:4093] + "..."
         )
+
+    async def test_entries_sent_together(self):
+        """Entries logged in quick succession should be packed into messages of up to 10 embeds, in order."""
+        additional_embeds = [discord.Embed(description="extra")]
+        tasks = [self.send_log(str(i), additional_embeds=additional_embeds if i == 0 else None) for i in range(12)]
+        messages = await asyncio.gather(*tasks)
+
+        self.assertEqual(self.channel.send.await_count, 2)
+        sent_embeds = [call.kwargs["embeds"] for call in self.channel.send.await_args_list]
+        self.assertEqual(
+            [embed.description for embeds in sent_embeds for embed in embeds],
+            ["0", "extra", *map(str, range(1, 12))],
+        )
+        self.assertEqual(len(sent_embeds[0]), 10)
+        self.assertEqual(messages, [self.channel.send.return_value] * 12)
+
+    async def test_embed_length_budget_kept(self):
+        """Embeds should be split across messages so no message goes over the total embed length limit."""
+        await asyncio.gather(*(self.send_log("x" * 2500) for _ in range(3)))
+
+        self.assertEqual([len(call.kwargs["embeds"]) for call in self.channel.send.await_args_list], [2, 1])
+
+    async def test_content_starts_new_message(self):
+        """An entry with content should start a new message, so that its content goes with its embed."""
+        await asyncio.gather(self.send_log("first"), self.send_log("second", content="hello"))
+
+        self.assertEqual([call.kwargs["content"] for call in self.channel.send.await_args_list], [None, "hello"])
+
+    async def test_entries_logged_while_sending_sent_together(self):
+        """Entries logged while others are being sent should be sent together once those are."""
+        sending = asyncio.Event()
+        release = asyncio.Event()
+
+        async def send(**_) -> MagicMock:
+            sending.set()
+            await release.wait()
+            return MagicMock()
+
+        self.channel.send.side_effect = send
+        first = self.send_log("first")
+        await asyncio.wait_for(sending.wait(), 5)
+
+        later = [self.send_log(str(i)) for i in range(3)]
+        await asyncio.sleep(0)
+        release.set()
+        await asyncio.wait_for(asyncio.gather(first, *later), 5)
+
+        self.assertEqual(self.channel.send.await_count, 2)
+        self.assertEqual(len(self.channel.send.await_args.kwargs["embeds"]), 3)
+        self.bot.stats.timing.assert_called()
+
+    async def test_entries_failed_when_sender_cancelled(self):
+        """Entries being sent or waiting to be should stop being waited on when the sender is cancelled."""
+        sending = asyncio.Event()
+
+        async def send(**_) -> None:
+            sending.set()
+            await asyncio.Event().wait()
+
+        self.channel.send.side_effect = send
+        first = self.send_log("first")
+        await asyncio.wait_for(sending.wait(), 5)
+        second = self.send_log("second")
+        await asyncio.sleep(0)
+
+        modlog._senders[constants.Channels.mod_log]._task.cancel()
+
+        for task in (first, second):
+            with self.assertRaises(asyncio.CancelledError):
+                await asyncio.wait_for(task, 5)
+
+
+    async def test_cancelled_caller_leaves_other_entries_sent(self):
+        """An entry whose caller stopped waiting on it shouldn't stop the other entries from being sent."""
+        sending = asyncio.Event()
+        release = asyncio.Event()
+
+        async def send(**_) -> MagicMock:
+            sending.set()
+            await release.wait()
+            return MagicMock()
+
+        self.channel.send.side_effect = send
+        first = self.send_log("first")
+        await asyncio.wait_for(sending.wait(), 5)
+        second = self.send_log("second")
+        third = self.send_log("third")
+        await asyncio.sleep(0)
+
+        second.cancel()
+        release.set()
+
+        await asyncio.wait_for(asyncio.gather(first, third), 5)
+        self.assertTrue(second.cancelled())
+        self.assertEqual(self.channel.send.await_count, 2)
+
+    async def test_pings_sent_right_away(self):
+        """An entry pinging moderators shouldn't wait for the entries being sent, nor be packed with others."""
+        release = asyncio.Event()
+
+        async def send(**kwargs) -> MagicMock:
+            if kwargs["content"] is None:
+                await release.wait()
+            return MagicMock()
+
+        self.channel.send.side_effect = send
+        first = self.send_log("first")
+        await asyncio.sleep(0)
+        later = self.send_log("later")
+        ping = self.send_log("ping", ping_everyone=True)
+
+        await asyncio.wait_for(ping, 5)
+        self.assertFalse(first.done())
+        self.assertEqual(self.channel.send.await_args.kwargs["content"], f"<@&{constants.Roles.moderators}>")
+        self.assertEqual(len(self.channel.send.await_args.kwargs["embeds"]), 1)
+
+        release.set()
+        await asyncio.wait_for(asyncio.gather(first, later), 5)
+
+
+def message_update_payload(channel_id: int, **fields) -> dict:
+    """Return the payload of a message update event with the fields of a full message."""
+    return {
+        "id": "1234",
+        "channel_id": str(channel_id),
+        "guild_id": "1",
+        "type": 0,
+        "content": "new",
+        "author": {"id": "42", "username": "bob", "discriminator": "0", "global_name": None, "avatar": None},
+        "attachments": [],
+        "embeds": [],
+        "mentions": [],
+        "mention_roles": [],
+        "mention_everyone": False,
+        "pinned": False,
+        "tts": False,
+        "timestamp": "2024-01-01T00:00:00+00:00",
+        "edited_timestamp": "2024-01-01T00:01:00+00:00",
+        "flags": 0,
+        **fields,
+    }
+
+
+@patch("bot.exts.moderation.modlog.send_log_message", new_callable=AsyncMock)
+class RawMessageEditTests(unittest.IsolatedAsyncioTestCase):
+    """Tests for logging edits of uncached messages."""
+
+    def setUp(self):
+        self.bot = MockBot()
+        self.cog = ModLog(self.bot)
+        self.cog.is_channel_ignored = MagicMock(return_value=False)
+        self.channel = MockTextChannel(guild=MockGuild())
+        self.channel.guild.get_member.return_value = None
+        self.bot.get_channel.return_value = self.channel
+        self.bot._connection.store_user.side_effect = lambda data, **_: discord.User(
+            state=self.bot._connection, data=data
+        )
+        self.event = discord.RawMessageUpdateEvent(message_update_payload(self.channel.id))
+
+    async def test_cached_message_edits_skipped(self, send_log_message: AsyncMock):
+        """Edits of cached messages should be left to `on_message_edit`."""
+        self.event.cached_message = MockMessage()
+
+        await self.cog.on_raw_message_edit(self.event)
+
+        self.cog.is_channel_ignored.assert_not_called()
+        send_log_message.assert_not_called()
+
+    async def test_ignored_channel_checked_first(self, send_log_message: AsyncMock):
+        """Edits in ignored channels shouldn't be looked at any further."""
+        self.cog.is_channel_ignored.return_value = True
+
+        await self.cog.on_raw_message_edit(self.event)
+
+        self.channel.fetch_message.assert_not_called()
+        send_log_message.assert_not_called()
+
+    async def test_message_built_from_event(self, send_log_message: AsyncMock):
+        """The edited message should be logged from the event's payload, without fetching it."""
+        await self.cog.on_raw_message_edit(self.event)
+
+        self.channel.fetch_message.assert_not_called()
+        self.assertEqual(send_log_message.await_count, 2)
+        self.assertIn("`1234`", send_log_message.await_args.args[4])
+        self.assertTrue(send_log_message.await_args.args[4].endswith("new"))
+
+    async def test_partial_update_fetched(self, send_log_message: AsyncMock):
+        """The message should be fetched when the event's payload doesn't have all of the message's fields."""
+        self.event = discord.RawMessageUpdateEvent(
+            {"id": "1234", "channel_id": str(self.channel.id), "guild_id": "1", "embeds": []}
+        )
+        self.channel.fetch_message.return_value = MockMessage(
+            author=MockMember(bot=False), channel=self.channel, clean_content="fetched"
+        )
+
+        await self.cog.on_raw_message_edit(self.event)
+
+        self.channel.fetch_message.assert_awaited_once_with(1234)
+        self.assertEqual(send_log_message.await_count, 2)
+        self.assertTrue(send_log_message.await_args.args[4].endswith("fetched"))
+
+
+class IgnoredItemsTests(unittest.TestCase):
+    """Tests for ignoring the events of items for a while."""
+
+    @patch("bot.exts.moderation.modlog.monotonic")
+    def test_items_expire(self, monotonic: MagicMock):
+        """Items should be dropped once their time to live is over, counting from when they were last added."""
+        items = ExpiringSet(ttl=10)
+        monotonic.return_value = 0
+        items.add(1)
+        items.add(2)
+        monotonic.return_value = 5
+        items.add(1)
+
+        monotonic.return_value = 10
+        self.assertIn(1, items)
+        self.assertNotIn(2, items)
+        monotonic.return_value = 15
+        self.assertNotIn(1, items)
+        self.assertEqual(len(items), 0)
+
+    @patch("bot.exts.moderation.modlog.send_log_message", new_callable=AsyncMock)
+    def test_ignored_item_consumed(self, send_log_message: AsyncMock):
+        """An ignored item should only suppress a single event."""
+        cog = ModLog(MockBot())
+        member = MockMember()
+        guild = MockGuild(id=constants.Guild.id)
+        cog.ignore(Event.member_ban, member.id)
+
+        asyncio.run(cog.on_member_ban(guild, member))
+        send_log_message.assert_not_called()
+        asyncio.run(cog.on_member_ban(guild, member))
+        send_log_message.assert_awaited_once()
@@ -0,0 +1,89 @@
+import asyncio
+import unittest
+
+from bot.exts.utils.snekbox._queue import EvalJobCancelledError, EvalQueue, EvalQueueFullError
+
+
+class EvalQueueTests(unittest.IsolatedAsyncioTestCase):
+    """Tests for the fair queueing of eval jobs."""
+
+    def setUp(self):
+        self.queue = EvalQueue(max_running=1, max_queued=10)
+
+    async def test_jobs_start_right_away_while_slots_free(self):
+        """Jobs should only be queued once all slots are taken."""
+        self.queue.max_running = 2
+        first = self.queue.enqueue("channel", "user 1", 1)
+        second = self.queue.enqueue("channel", "user 2", 2)
+        third = self.queue.enqueue("channel", "user 3", 3)
+
+        self.assertTrue(first.running)
+        self.assertTrue(second.running)
+        self.assertFalse(third.running)
+        self.assertEqual(len(self.queue), 1)
+
+        self.queue.finish(first)
+        self.assertTrue(third.running)
+        self.assertEqual(len(self.queue), 0)
+
+    async def test_channels_and_users_take_turns(self):
+        """Queued jobs should be started in turns between channels, and between the users within each channel."""
+        running = self.queue.enqueue("busy", "user", 0)
+        jobs = [
+            self.queue.enqueue("busy", "user 1", 1),
+            self.queue.enqueue("busy", "user 1", 2),
+            self.queue.enqueue("busy", "user 2", 3),
+            self.queue.enqueue("quiet", "user 3", 4),
+        ]
+        expected_order = [1, 4, 3, 2]
+
+        self.assertEqual(
+            [self.queue.position(job) for job in jobs],
+            [expected_order.index(job.message_id) + 1 for job in jobs],
+        )
+
+        started = []
+        for _ in jobs:
+            self.queue.finish(running)
+            running = next(job for job in jobs if job.running)
+            started.append(running.message_id)
+        self.assertEqual(started, expected_order)
+
+    async def test_cancelled_job_never_starts(self):
+        """A cancelled job should stop waiting, and the job after it should take its place."""
+        running = self.queue.enqueue("channel", "user 1", 1)
+        cancelled = self.queue.enqueue("channel", "user 2", 2)
+        after = self.queue.enqueue("channel", "user 3", 3)
+
+        self.assertTrue(self.queue.cancel(2))
+        self.assertFalse(self.queue.cancel(2))
+        with self.assertRaises(EvalJobCancelledError):
+            await cancelled.wait()
+        self.assertEqual(self.queue.position(after), 1)
+
+        self.queue.finish(running)
+        await asyncio.wait_for(after.wait(), 1)
+        self.assertFalse(cancelled.running)
+
+    async def test_finishing_queued_job_leaves_queue(self):
+        """A job which stops waiting before its turn should be dropped from the queue without taking a slot."""
+        running = self.queue.enqueue("channel", "user 1", 1)
+        queued = self.queue.enqueue("channel", "user 2", 2)
+
+        self.queue.finish(queued)
+        self.assertEqual(len(self.queue), 0)
+        self.queue.finish(running)
+        self.assertEqual(self.queue.running, 0)
+
+    async def test_full_queue_refuses_jobs(self):
+        """Jobs which would have to wait should be refused once the queue is full, until it has room again."""
+        self.queue.max_queued = 1
+        running = self.queue.enqueue("channel", "user 1", 1)
+        self.queue.enqueue("channel", "user 2", 2)
+
+        with self.assertRaises(EvalQueueFullError):
+            self.queue.enqueue("channel", "user 3", 3)
+        self.assertEqual(len(self.queue), 1)
+
+        self.queue.finish(running)
+        self.assertFalse(self.queue.enqueue("channel", "user 3", 3).running)
@@ -12,6 +12,7 @@ from bot.errors import LockedResourceError
 from bot.exts.utils import snekbox
 from bot.exts.utils.snekbox import EvalJob, EvalResult, Snekbox
 from bot.exts.utils.snekbox._io import FileAttachment
+from bot.exts.utils.snekbox._queue import EvalJobCancelledError, EvalQueueFullError
 from tests.helpers import MockBot, MockContext, MockMember, MockMessage, MockReaction, MockUser
 
 
@@ -289,6 +290,66 @@ class SnekboxTests(unittest.IsolatedAsyncioTestCase):
                 self.cog.send_job(ctx, EvalJob.from_code("MyAwesomeCode")),
             )
 
+    async def test_send_job_queued_while_snekbox_busy(self):
+        """A job should show its position while Snekbox is busy, and be cancelled with the edited message."""
+        ctx = MockContext()
+        ctx.message.id = 1
+        self.cog.post_job = AsyncMock()
+        running = self.cog.eval_queue.enqueue("channel", "user", 0)
+        self.cog.eval_queue.max_running = 1
+
+        task = asyncio.create_task(self.cog.send_job(ctx, EvalJob.from_code("MyAwesomeCode")))
+        await asyncio.sleep(0)
+        self.assertIn("number 1 in the queue", ctx.send.call_args.args[0])
+
+        edited = MockMessage(id=1, content="new")
+        await self.cog.on_message_edit(MockMessage(id=1, content="old"), edited)
+        with self.assertRaises(EvalJobCancelledError) as cancelled:
+            await task
+        self.assertIs(cancelled.exception.edited, edited)
+        ctx.send.return_value.delete.assert_awaited_once()
+        self.cog.post_job.assert_not_called()
+        self.bot.stats.incr.assert_called_with("snekbox.queue.requeued")
+        self.cog.eval_queue.finish(running)
+
+    async def test_run_job_requeues_edited_job(self):
+        """A queued job cancelled by an edit should be queued again with the edited code, in the same version."""
+        ctx = MockContext(author=MockMember(roles=[]))
+        ctx.message.id = 1
+        job = EvalJob.from_code("old").as_version("3.11")
+        edited = MockMessage(id=1, content="new")
+        self.cog.send_job = AsyncMock(side_effect=(EvalJobCancelledError(edited), MockMessage(id=2)))
+        self.cog.get_code = AsyncMock(return_value="new")
+        self.cog.continue_job = AsyncMock(return_value=None)
+
+        await self.cog.run_job(ctx, job)
+
+        self.cog.get_code.assert_awaited_once_with(edited, ctx.command)
+        self.assertEqual(self.cog.send_job.await_args.args, (ctx, EvalJob.from_code("new").as_version("3.11")))
+
+    async def test_run_job_stops_when_message_deleted(self):
+        """A queued job cancelled as its message was deleted shouldn't be queued again."""
+        ctx = MockContext(author=MockMember(roles=[]))
+        self.cog.send_job = AsyncMock(side_effect=EvalJobCancelledError())
+        self.cog.continue_job = AsyncMock()
+
+        await self.cog.run_job(ctx, self.job)
+
+        self.cog.send_job.assert_awaited_once()
+        self.cog.continue_job.assert_not_awaited()
+
+    async def test_run_job_refused_when_queue_full(self):
+        """The user should be told to try again later when the queue is full."""
+        ctx = MockContext(author=MockMember(roles=[]))
+        self.cog.send_job = AsyncMock(side_effect=EvalQueueFullError)
+        self.cog.continue_job = AsyncMock()
+
+        await self.cog.run_job(ctx, self.job)
+
+        self.assertIn("Snekbox is busy", ctx.send.call_args.args[0])
+        self.bot.stats.incr.assert_called_with("snekbox.queue.rejected")
+        self.cog.continue_job.assert_not_awaited()
+
     async def test_send_job(self):
         """Test the send_job function."""
         ctx = MockContext()
@@ -0,0 +1,51 @@
+import unittest
+from unittest.mock import Mock
+
+import discord
+
+from bot.utils.channel import ChannelVisibility
+from tests.helpers import MockRole, MockTextChannel
+
+
+class ChannelVisibilityTests(unittest.TestCase):
+    """Tests for remembering which roles can view which channels."""
+
+    def setUp(self):
+        self.visibility = ChannelVisibility()
+        self.role = MockRole()
+        self.channel = MockTextChannel()
+        self.channel.permissions_for.return_value = Mock(view_channel=True)
+
+    def test_visibility_remembered_per_role(self):
+        """Permissions should only be resolved the first time a role's visibility of the channel is looked up."""
+        other_role = MockRole()
+
+        self.assertTrue(self.visibility.can_view(self.channel, self.role))
+        self.assertTrue(self.visibility.can_view(self.channel, self.role))
+        self.channel.permissions_for.return_value = Mock(view_channel=False)
+        self.assertFalse(self.visibility.can_view(self.channel, other_role))
+
+        self.assertEqual(self.channel.permissions_for.call_count, 2)
+
+    def test_updated_channel_forgotten(self):
+        """A forgotten channel should have its permissions resolved again, leaving other channels remembered."""
+        other_channel = MockTextChannel()
+        other_channel.permissions_for.return_value = Mock(view_channel=True)
+        self.visibility.can_view(self.channel, self.role)
+        self.visibility.can_view(other_channel, self.role)
+
+        self.channel.permissions_for.return_value = Mock(view_channel=False)
+        other_channel.permissions_for.return_value = Mock(view_channel=False)
+        self.visibility.forget_channel(self.channel)
+
+        self.assertFalse(self.visibility.can_view(self.channel, self.role))
+        self.assertTrue(self.visibility.can_view(other_channel, self.role))
+
+    def test_updated_category_forgets_everything(self):
+        """Forgetting a category should forget its channels too, as their overwrites may be synced with it."""
+        self.visibility.can_view(self.channel, self.role)
+        self.channel.permissions_for.return_value = Mock(view_channel=False)
+
+        self.visibility.forget_channel(Mock(spec=discord.CategoryChannel))
+
+        self.assertFalse(self.visibility.can_view(self.channel, self.role))
@@ -0,0 +1,246 @@
+import asyncio
+import unittest
+from datetime import UTC, datetime, timedelta
+from unittest.mock import AsyncMock, patch
+
+from bot.utils.deadlines import DeadlineScheduler, catch_up
+from tests.helpers import MockBot
+
+BASE_TIME = datetime(2024, 1, 1, tzinfo=UTC)
+
+
+async def settle() -> None:
+    """Let the tasks woken by the last change run until they're waiting again."""
+    for _ in range(20):
+        await asyncio.sleep(0)
+
+
+class FakeClock:
+    """A clock which only moves when it's advanced, so the scheduler's deadlines are reached deterministically."""
+
+    def __init__(self):
+        self.time = BASE_TIME
+        self._advanced = asyncio.Event()
+
+    def now(self) -> datetime:
+        return self.time
+
+    def at(self, seconds: float) -> datetime:
+        """Return the time `seconds` after the clock started."""
+        return BASE_TIME + timedelta(seconds=seconds)
+
+    async def wait(self, event: asyncio.Event, timeout: float | None) -> None:
+        wake_at = None if timeout is None else self.time + timedelta(seconds=timeout)
+        while not event.is_set() and (wake_at is None or self.time < wake_at):
+            self._advanced.clear()
+            waiters = [asyncio.ensure_future(event.wait()), asyncio.ensure_future(self._advanced.wait())]
+            await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+            for waiter in waiters:
+                waiter.cancel()
+
+    async def advance_to(self, seconds: float) -> None:
+        """Move the clock to `seconds` after it started, and let the scheduler react."""
+        self.time = self.at(seconds)
+        self._advanced.set()
+        await settle()
+
+
+class DeadlineSchedulerTests(unittest.IsolatedAsyncioTestCase):
+    """Tests for the `DeadlineScheduler` class."""
+
+    def setUp(self):
+        self.fired = []
+        self.clock = FakeClock()
+        self.scheduler = DeadlineScheduler("test", self.fire, clock=self.clock)
+
+    def tearDown(self):
+        self.scheduler.cancel_all()
+
+    async def fire(self, payload: str) -> None:
+        self.fired.append(payload)
+
+    async def test_entries_fire_in_deadline_order(self):
+        """Entries should be fired once due, in the order of their deadlines, whichever order they're added in."""
+        self.scheduler.schedule_at(self.clock.at(10), 1, "second")
+        self.scheduler.schedule_at(self.clock.at(-1), 2, "overdue")
+        self.scheduler.start()
+        self.scheduler.schedule_at(self.clock.at(5), 3, "first")
+        await settle()
+        self.assertEqual(self.fired, ["overdue"])
+
+        await self.clock.advance_to(5)
+        self.assertEqual(self.fired, ["overdue", "first"])
+        await self.clock.advance_to(10)
+        self.assertEqual(self.fired, ["overdue", "first", "second"])
+        self.assertEqual(len(self.scheduler), 0)
+
+    async def test_cancelled_and_rescheduled_entries(self):
+        """A cancelled entry should never fire, and a rescheduled one should only fire with its new payload."""
+        self.scheduler.start()
+        self.scheduler.schedule_at(self.clock.at(1), 1, "cancelled")
+        self.scheduler.schedule_at(self.clock.at(1), 2, "old")
+        self.scheduler.cancel(1)
+        self.scheduler.schedule_at(self.clock.at(3), 2, "new")
+        self.assertNotIn(1, self.scheduler)
+
+        await self.clock.advance_to(1)
+        self.assertEqual(self.fired, [])
+        await self.clock.advance_to(3)
+        self.assertEqual(self.fired, ["new"])
+
+    async def test_only_window_kept_in_memory(self):
+        """Entries past the loaded window should be dropped, and paged in by the loader as the window advances."""
+        pages = [[(1, self.clock.at(10), "loaded")], [(3, self.clock.at(120), "paged in")]]
+        loader = AsyncMock(side_effect=lambda after, until: pages.pop(0) if pages else [])
+        self.scheduler = DeadlineScheduler("test", self.fire, loader, window=timedelta(seconds=100), clock=self.clock)
+        self.scheduler.start()
+        await settle()
+
+        self.scheduler.schedule_at(self.clock.at(30), 2, "in window")
+        self.scheduler.schedule_at(self.clock.at(150), 3, "past window")
+        self.assertIn(2, self.scheduler)
+        self.assertNotIn(3, self.scheduler)
+
+        await self.clock.advance_to(30)
+        self.assertEqual(self.fired, ["loaded", "in window"])
+        # Half a window in, the entries up to a full window ahead are paged in.
+        await self.clock.advance_to(50)
+        self.assertIn(3, self.scheduler)
+        await self.clock.advance_to(120)
+        self.assertEqual(self.fired, ["loaded", "in window", "paged in"])
+
+        self.assertEqual([call.args for call in loader.await_args_list[:2]], [
+            (None, self.clock.at(100)),
+            (self.clock.at(100), self.clock.at(150)),
+        ])
+
+    async def test_entries_cancelled_while_loading_skipped(self):
+        """An entry cancelled while its window is being loaded shouldn't be brought back by the loader."""
+        loaded = asyncio.Event()
+
+        async def loader(after: datetime | None, until: datetime) -> list:
+            await loaded.wait()
+            return [(1, self.clock.at(1), "cancelled")]
+
+        self.scheduler = DeadlineScheduler("test", self.fire, loader, clock=self.clock)
+        self.scheduler.start()
+        await settle()
+        self.scheduler.cancel(1)
+        loaded.set()
+
+        await self.clock.advance_to(1)
+        self.assertEqual(self.fired, [])
+
+    async def test_failed_load_retried(self):
+        """The window shouldn't move when the loader fails, and the load should be tried again later."""
+        loader = AsyncMock(side_effect=[ValueError, []])
+        self.scheduler = DeadlineScheduler("test", self.fire, loader, clock=self.clock)
+        self.scheduler.start()
+        await settle()
+
+        # Still nothing loaded, so entries far in the future are kept.
+        self.scheduler.schedule_at(self.clock.at(10**9), 1, "far")
+        self.assertIn(1, self.scheduler)
+
+        await self.clock.advance_to(60)
+        self.assertEqual(loader.await_count, 2)
+
+
+class CatchUpTests(unittest.IsolatedAsyncioTestCase):
+    """Tests for catching up on overdue items."""
+
+    def setUp(self):
+        self.bot = MockBot()
+        patcher = patch("bot.instance", self.bot)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def test_groups_handled_in_batches_in_due_order(self):
+        """Each group's items should be handled in due order and in batches, starting with the most overdue group."""
+        items = [("b", 3), ("a", 5), ("b", 1), ("a", 2), ("b", 4), ("c", 6)]
+        batches = []
+
+        async def handler(batch: list) -> None:
+            batches.append(batch)
+
+        await catch_up("test", items, handler, due=lambda item: item[1], group=lambda item: item[0], batch_size=2)
+
+        self.assertEqual(
+            batches,
+            [[("b", 1), ("b", 3)], [("b", 4)], [("a", 2), ("a", 5)], [("c", 6)]],
+        )
+        self.bot.stats.gauge.assert_called_with("catch_up.test.remaining", 0)
+        self.bot.stats.incr.assert_called_with("catch_up.test.handled", 1)
+
+    async def test_concurrency_bounded(self):
+        """No more than `concurrency` groups should be handled at once, and failures shouldn't stop the rest."""
+        running = 0
+        most_running = 0
+        handled = []
+
+        async def handler(batch: list) -> None:
+            nonlocal running, most_running
+            running += 1
+            most_running = max(most_running, running)
+            await asyncio.sleep(0)
+            running -= 1
+            if batch[0] == 3:
+                raise ValueError
+            handled.extend(batch)
+
+        await catch_up("test", range(10), handler, due=int, group=int, concurrency=3)
+
+        self.assertEqual(most_running, 3)
+        self.assertCountEqual(handled, [0, 1, 2, 4, 5, 6, 7, 8, 9])
+        self.bot.stats.incr.assert_any_call("catch_up.test.failed", 1)
+
+    async def test_overdue_entries_passed_to_catch_up(self):
+        """Entries which are overdue when loaded should be caught up on together instead of each being fired."""
+        fired = []
+        caught_up = asyncio.Event()
+        overdue = []
+
+        async def fire(payload: str) -> None:
+            fired.append(payload)
+
+        async def on_overdue(payloads: list) -> None:
+            overdue.extend(payloads)
+            caught_up.set()
+
+        clock = FakeClock()
+        loader = AsyncMock(return_value=[(1, clock.at(-1), "overdue"), (2, clock.at(1), "due")])
+        scheduler = DeadlineScheduler("test", fire, loader, catch_up=on_overdue, clock=clock)
+        scheduler.start()
+        self.addCleanup(scheduler.cancel_all)
+
+        await settle()
+        self.assertTrue(caught_up.is_set())
+        self.assertEqual(fired, [])
+
+        await clock.advance_to(1)
+        self.assertEqual(overdue, ["overdue"])
+        self.assertEqual(fired, ["due"])
+
+    async def test_catch_up_cancelled_with_scheduler(self):
+        """A catch-up which is still running should be cancelled along with the scheduler."""
+        started = asyncio.Event()
+        cancelled = asyncio.Event()
+
+        async def on_overdue(payloads: list) -> None:
+            started.set()
+            try:
+                await asyncio.Event().wait()
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        clock = FakeClock()
+        loader = AsyncMock(return_value=[(1, clock.at(-1), "overdue")])
+        scheduler = DeadlineScheduler("test", AsyncMock(), loader, catch_up=on_overdue, clock=clock)
+        scheduler.start()
+        await settle()
+        self.assertTrue(started.is_set())
+
+        scheduler.cancel_all()
+        await settle()
+        self.assertTrue(cancelled.is_set())